@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+"""
+Manifest-driven image pipeline for the blog articles.
+=====================================================
+Replaces the download-date-ideas-* scripts: every round of images is now a
+JSON manifest under manifests/ (YAML works too if PyYAML is installed).
+Adding a new article means adding a manifest, not copying a script.
+
+Usage:
+  python3 asset_pipeline.py manifests/date-ideas-final.json
+  python3 asset_pipeline.py manifests/*.json --workers 8
+  python3 asset_pipeline.py manifests/date-ideas-v3.json --dry-run
+  python3 asset_pipeline.py manifests/date-ideas-v3.json --offline
+  python3 asset_pipeline.py manifests/date-ideas-final.json --optimize
+  python3 asset_pipeline.py manifests/date-ideas-final.json --store
+  python3 asset_pipeline.py manifests/date-ideas-final.json --metrics json --trace trace.json
+  python3 watch.py manifests/date-ideas-final.json     # keep running, fetch edits on save
+
+Manifest:
+{
+  "output_dir": "../../images/date-ideas",   (relative to the manifest file)
+  "min_size": 5000,                          (smaller responses are rejected early)
+  "articles": [
+    {"article": "valentines-day-date-ideas", "images": [
+      {"filename": "a.jpg", "url": "https://..."},
+      {"filename": "b.jpg", "pexels_id": 6324452},
+      {"filenames": ["c.jpg", "d.jpg"], "pexels_search": "couple picnic park"},
+      {"filename": "e.jpg", "amazon_asin": "B0CGY4X222"}
+    ]}
+  ]
+}
+
+How it runs:
+  Every slot becomes a node in a small DAG. Direct URLs and Pexels IDs are
+  fetch nodes; Pexels searches and Amazon ASINs are resolve nodes that add
+  fetch nodes as soon as they finish. Fetch nodes are keyed by URL, so a
+  photo used by several slots (e.g. Pexels 3171815 in v2 and final) is
+  downloaded once and copied to the other targets.
+
+  Searches get their own small pool so they all start right away instead of
+  queueing behind downloads; each search pages through the results until it
+  has enough photos and hands its URLs to the download pool immediately.
+  The Pexels quota headers are respected (see pexels.RateLimit). Result
+  pages are cached (pexels.SearchCache), so a second run of the same
+  manifest makes no API calls, and the photos are ranked before they are
+  assigned to the filenames of a slot (pexels.rank_photos).
+
+  Interrupted runs resume: every output directory gets a job journal
+  (journal.py). Files finished in the interrupted run are skipped without a
+  request, resolved Amazon image URLs skip the product page and partial
+  downloads continue with HTTP Range.
+
+  Files are checked by content, not by size (verify_images.py): existing
+  targets are verified before the run (process pool, cached per directory)
+  and broken ones are moved to <name>.broken and downloaded again; a new
+  download only replaces the file if it decodes.
+
+  Amazon product pages are parsed lazily (product_page.iter_image_candidates):
+  the first candidate is downloaded right away and the next strategy only
+  runs if that image fails. Strategy order per domain adapts to what worked
+  before (.strategy-stats.json, shared with download-product-images.py).
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import metrics
+from http_cache import HttpCache, sha256_file
+from journal import PARTIAL, RESOLVED, Journal
+import pexels
+from pexels import SearchCache, pexels_url, search_photos
+from product_page import StrategyStats, is_captcha, iter_image_candidates, try_highres_url
+from resolved_urls import ResolvedUrls
+import verify_images
+
+WORKERS = 4
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+}
+AMAZON_HEADERS = dict(HEADERS, **{
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+})
+AMAZON_PRODUCT_URL = "https://www.amazon.com/dp/{asin}"
+
+
+def load_manifest(path):
+    with open(path) as f:
+        if path.endswith((".yml", ".yaml")):
+            import yaml  # optional, only needed for YAML manifests
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+class Target:
+    """One output file requested by a manifest slot."""
+
+    def __init__(self, filepath, min_size, article):
+        self.filepath = filepath
+        self.min_size = min_size
+        self.article = article
+        self.replace = False  # source changed (watch.py): the existing file is outdated
+
+    @property
+    def filename(self):
+        return os.path.basename(self.filepath)
+
+    @property
+    def directory(self):
+        return os.path.dirname(self.filepath)
+
+    def exists(self):
+        # Content is checked by verify_images before the run, broken files are moved aside by now
+        return not self.replace and os.path.exists(self.filepath)
+
+
+class Node:
+    """A planned unit of work: 'fetch', 'pexels_search' or 'amazon'."""
+
+    def __init__(self, kind, targets, url=None, query=None, asin=None, page_url=None):
+        self.kind = kind
+        self.targets = targets
+        self.url = url
+        self.query = query
+        self.asin = asin
+        self.page_url = page_url
+
+    def describe(self):
+        names = ', '.join(t.filename for t in self.targets)
+        if self.kind == 'fetch':
+            return f"fetch   {self.url}\n          -> {names}"
+        if self.kind == 'pexels_search':
+            return f"search  '{self.query}'\n          -> {names}"
+        return f"amazon  {self.page_url}\n          -> {names}"
+
+
+def plan(manifest_paths):
+    """Turns manifests into DAG nodes."""
+    nodes = []
+    for path in manifest_paths:
+        manifest = load_manifest(path)
+        base = os.path.dirname(os.path.abspath(path))
+        output_dir = os.path.normpath(os.path.join(base, manifest.get("output_dir", ".")))
+        min_size = manifest.get("min_size", 1000)
+
+        for article in manifest.get("articles", []):
+            name = article.get("article", "")
+            for slot in article.get("images", []):
+                filenames = slot.get("filenames") or [slot["filename"]]
+                targets = [Target(os.path.join(output_dir, f), slot.get("min_size", min_size), name)
+                           for f in filenames]
+                if "url" in slot:
+                    nodes.extend(Node('fetch', [t], url=slot["url"]) for t in targets)
+                elif "pexels_id" in slot:
+                    url = pexels_url(slot["pexels_id"], slot.get("width", 1200))
+                    nodes.extend(Node('fetch', [t], url=url) for t in targets)
+                elif "pexels_search" in slot:
+                    nodes.append(Node('pexels_search', targets, query=slot["pexels_search"]))
+                elif "amazon_asin" in slot or "amazon_url" in slot:
+                    page_url = slot.get("amazon_url") or AMAZON_PRODUCT_URL.format(asin=slot["amazon_asin"])
+                    nodes.extend(Node('amazon', [t], asin=slot.get("amazon_asin"), page_url=page_url)
+                                 for t in targets)
+                else:
+                    raise ValueError(f"{path}: slot without source: {slot}")
+    return nodes
+
+
+class Pipeline:
+    """Runs planned nodes on a thread pool with URL-level deduplication."""
+
+    def __init__(self, workers=WORKERS, resolved=None, strategies=None, searches=None,
+                 caches=None):
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.search_pool = ThreadPoolExecutor(max_workers=pexels.SEARCH_CONCURRENCY)
+        self.lock = threading.Lock()
+        self.caches = {} if caches is None else caches  # directory -> HttpCache, watch.py keeps it
+        self.journals = {}
+        self.resolved = resolved  # ResolvedUrls shared with download-product-images.py
+        self.strategies = strategies  # product_page.StrategyStats, shared as well
+        self.searches = searches  # pexels.SearchCache
+        self.fetches = {}       # url -> (future, target) of the first download of that URL
+        self.futures = []
+        self.results = []       # (target, status, detail, seconds since start)
+        self.total = 0
+        self.started = time.perf_counter()
+
+    # --- bookkeeping ------------------------------------------------------
+
+    def cache_for(self, target):
+        with self.lock:
+            cache = self.caches.get(target.directory)
+            if cache is None:
+                os.makedirs(target.directory, exist_ok=True)
+                cache = self.caches[target.directory] = HttpCache(target.directory)
+            return cache
+
+    def journal_for(self, target):
+        with self.lock:
+            journal = self.journals.get(target.directory)
+            if journal is None:
+                os.makedirs(target.directory, exist_ok=True)
+                journal = self.journals[target.directory] = Journal(target.directory)
+            return journal
+
+    def finished(self, target, status, detail="", sha256=None):
+        """report() for a file that is now complete on disk."""
+        self.journal_for(target).verified(target.filename, target.filepath, sha256)
+        self.report(target, status, detail)
+
+    def submit(self, targets, fn, *args, pool=None):
+        """Runs fn(*args) on a pool; errors are reported for `targets`."""
+        future = (pool or self.pool).submit(self._guard, targets, fn, *args)
+        with self.lock:
+            self.futures.append(future)
+        return future
+
+    def _guard(self, targets, fn, *args):
+        name = f"search '{args[0].query}'" if fn == self._search else targets[0].filename
+        try:
+            with metrics.item(name) as info:
+                result = fn(*args)
+                info["ok"] = all(self.status_of(t) not in ("FAILED", "ERROR") for t in targets)
+            return result
+        except Exception as e:
+            for target in targets:
+                self.report(target, "ERROR", str(e))
+            return None
+
+    def status_of(self, target):
+        with self.lock:
+            for t, status, _, _ in reversed(self.results):
+                if t is target:
+                    return status
+        return None
+
+    def report(self, target, status, detail=""):
+        with self.lock:
+            self.results.append((target, status, detail, time.perf_counter() - self.started))
+            n = len(self.results)
+            print(f"  [{n:2d}/{self.total}] {status:9s} {target.filename} {detail}".rstrip())
+
+    # --- nodes ------------------------------------------------------------
+
+    def run(self, nodes):
+        self.total = sum(len(n.targets) for n in nodes)
+        self.started = time.perf_counter()
+        self.requeue_broken(nodes)
+        done = set()
+        for node in nodes:
+            for t in node.targets:
+                if self.journal_for(t).start([t.filename]) and not t.replace:
+                    done.add(t.filepath)
+        if done:
+            print(f"  Resuming interrupted run: {len(done)}/{self.total} files already done\n")
+
+        try:
+            for node in nodes:
+                if all(t.filepath in done for t in node.targets):
+                    for t in node.targets:
+                        self.report(t, "SKIP", "(done in interrupted run)")
+                    continue
+                self.start(node)
+            self.wait()
+        finally:
+            try:
+                self.search_pool.shutdown(cancel_futures=True)
+                self.pool.shutdown(cancel_futures=True)
+            finally:
+                for cache in self.caches.values():
+                    cache.save()
+                for journal in self.journals.values():
+                    journal.finish()
+                if self.resolved:
+                    self.resolved.save()
+                if self.strategies:
+                    self.strategies.save()
+                if self.searches:
+                    self.searches.save()
+        return self.results
+
+    def requeue_broken(self, nodes):
+        """Moves targets that fail verify_images to <name>.broken, so they are downloaded again."""
+        names = {}
+        for node in nodes:
+            for t in node.targets:
+                if os.path.exists(t.filepath):
+                    names.setdefault(t.directory, []).append(t.filename)
+        for directory, filenames in names.items():
+            broken = verify_images.verify_and_requeue(directory, filenames)
+            for name, reason in broken.items():
+                print(f"  BROKEN    {name} ({reason}) - downloading again")
+            if broken:
+                print()
+
+    def start(self, node):
+        if node.kind == 'fetch':
+            self.request_fetch(node.url, [(node.url, 0)], node.targets[0])
+        elif node.kind == 'pexels_search':
+            self.start_search(node)
+        else:
+            self.start_amazon(node)
+
+    def wait(self):
+        # Resolve nodes keep adding fetch nodes while they run
+        while True:
+            with self.lock:
+                pending = [f for f in self.futures if not f.done()]
+            if not pending:
+                break
+            wait(pending)
+
+    def cached_url(self, target):
+        if target.replace:
+            return None
+        return self.cache_for(target).url_for(target.filename)
+
+    def start_search(self, node):
+        # Known results are revalidated directly; the search only runs for new slots
+        if all(self.cached_url(t) for t in node.targets):
+            for t in node.targets:
+                url = self.cached_url(t)
+                self.request_fetch(url, [(url, 0)], t)
+            return
+        if all(t.exists() for t in node.targets):
+            for t in node.targets:
+                self.finished(t, "SKIP", "(already exists)")
+            return
+        self.submit(node.targets, self._search, node, node.targets, pool=self.search_pool)
+
+    def _search(self, node, targets):
+        with metrics.span("search", query=node.query):
+            photos = search_photos(node.query, len(targets), cache=self.searches)
+        for i, target in enumerate(targets):
+            if i >= len(photos):
+                self.report(target, "FAILED", f"(not enough results for '{node.query}')")
+                continue
+            url = photos[i]["src"]["large"]
+            self.request_fetch(url, [(url, 0)], target)
+
+    def start_amazon(self, node):
+        target = node.targets[0]
+        url = self.cached_url(target)
+        resolved = self.journal_for(target).get(target.filename).get('image_url')
+        hit = self.resolved.get(node.page_url) if self.resolved else None
+        if url:
+            self.request_fetch(url, [(url, 0)], target)
+        elif resolved:
+            # Resolved before the last run was interrupted: no product page needed
+            self.fetch_amazon_image(resolved, target)
+        elif hit:
+            # Resolved by an earlier run or another article; a stale URL falls back to the page
+            candidates = [(hit["image_url"], 100)]
+            if hit.get("highres_url"):
+                candidates.insert(0, (hit["highres_url"], 1000))
+            if self.up_to_date(candidates, target):
+                self.finished(target, "SKIP", "(already exists)")
+            else:
+                self.submit([target], self._fetch_resolved, node, candidates, target)
+        elif target.exists():
+            self.finished(target, "SKIP", "(already exists)")
+        else:
+            self.submit([target], self._resolve_amazon, node, target)
+
+    def _fetch_resolved(self, node, candidates, target):
+        """Image URL from ResolvedUrls; if it no longer loads, forget it and parse the page."""
+        import requests
+
+        try:
+            if self._download(candidates, target, report_failure=False):
+                return
+        except requests.RequestException:
+            pass
+        self.resolved.invalidate(node.page_url)
+        self._resolve_amazon(node, target)
+
+    def _resolve_amazon(self, node, target):
+        import http_pool
+        import requests
+
+        with metrics.span("page"):
+            resp = http_pool.get(node.page_url, headers=AMAZON_HEADERS, timeout=20)
+        if resp.status_code != 200:
+            if is_captcha(resp.content):
+                # Amazon's robot page comes as 503: slow the host down like download-product-images
+                http_pool.throttled(node.page_url)
+                self.report(target, "FAILED", "(captcha - Amazon is throttling)")
+            else:
+                self.report(target, "FAILED", f"(product page HTTP {resp.status_code})")
+            return
+        domain = urlsplit(node.page_url).hostname
+        found = iter_image_candidates(resp.content, domain, self.strategies)
+        with metrics.span("parse"):
+            candidate = next(found, None)
+        if candidate is None and is_captcha(resp.content):
+            http_pool.throttled(node.page_url)
+            self.report(target, "FAILED", "(captcha - Amazon is throttling)")
+            return
+        if candidate is None:
+            self.report(target, "FAILED", "(no product image found)")
+            return
+        # The next strategy only runs when the image of the previous one fails to load
+        tried = 0
+        while candidate:
+            strategy, img_url = candidate
+            tried += 1
+            self.journal_for(target).mark(target.filename, RESOLVED, image_url=img_url)
+            try:
+                loaded = self._download(self.amazon_candidates(img_url), target, report_failure=False)
+            except requests.RequestException:
+                loaded = None
+            if self.strategies:
+                self.strategies.downloaded(domain, strategy, bool(loaded))
+            if loaded:
+                if self.resolved:
+                    # Only a high-res URL that actually loaded goes into the ASIN cache
+                    self.resolved.put(node.page_url, strategy, img_url,
+                                      loaded if loaded != img_url else None)
+                return
+            with metrics.span("parse"):
+                candidate = next(found, None)
+        self.report(target, "FAILED", f"(no loadable image from {tried} candidate(s))")
+
+    def amazon_candidates(self, img_url):
+        candidates = [(img_url, 100)]
+        highres_url = try_highres_url(img_url)
+        if highres_url:
+            candidates.insert(0, (highres_url, 1000))
+        return candidates
+
+    def fetch_amazon_image(self, img_url, target):
+        self.request_fetch(img_url, self.amazon_candidates(img_url), target)
+
+    def up_to_date(self, candidates, target):
+        """The file exists and no candidate has validators for a conditional request."""
+        cache = self.cache_for(target)
+        return (not any(cache.validators(url, target.filepath) for url, _ in candidates)
+                and target.exists())
+
+    def request_fetch(self, key, candidates, target):
+        """Downloads `key` once; further targets for the same key get a copy."""
+        if self.up_to_date(candidates, target):
+            self.finished(target, "SKIP", "(already exists)")
+            return
+        with self.lock:
+            first = self.fetches.get(key)
+            if first is None:
+                future = self.pool.submit(self._guard, [target], self._download, candidates, target)
+                self.fetches[key] = (future, target)
+                self.futures.append(future)
+                return
+        self.submit([target], self._copy_after, *first, target)
+
+    def _download(self, candidates, target, report_failure=True):
+        """Tries `candidates` in order; returns the URL that loaded (or was 304), else None."""
+        import http_pool
+
+        cache = self.cache_for(target)
+        journal = self.journal_for(target)
+        entry = journal.get(target.filename)
+        # A partial file from an interrupted run is finished first
+        candidates = sorted(candidates, key=lambda c: c[0] != entry.get('part_url'))
+        for url, min_size in candidates:
+            headers = dict(HEADERS, **cache.validators(url, target.filepath))
+            if_range = entry.get('validator') if entry.get('part_url') == url else None
+
+            def started(response, url=url):
+                journal.mark(target.filename, PARTIAL, part_url=url,
+                             validator=http_pool.resume_validator(response.headers))
+
+            try:
+                with metrics.span("image"):
+                    result = http_pool.download_file(url, target.filepath,
+                                                     min_size=max(min_size, target.min_size),
+                                                     headers=headers, timeout=30, resumable=True,
+                                                     if_range=if_range, on_response=started,
+                                                     verify=verify_images.check_path)
+            except BaseException:
+                part = http_pool.part_path(target.filepath)
+                if os.path.exists(part):
+                    journal.mark(target.filename, PARTIAL, bytes=os.path.getsize(part))
+                raise
+            if result.not_modified:
+                self.finished(target, "UNCHANGED", "(HTTP 304)")
+                return url
+            if result.written:
+                cache.record(url, result.headers, result.sha256, result.size,
+                             filename=target.filename)
+                resumed = f", resumed at {result.resumed:,}" if result.resumed else ""
+                self.finished(target, "OK", f"({result.size:,} bytes{resumed})", result.sha256)
+                return url
+        if report_failure:
+            detail = result.problem or f"HTTP {result.status_code}, {result.size} bytes"
+            self.report(target, "FAILED", f"({detail})")
+        return None
+
+    def _copy_after(self, first, first_target, target):
+        # FIFO pool: `first` was submitted earlier, so it is running or done here
+        if not first.result():
+            self.report(target, "FAILED", "(shared download failed)")
+            return
+        source = first_target.filepath
+        if (os.path.exists(target.filepath)
+                and os.path.getsize(target.filepath) == os.path.getsize(source)
+                and sha256_file(target.filepath) == sha256_file(source)):
+            self.finished(target, "UNCHANGED", f"(same as {os.path.basename(source)})")
+            return
+        os.makedirs(target.directory, exist_ok=True)
+        tmp_path = os.path.join(target.directory, f".{target.filename}.{uuid.uuid4().hex[:8]}.part")
+        with metrics.span("copy"):
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, target.filepath)
+        self.finished(target, "COPIED", f"(same source as {os.path.basename(source)})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manifest-driven blog image pipeline")
+    parser.add_argument("manifests", nargs="+", help="JSON/YAML manifests")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan only")
+    parser.add_argument("--optimize", action="store_true",
+                        help="Create resized JPEG/WebP/AVIF variants afterwards (needs Pillow)")
+    parser.add_argument("--metrics", nargs="?", const="table", choices=["table", "json"],
+                        help="Time every stage: table, with 'json' also JSON lines")
+    parser.add_argument("--metrics-out", metavar="FILE", help="Write the JSON lines to FILE")
+    parser.add_argument("--trace", metavar="FILE.json",
+                        help="Write a Chrome/Perfetto trace of all stages")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Reload Amazon product pages and repeat Pexels searches "
+                             "instead of using cached results")
+    parser.add_argument("--offline", action="store_true",
+                        help="Pexels searches only from the search cache (no API calls)")
+    parser.add_argument("--store", action="store_true",
+                        help="Keep the images in the content-addressed store (asset_store.py)")
+    args = parser.parse_args(argv)
+
+    nodes = plan(args.manifests)
+    slots = sum(len(n.targets) for n in nodes)
+    unique = len({n.url for n in nodes if n.kind == 'fetch'})
+    print(f"\nPlanned {slots} images from {len(args.manifests)} manifest(s): "
+          f"{unique} unique URLs, "
+          f"{sum(1 for n in nodes if n.kind != 'fetch')} searches/lookups\n")
+
+    if args.dry_run:
+        for node in nodes:
+            print(f"  {node.describe()}")
+        return 0
+
+    # requests/urllib3 are only imported for real runs (--dry-run and --help start fast)
+    import http_pool
+    http_pool.configure(pool_maxsize=max(http_pool.POOL_MAXSIZE, args.workers))
+    if args.metrics or args.trace:
+        metrics.enable()
+    try:
+        strategies = StrategyStats()
+        searches = SearchCache(refresh=args.refresh, offline=args.offline)
+        results = Pipeline(args.workers, ResolvedUrls(refresh=args.refresh), strategies,
+                           searches).run(nodes)
+    except KeyboardInterrupt:
+        print("\nInterrupted - progress is kept in the job journal, run again to resume.")
+        return 130
+
+    counts = {}
+    for _, status, _, _ in results:
+        counts[status] = counts.get(status, 0) + 1
+    ready = sum(counts.get(s, 0) for s in ("OK", "UNCHANGED", "SKIP", "COPIED"))
+    failed = sorted(t.filename for t, status, _, _ in results if status in ("FAILED", "ERROR"))
+
+    print(f"\n{'='*50}")
+    print(f"Result: {ready}/{slots} ready "
+          f"({', '.join(f'{k.lower()} {v}' for k, v in sorted(counts.items()))})")
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+    print(f"{'='*50}\n")
+    strategies.print_summary()
+    http_pool.print_stats()
+    metrics.write_report(args.metrics, args.metrics_out, args.trace)
+
+    if args.store:
+        from asset_store import AssetStore
+        store = AssetStore()
+        ready = [t for t, status, _, _ in results if status not in ("FAILED", "ERROR")]
+        for target in ready:
+            url = HttpCache(target.directory).url_for(target.filename)
+            store.ingest(target.filepath, url=url)
+        store.save()
+        print(f"\nStored {len(ready)} images as {len({store.names[store.name_for(t.filepath)] for t in ready})} blobs")
+
+    ready_paths = [t.filepath for t, status, _, _ in results if status not in ("FAILED", "ERROR")]
+    if args.optimize:
+        import optimize_images
+        print(f"\nOptimizing {len(ready_paths)} images\n")
+        optimize_images.optimize_paths(ready_paths)
+
+    import placeholders
+    count = placeholders.compute_paths(ready_paths)
+    if count is not None:
+        print(f"\nPlaceholders: {count} images (placeholders.py writes them into the articles)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
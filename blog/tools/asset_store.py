@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store for the blog images.
+============================================
+Every downloaded image is kept once as a blob named by the SHA-256 of its
+bytes (.asset-store/blobs/ab/abcd....jpg next to this script). The files
+the articles use (blog/images/...) become hard links to those blobs, so a
+photo used under several names, articles or manifest rounds exists once on
+disk. The store is local and not committed - git and the deploy only see
+the normal files.
+
+Near-duplicates - the same Pexels photo fetched at w=940 and w=1200, or a
+re-encoded copy - are found by a perceptual hash (dHash, needs Pillow);
+`dupes --link` points all names of such a group at the largest version.
+`gc` removes names and blobs that no HTML page and no manifest references.
+
+Usage:
+  python3 asset_store.py ingest ../images/date-ideas
+  python3 asset_store.py dupes
+  python3 asset_store.py dupes --link
+  python3 asset_store.py gc --dry-run
+  python3 asset_store.py gc
+  python3 asset_store.py stats
+
+Files are always replaced with os.replace(), never edited in place, so
+writing a new version of one name never changes another name's blob.
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import uuid
+
+from http_cache import sha256_file
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+SITE_ROOT = os.path.normpath(os.path.join(TOOLS_DIR, "..", ".."))
+STORE_DIR = os.path.join(TOOLS_DIR, ".asset-store")
+MANIFEST_GLOB = os.path.join(TOOLS_DIR, "manifests", "*.*")
+INDEX_FILE = "index.json"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".avif")
+DHASH_THRESHOLD = 6  # differing bits (of 64) that still count as the same photo
+
+# Attribute values in the HTML pages that can point at an image
+REFERENCE_RE = re.compile(r'\b(?:src|srcset|href|content|poster)\s*=\s*["\']([^"\']+)["\']', re.I)
+
+
+def dhash(path, size=8):
+    """64-bit difference hash of an image, or None without Pillow/on errors."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        with Image.open(path) as image:
+            small = image.convert("L").resize((size + 1, size), Image.LANCZOS)
+    except Exception:
+        return None
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            bits = (bits << 1) | (left > pixels[row * (size + 1) + col + 1])
+    return f"{bits:016x}"
+
+
+def hamming(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def image_dimensions(path):
+    import image_info
+    try:
+        return image_info.image_size(path)
+    except OSError:
+        return None
+
+
+class AssetStore:
+    """Blobs by SHA-256 plus an index of which site path uses which blob."""
+
+    def __init__(self, root=STORE_DIR, site_root=SITE_ROOT):
+        self.root = root
+        self.site_root = site_root
+        self.lock = threading.Lock()
+        self.blobs = {}   # sha256 -> {"ext", "size", "dhash", "width", "height", "urls"}
+        self.names = {}   # path relative to site_root -> sha256
+        index_path = os.path.join(root, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                data = json.load(f)
+            self.blobs = data.get("blobs", {})
+            self.names = data.get("names", {})
+
+    def save(self):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, INDEX_FILE)
+        with self.lock:
+            with open(path + ".part", "w") as f:
+                json.dump({"version": 1, "blobs": self.blobs, "names": self.names},
+                          f, indent=1, sort_keys=True)
+            os.replace(path + ".part", path)
+
+    # --- paths ------------------------------------------------------------
+
+    def blob_path(self, sha):
+        return os.path.join(self.root, "blobs", sha[:2], sha + self.blobs[sha]["ext"])
+
+    def name_for(self, path):
+        return os.path.relpath(os.path.abspath(path), self.site_root).replace(os.sep, "/")
+
+    def path_for(self, name):
+        return os.path.join(self.site_root, *name.split("/"))
+
+    # --- ingest / link ----------------------------------------------------
+
+    def ingest(self, path, url=None):
+        """Adds a file to the store and turns it into a hard link to its blob."""
+        sha = sha256_file(path)
+        ext = os.path.splitext(path)[1].lower()
+        with self.lock:
+            new = sha not in self.blobs
+            if new:
+                self.blobs[sha] = {"ext": ext, "size": os.path.getsize(path), "urls": []}
+            blob = self.blobs[sha]
+            if url and url not in blob["urls"]:
+                blob["urls"].append(url)
+        blob_path = self.blob_path(sha)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            _place(path, blob_path)
+        if new:
+            dims = image_dimensions(blob_path)
+            with self.lock:
+                blob["dhash"] = dhash(blob_path)
+                blob["width"], blob["height"] = dims or (None, None)
+        self.link(self.name_for(path), sha)
+        return sha
+
+    def link(self, name, sha):
+        """Points `name` at blob `sha` (hard link, copy if links are not possible)."""
+        path = self.path_for(name)
+        blob_path = self.blob_path(sha)
+        if not (os.path.exists(path) and os.path.samefile(path, blob_path)):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _place(blob_path, path)
+        with self.lock:
+            self.names[name] = sha
+
+    # --- duplicates -------------------------------------------------------
+
+    def duplicate_groups(self, threshold=DHASH_THRESHOLD):
+        """Lists of blob hashes that show the same photo, largest version first."""
+        hashed = [sha for sha in self.blobs if self.blobs[sha].get("dhash")]
+        parent = {sha: sha for sha in hashed}
+
+        def find(sha):
+            while parent[sha] != sha:
+                parent[sha] = parent[parent[sha]]
+                sha = parent[sha]
+            return sha
+
+        for i, a in enumerate(hashed):
+            for b in hashed[i + 1:]:
+                if hamming(self.blobs[a]["dhash"], self.blobs[b]["dhash"]) <= threshold:
+                    parent[find(a)] = find(b)
+
+        groups = {}
+        for sha in hashed:
+            groups.setdefault(find(sha), []).append(sha)
+        return [sorted(g, key=self._pixels, reverse=True) for g in groups.values() if len(g) > 1]
+
+    def _pixels(self, sha):
+        blob = self.blobs[sha]
+        return (blob.get("width") or 0) * (blob.get("height") or 0), blob["size"]
+
+    def names_of(self, sha):
+        return sorted(name for name, s in self.names.items() if s == sha)
+
+    # --- garbage collection -----------------------------------------------
+
+    def collect(self, referenced, dry_run=False):
+        """
+        Removes names nobody references (and their files), then blobs without
+        names. Returns (removed names, removed blobs, bytes freed).
+        """
+        dead_names = sorted(name for name in self.names if name not in referenced)
+        live = {self.names[n] for n in self.names if n in referenced}
+        dead_blobs = sorted(sha for sha in self.blobs if sha not in live)
+        freed = sum(self.blobs[sha]["size"] for sha in dead_blobs)
+        if dry_run:
+            return dead_names, dead_blobs, freed
+
+        for name in dead_names:
+            path = self.path_for(name)
+            if os.path.exists(path) and os.path.samefile(path, self.blob_path(self.names[name])):
+                os.remove(path)
+            del self.names[name]
+        for sha in dead_blobs:
+            blob_path = self.blob_path(sha)
+            if os.path.exists(blob_path):
+                os.remove(blob_path)
+            del self.blobs[sha]
+        return dead_names, dead_blobs, freed
+
+
+def _place(source, destination):
+    """Hard-links `source` to `destination` atomically (copies across devices)."""
+    tmp_path = os.path.join(os.path.dirname(destination),
+                            f".{os.path.basename(destination)}.{uuid.uuid4().hex[:8]}.part")
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+
+def html_references(site_root=SITE_ROOT):
+    """Site-relative paths of every local file an HTML page points at."""
+    refs = set()
+    for dirpath, dirnames, filenames in os.walk(site_root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".") and d not in ("tools", "dist")]
+        for filename in filenames:
+            if not filename.endswith(".html"):
+                continue
+            page = os.path.join(dirpath, filename)
+            with open(page, encoding="utf-8", errors="replace") as f:
+                text = f.read()
+            for match in REFERENCE_RE.finditer(text):
+                for candidate in match.group(1).split(","):
+                    url = candidate.strip().split(" ")[0].split("#")[0].split("?")[0]
+                    if not url or re.match(r"^[a-z][a-z0-9+.-]*:|^//", url, re.I):
+                        continue
+                    base = site_root if url.startswith("/") else dirpath
+                    path = os.path.normpath(os.path.join(base, url.lstrip("/")))
+                    refs.add(os.path.relpath(path, site_root).replace(os.sep, "/"))
+    return refs
+
+
+def manifest_references(paths, site_root=SITE_ROOT):
+    """Site-relative paths of every target in the given pipeline manifests."""
+    from asset_pipeline import plan
+    return {os.path.relpath(t.filepath, site_root).replace(os.sep, "/")
+            for node in plan(paths) for t in node.targets}
+
+
+def image_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+                files.extend(os.path.join(dirpath, f) for f in sorted(filenames)
+                             if f.lower().endswith(IMAGE_EXTENSIONS))
+        elif path.lower().endswith(IMAGE_EXTENSIONS):
+            files.append(path)
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Content-addressed store for blog images")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="Add images and replace them with links into the store")
+    ingest.add_argument("paths", nargs="+", help="Image files or directories")
+    dupes = sub.add_parser("dupes", help="List near-duplicate images (perceptual hash)")
+    dupes.add_argument("--threshold", type=int, default=DHASH_THRESHOLD)
+    dupes.add_argument("--link", action="store_true",
+                       help="Point every name of a group at its largest version")
+    gc = sub.add_parser("gc", help="Remove images no HTML page or manifest references")
+    gc.add_argument("--dry-run", action="store_true")
+    gc.add_argument("--manifests", nargs="*", default=None,
+                    help=f"Manifests to keep (default: {os.path.relpath(MANIFEST_GLOB)})")
+    sub.add_parser("stats", help="Blob and name counts")
+    args = parser.parse_args(argv)
+
+    store = AssetStore()
+
+    if args.command == "ingest":
+        files = image_files(args.paths)
+        for path in files:
+            sha = store.ingest(path)
+            print(f"  {sha[:12]}  {store.name_for(path)}")
+        store.save()
+        print(f"\n{len(files)} files, {len(store.blobs)} blobs in the store")
+
+    elif args.command == "dupes":
+        groups = store.duplicate_groups(args.threshold)
+        if not any(blob.get("dhash") for blob in store.blobs.values()):
+            print("No perceptual hashes - install Pillow and ingest again.")
+        for group in groups:
+            keep = group[0]
+            print(f"\n  keep {keep[:12]} {store.blobs[keep].get('width')}x{store.blobs[keep].get('height')}"
+                  f"  {', '.join(store.names_of(keep))}")
+            for sha in group[1:]:
+                blob = store.blobs[sha]
+                print(f"   dup {sha[:12]} {blob.get('width')}x{blob.get('height')}"
+                      f"  {', '.join(store.names_of(sha))}")
+                if args.link:
+                    if blob["ext"] != store.blobs[keep]["ext"]:
+                        print("       (different format, not linked)")
+                        continue
+                    for name in store.names_of(sha):
+                        store.link(name, keep)
+        if args.link:
+            store.save()
+            print("\nLinked; run 'gc' to drop the blobs nobody uses any more.")
+        print(f"\n{len(groups)} duplicate groups")
+
+    elif args.command == "gc":
+        manifests = args.manifests if args.manifests is not None else sorted(glob.glob(MANIFEST_GLOB))
+        referenced = html_references() | manifest_references(manifests)
+        names, blobs, freed = store.collect(referenced, dry_run=args.dry_run)
+        for name in names:
+            print(f"  {'would remove' if args.dry_run else 'removed'} {name}")
+        if not args.dry_run:
+            store.save()
+        print(f"\n{len(names)} names, {len(blobs)} blobs, {freed:,} bytes "
+              f"{'would be freed' if args.dry_run else 'freed'}")
+
+    else:
+        stored = sum(blob["size"] for blob in store.blobs.values())
+        named = sum(store.blobs[sha]["size"] for sha in store.names.values())
+        print(f"{len(store.names)} names -> {len(store.blobs)} blobs, "
+              f"{stored:,} bytes stored for {named:,} bytes of files")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Synthetische Testdaten fuer die Benchmarks
+==========================================
+Erzeugt Amazon-aehnliche Produktseiten (Hunderte KB Skripte, Karussells,
+verschachtelte Divs) und Bild-Bytes, damit Parser und Downloader offline
+gemessen werden koennen. Echte, gespeicherte Seiten (z.B. per
+`curl -A "Mozilla/5.0" https://www.amazon.com/dp/ASIN > fixtures/amazon/ASIN.html`)
+werden von den Benchmarks bevorzugt, wenn vorhanden.
+"""
+
+import base64
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def amazon_page(asin, image_base="https://m.media-amazon.com/images/I/",
+                size_kb=400, seed=None, landing_image=True):
+    """Produktseite mit landingImage, hiRes-Skriptblock und og:image."""
+    rng = random.Random(seed if seed is not None else asin)
+    image_id = f"{asin}{rng.randrange(10**6):06d}"
+    thumb = f"{image_base}{image_id}._SX38_SY50_CR,0,0,38,50_.jpg"
+    hires = f"{image_base}{image_id}._AC_SL1500_.jpg"
+
+    def filler_script():
+        words = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(2000))
+        return f'<script type="text/javascript">var x{rng.randrange(10**9)}="{words}";</script>\n'
+
+    def carousel():
+        items = ''.join(
+            f'<li class="a-carousel-card"><div class="a-section"><a href="/dp/B{rng.randrange(10**8):08d}">'
+            f'<img alt="" src="https://images-na.ssl-images-amazon.com/images/G/01/x-locale/{rng.randrange(10**6)}.gif"'
+            f' data-a-dynamic-image="{{}}"></a><span class="a-size-small">Sponsored</span></div></li>'
+            for _ in range(20)
+        )
+        return f'<div class="a-carousel"><ol>{items}</ol></div>\n'
+
+    head = (
+        f'<!doctype html><html lang="en-us"><head><meta charset="utf-8">'
+        f'<title>Amazon.com: Product {asin}</title>\n'
+        f'<meta property="og:image" content="{thumb}">\n'
+    )
+    parts = [head]
+    target = size_kb * 1024
+    body_started = False
+    landing_done = False
+    size = len(head)
+    while size < target:
+        chunk = filler_script() if rng.random() < 0.5 else carousel()
+        if not body_started and size > target * 0.2:
+            chunk = '</head><body><div id="dp">\n' + chunk
+            body_started = True
+        if landing_image and not landing_done and size > target * 0.6:
+            chunk += (
+                f'<div id="imgTagWrapperId"><img alt="Product" src="{thumb}"'
+                f' data-old-hires="{hires}" id="landingImage"'
+                f' data-a-dynamic-image="{{&quot;{hires}&quot;:[1500,1500]}}"></div>\n'
+                f'<script type="text/javascript">P.when("A").register("ImageBlockATF", function(A){{'
+                f'var data = {{"colorImages": {{"initial": [{{"hiRes":"{hires}","thumb":"{thumb}"}}]}}}};'
+                f'return data;}});</script>\n'
+            )
+            landing_done = True
+        parts.append(chunk)
+        size += len(chunk)
+    if not body_started:
+        parts.append('</head><body><div id="dp">')
+    parts.append('</div></body></html>\n')
+    return ''.join(parts).encode('utf-8')
+
+
+TINY_JPEG = base64.b64decode(
+    "/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDABALDA4MChAODQ4SERATGCgaGBYWGDEjJR0oOjM9PDkzODdASFxOQERX"
+    "RTc4UG1RV19iZ2hnPk1xeXBkeFxlZ2P/2wBDARESEhgVGC8aGi9jQjhCY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2Nj"
+    "Y2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2P/wAARCAAQABADASIAAhEBAxEB/8QAFQABAQAAAAAAAAAAAAAAAAAA"
+    "AAP/xAAUEAEAAAAAAAAAAAAAAAAAAAAA/8QAFQEBAQAAAAAAAAAAAAAAAAAAAAX/xAAUEQEAAAAAAAAAAAAAAAAA"
+    "AAAA/9oADAMBAAIRAxEAPwCYAtv/2Q==")
+
+
+def captcha_page():
+    """Robot-Check-Seite, wie Amazon sie bei zu vielen Requests liefert."""
+    return (b'<!doctype html><html><head><title>Robot Check</title></head><body>'
+            b'<form action="/errors/validateCaptcha"><p>Enter the characters you see below</p>'
+            b'</form></body></html>')
+
+
+def jpeg_bytes(size, seed=0):
+    """
+    Gueltiges 16x16-JPEG (dekodierbar, besteht verify_images), per
+    COM-Segmenten mit Zufallsbytes auf die gewuenschte Groesse aufgefuellt.
+    """
+    rng = random.Random(seed)
+    filler = bytes(rng.randrange(256) for _ in range(4096))
+    segments = []
+    missing = size - len(TINY_JPEG)
+    while missing >= 4:
+        length = min(missing - 2, 0xFFFF)  # Laengenfeld zaehlt sich selbst mit
+        body = (filler * (length // len(filler) + 1))[:length - 2]
+        segments.append(b'\xff\xfe' + length.to_bytes(2, 'big') + body)
+        missing -= length + 2
+    # Rest unter 4 Bytes: Nullen nach dem EOI, wie manche Encoder sie schreiben
+    return TINY_JPEG[:2] + b''.join(segments) + TINY_JPEG[2:] + b'\x00' * max(missing, 0)
+
+
+def saved_pages(kind="amazon"):
+    """Pfade gespeicherter Seiten unter fixtures/<kind>/ (falls vorhanden)."""
+    directory = os.path.join(FIXTURE_DIR, kind)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.endswith('.html'))
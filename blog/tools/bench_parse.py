@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Parser-Benchmark fuer find_image_url
+====================================
+Misst pro Produktseite die Zeit fuer:
+  - DOM mit 'html.parser' (bisheriges Verhalten)
+  - DOM mit 'lxml' (falls installiert)
+  - Regex-Schnellpfad (find_image_url_fast)
+  - find_image_strategies (das, was der Downloader tatsaechlich nutzt)
+
+Nutzung:
+  python3 bench_parse.py                     # fixtures/amazon/*.html oder synthetisch
+  python3 bench_parse.py seite1.html ...     # gespeicherte Produktseiten
+  python3 bench_parse.py --repeat 20
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import bench_fixtures
+import product_page
+
+
+def time_call(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, result
+
+
+def bench_page(name, content, repeat):
+    variants = [('html.parser', lambda: product_page.find_image_url(product_page.parse(content, 'html.parser')))]
+    try:
+        import lxml  # noqa: F401
+        variants.append(('lxml', lambda: product_page.find_image_url(product_page.parse(content, 'lxml'))))
+    except ImportError:
+        pass
+    variants.append(('regex', lambda: product_page.find_image_url_fast(content)))
+    variants.append(('strategies', lambda: product_page.find_image_strategies(content)))
+
+    rows = []
+    baseline = None
+    for label, fn in variants:
+        ms, strategies = time_call(fn, repeat)
+        if baseline is None:
+            baseline = ms
+        first = strategies[0][0] if strategies else '-'
+        rows.append((label, ms, baseline / ms if ms else 0, first))
+
+    print(f"{name} ({len(content) / 1024:.0f} KB)")
+    for label, ms, speedup, first in rows:
+        print(f"  {label:12s} {ms:9.2f} ms   x{speedup:6.1f}   {first}")
+    print()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fuer find_image_url")
+    parser.add_argument('pages', nargs='*', help="Gespeicherte Produktseiten (.html)")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    pages = args.pages or bench_fixtures.saved_pages('amazon')
+    if pages:
+        inputs = [(os.path.basename(p), open(p, 'rb').read()) for p in pages]
+    else:
+        print("Keine gespeicherten Seiten gefunden - nutze synthetische Seiten.\n")
+        inputs = [(f"synthetic-{kb}kb", bench_fixtures.amazon_page(f"B0SYN{kb:05d}", size_kb=kb))
+                  for kb in (150, 400, 800)]
+
+    totals = {}
+    for name, content in inputs:
+        for label, ms, _, _ in bench_page(name, content, args.repeat):
+            totals[label] = totals.get(label, 0) + ms
+
+    baseline = totals.get('html.parser')
+    print("Summe ueber alle Seiten:")
+    for label, ms in totals.items():
+        print(f"  {label:12s} {ms:9.2f} ms   x{baseline / ms if ms else 0:6.1f}")
+
+
+if __name__ == '__main__':
+    main()
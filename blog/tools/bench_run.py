@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Benchmark-Runner fuer die Blog-Bild-Tools
+=========================================
+Startet den lokalen Fixture-Server (bench_server.py), laesst die echten
+Funktionen der Tools dagegen laufen und misst pro Szenario:
+
+  Durchsatz (Items/s), p50/p95-Latenz pro Item, uebertragene Bytes,
+  304-Antworten und Spitzen-Speicher (tracemalloc).
+
+Das Pexels-Szenario laeuft ueber asset_pipeline.py (Suche + Download pro Query).
+
+Nutzung:
+  python3 bench_run.py                         # Standard-Szenarien
+  python3 bench_run.py cold-100 flaky-host     # Auswahl
+  python3 bench_run.py --all --workers 16
+  python3 bench_run.py --json result.json      # Ergebnis speichern
+  python3 bench_run.py --compare result.json   # Regressionen melden (>20%)
+"""
+
+import argparse
+import contextlib
+import functools
+import importlib.util
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import asset_pipeline
+import http_pool
+import pexels
+from bench_server import FixtureServer, ServerConfig
+from http_cache import HttpCache
+from metrics import percentile
+from resolved_urls import ResolvedUrls
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Grundeinstellung: realistische Latenzen, Seiten ~400 KB, Bilder ~150 KB
+BASE_CONFIG = dict(page_latency=0.2, image_latency=0.1, api_latency=0.15)
+
+SCENARIOS = {
+    'cold-10':    dict(kind='products', count=10),
+    'warm-10':    dict(kind='products', count=10, warm=True),
+    'cold-100':   dict(kind='products', count=100),
+    'warm-100':   dict(kind='products', count=100, warm=True),
+    'cold-1000':  dict(kind='products', count=1000, config=dict(image_size=30_000)),
+    'slow-host':  dict(kind='products', count=20, config=dict(page_latency=1.5, image_latency=0.8)),
+    'flaky-host': dict(kind='products', count=50, config=dict(error_rate=0.15, captcha_rate=0.05)),
+    'pexels-10':  dict(kind='pexels', count=10),
+}
+DEFAULT_SCENARIOS = ['cold-10', 'warm-10', 'cold-100', 'slow-host', 'flaky-host', 'pexels-10']
+REGRESSION_THRESHOLD = 0.20
+
+
+@functools.lru_cache(maxsize=None)
+def load_tool(filename):
+    """Importiert ein Tool-Skript mit Bindestrich im Namen als Modul."""
+    name = filename.replace('-', '_').rsplit('.', 1)[0]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPT_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_products(server, count, workers, save_dir):
+    tool = load_tool(TOOLS['products'])
+    products = [{'url': f"{server.base_url}/dp/B0BENCH{i:04d}", 'filename': f"bench-{i:04d}.jpg"}
+                for i in range(count)]
+    cache = HttpCache(save_dir)
+    resolved = ResolvedUrls(os.path.join(save_dir, '.resolved-urls.json'))
+
+    def one(product):
+        start = time.perf_counter()
+        ok = tool.download_image(product, save_dir, log=lambda *_: None, cache=cache,
+                                 resolved=resolved)
+        return ok, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(one, products))
+    cache.save()
+    resolved.save()
+    return results
+
+
+def run_pexels(server, count, workers, save_dir):
+    pexels.PEXELS_API_URL = f"{server.base_url}/v1/search"
+    manifest = os.path.join(save_dir, 'bench-manifest.json')
+    with open(manifest, 'w') as f:
+        json.dump({'output_dir': '.', 'min_size': 5000, 'articles': [{'article': 'bench', 'images': [
+            {'pexels_search': f"couple benchmark {i}",
+             'filenames': [f"pexels-{i:03d}-a.jpg", f"pexels-{i:03d}-b.jpg"]}
+            for i in range(count)]}]}, f)
+
+    # Die Pipeline schreibt direkt auf stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = asset_pipeline.Pipeline(workers).run(asset_pipeline.plan([manifest]))
+    ready = ('OK', 'UNCHANGED', 'SKIP', 'COPIED')
+    return [(status in ready, seconds) for _, status, _, seconds in results]
+
+
+TOOLS = {'products': 'download-product-images.py'}
+RUNNERS = {'products': run_products, 'pexels': run_pexels}
+
+
+def run_scenario(name, spec, workers):
+    config = dict(BASE_CONFIG)
+    config.update(spec.get('config', {}))
+    save_dir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    runner = RUNNERS[spec['kind']]
+    try:
+        with FixtureServer(ServerConfig(**config)) as server:
+            http_pool.configure(pool_maxsize=max(http_pool.POOL_MAXSIZE, workers))
+            if spec.get('warm'):
+                # Vorlauf fuellt Ordner und Cache, gemessen wird der zweite Lauf
+                runner(server, spec['count'], workers, save_dir)
+                server.reset_counters()
+                http_pool.configure(pool_maxsize=max(http_pool.POOL_MAXSIZE, workers))
+
+            if spec['kind'] in TOOLS:
+                load_tool(TOOLS[spec['kind']])  # Import-Kosten nicht mitmessen
+            tracemalloc.start()
+            start = time.perf_counter()
+            results = runner(server, spec['count'], workers, save_dir)
+            wall = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            latencies = [t for _, t in results]
+            return {
+                'scenario': name,
+                'items': len(results),
+                'ok': sum(1 for ok, _ in results if ok),
+                'wall_s': wall,
+                'items_per_s': len(results) / wall if wall else 0,
+                'p50_ms': percentile(latencies, 50) * 1000,
+                'p95_ms': percentile(latencies, 95) * 1000,
+                'bytes': server.bytes_sent,
+                'requests': server.requests,
+                'not_modified': server.not_modified,
+                'peak_mem_mb': peak / 1024 / 1024,
+            }
+    finally:
+        shutil.rmtree(save_dir, ignore_errors=True)
+
+
+def print_table(rows):
+    print(f"{'Szenario':12s} {'OK':>9s} {'Wall s':>8s} {'Items/s':>8s} {'p50 ms':>8s} "
+          f"{'p95 ms':>8s} {'MB':>8s} {'304':>5s} {'Peak MB':>8s}")
+    for r in rows:
+        print(f"{r['scenario']:12s} {r['ok']:4d}/{r['items']:<4d} {r['wall_s']:8.2f} "
+              f"{r['items_per_s']:8.1f} {r['p50_ms']:8.0f} {r['p95_ms']:8.0f} "
+              f"{r['bytes'] / 1024 / 1024:8.2f} {r['not_modified']:5d} {r['peak_mem_mb']:8.2f}")
+
+
+def compare(rows, baseline_path):
+    """Meldet Verschlechterungen gegenueber einem gespeicherten Lauf."""
+    with open(baseline_path) as f:
+        baseline = {r['scenario']: r for r in json.load(f)['results']}
+    regressions = []
+    for r in rows:
+        old = baseline.get(r['scenario'])
+        if not old:
+            continue
+        for key in ('wall_s', 'p95_ms', 'bytes', 'peak_mem_mb'):
+            if old[key] and r[key] > old[key] * (1 + REGRESSION_THRESHOLD):
+                regressions.append(f"{r['scenario']}: {key} {old[key]:.2f} -> {r[key]:.2f}")
+        if r['ok'] < old['ok']:
+            regressions.append(f"{r['scenario']}: ok {old['ok']} -> {r['ok']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fuer die Blog-Bild-Tools")
+    parser.add_argument('scenarios', nargs='*', help=f"Auswahl aus: {', '.join(SCENARIOS)}")
+    parser.add_argument('--all', action='store_true', help="Alle Szenarien (inkl. cold-1000)")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--json', help="Ergebnis als JSON speichern")
+    parser.add_argument('--compare', help="Mit gespeichertem JSON vergleichen")
+    args = parser.parse_args()
+
+    names = list(SCENARIOS) if args.all else (args.scenarios or DEFAULT_SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        print(f"Unbekannte Szenarien: {', '.join(unknown)}")
+        sys.exit(1)
+
+    rows = []
+    for name in names:
+        print(f"  ... {name}", flush=True)
+        rows.append(run_scenario(name, SCENARIOS[name], args.workers))
+    print()
+    print_table(rows)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'workers': args.workers, 'results': rows}, f, indent=2)
+
+    if args.compare:
+        regressions = compare(rows, args.compare)
+        if regressions:
+            print("\nREGRESSIONEN:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\nKeine Regressionen.")
+
+
+if __name__ == '__main__':
+    main()
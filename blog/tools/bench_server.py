@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Lokaler Fixture-Server fuer die Benchmarks
+==========================================
+Spielt Amazon-Produktseiten, Pexels-Such-JSON und Bild-Bytes ab, damit
+download_image(), find_image_url() und search_pexels() ohne Amazon/Pexels
+gemessen werden koennen.
+
+Routen:
+  /dp/<ASIN>            Produktseite (fixtures/amazon/<ASIN>.html oder synthetisch)
+  /images/I/<name>      Produktbild (mit ETag -> 304 bei bedingten Requests)
+  /v1/search?query=...  Pexels-Suche (JSON wie api.pexels.com)
+  /photos/<id>.jpeg     Pexels-Bild
+
+Latenz und Fehler sind konfigurierbar, z.B. fuer langsame oder wackelige Hosts.
+
+Standalone:
+  python3 bench_server.py --port 8765 --page-latency 0.3 --error-rate 0.1
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote_plus, urlsplit
+
+import bench_fixtures
+
+
+class ServerConfig:
+    """Verhalten des Servers; kann zwischen Szenarien geaendert werden."""
+
+    def __init__(self, page_latency=0.0, image_latency=0.0, api_latency=0.0,
+                 error_rate=0.0, captcha_rate=0.0, image_size=150_000,
+                 page_size_kb=400, api_quota=200, seed=0):
+        self.page_latency = page_latency
+        self.image_latency = image_latency
+        self.api_latency = api_latency
+        self.error_rate = error_rate        # Anteil 503-Antworten
+        self.captcha_rate = captcha_rate    # Anteil Robot-Check-Seiten
+        self.image_size = image_size
+        self.page_size_kb = page_size_kb
+        self.api_quota = api_quota          # X-Ratelimit-Limit der Such-API
+        self.seed = seed
+
+
+class FixtureServer:
+    """
+    HTTP-Server mit Byte- und Request-Zaehlern. Laeuft als eigener Prozess,
+    damit CPU und Speicher des Servers die Messung der Tools nicht verfaelschen.
+    """
+
+    def __init__(self, config=None, host='127.0.0.1', port=0):
+        self.config = config or ServerConfig()
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self._pages = {}
+        self._images = {}
+        # Zaehler im Shared Memory, damit der Elternprozess sie lesen kann
+        self._counters = {name: multiprocessing.Value('q', 0, lock=False)
+                          for name in ('bytes_sent', 'requests', 'not_modified', 'errors',
+                                        'api_calls')}
+        handler = type('Handler', (_Handler,), {'fixture': self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._process = None
+
+    def __getattr__(self, name):
+        counters = self.__dict__.get('_counters', {})
+        if name in counters:
+            return counters[name].value
+        raise AttributeError(name)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_counters(self):
+        for value in self._counters.values():
+            value.value = 0
+
+    def start(self):
+        self._process = multiprocessing.get_context('fork').Process(
+            target=self.httpd.serve_forever, daemon=True)
+        self._process.start()
+        return self
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Inhalte ----------------------------------------------------------
+
+    def roll(self, rate):
+        with self._lock:
+            return self._rng.random() < rate
+
+    def count(self, nbytes, status):
+        with self._lock:
+            self._counters['requests'].value += 1
+            self._counters['bytes_sent'].value += nbytes
+            if status == 304:
+                self._counters['not_modified'].value += 1
+            elif status >= 500:
+                self._counters['errors'].value += 1
+
+    def page(self, asin):
+        saved = os.path.join(bench_fixtures.FIXTURE_DIR, 'amazon', f"{asin}.html")
+        if os.path.exists(saved):
+            with open(saved, 'rb') as f:
+                return f.read()
+        # Eine Vorlage pro Groesse, nur die ASIN wird ersetzt (spart CPU im Server)
+        size_kb = self.config.page_size_kb
+        if size_kb not in self._pages:
+            self._pages[size_kb] = bench_fixtures.amazon_page(
+                'B0TEMPLATE', image_base=f"{self.base_url}/images/I/", size_kb=size_kb)
+        return self._pages[size_kb].replace(b'B0TEMPLATE', asin.encode())
+
+    def image(self, name):
+        key = (name, self.config.image_size)
+        if key not in self._images:
+            seed = int(hashlib.md5(name.encode()).hexdigest()[:8], 16)
+            self._images[key] = bench_fixtures.jpeg_bytes(self.config.image_size, seed)
+        return self._images[key]
+
+    def search(self, query, per_page, page):
+        photos = []
+        for i in range(per_page):
+            photo_id = int(hashlib.md5(f"{query}:{page}:{i}".encode()).hexdigest()[:7], 16)
+            src = f"{self.base_url}/photos/{photo_id}.jpeg"
+            photos.append({
+                'id': photo_id,
+                'width': 6000 - 100 * i,
+                'height': 4000,
+                'photographer': f"Photographer {photo_id % 17}",
+                'src': {'original': src, 'large': f"{src}?h=650", 'medium': f"{src}?h=350"},
+            })
+        data = {'page': page, 'per_page': per_page, 'photos': photos, 'total_results': 500}
+        if page * per_page < data['total_results']:
+            data['next_page'] = (f"{self.base_url}/v1/search?query={quote_plus(query)}"
+                                 f"&per_page={per_page}&page={page + 1}")
+        return data
+
+    def quota_headers(self):
+        with self._lock:
+            self._counters['api_calls'].value += 1
+            remaining = max(0, self.config.api_quota - self._counters['api_calls'].value)
+        return {'X-Ratelimit-Limit': str(self.config.api_quota),
+                'X-Ratelimit-Remaining': str(remaining),
+                'X-Ratelimit-Reset': str(int(time.time()) + 3600)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    fixture = None  # wird in FixtureServer gesetzt
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status, body=b'', content_type='text/html', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+        self.fixture.count(len(body), status)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        fx = self.fixture
+        cfg = fx.config
+        url = urlsplit(self.path)
+
+        if url.path.startswith('/dp/'):
+            time.sleep(cfg.page_latency)
+            if fx.roll(cfg.error_rate):
+                return self.send(503, b'Service Unavailable')
+            if fx.roll(cfg.captcha_rate):
+                return self.send(200, bench_fixtures.captcha_page())
+            return self.send(200, fx.page(url.path[4:].strip('/')))
+
+        if url.path.startswith('/images/') or url.path.startswith('/photos/'):
+            time.sleep(cfg.image_latency)
+            if fx.roll(cfg.error_rate):
+                return self.send(503, b'Service Unavailable')
+            body = fx.image(url.path)
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if self.headers.get('If-None-Match') == etag:
+                return self.send(304, headers={'ETag': etag})
+            return self._send_range(body, etag)
+
+        if url.path == '/v1/search':
+            time.sleep(cfg.api_latency)
+            if fx.roll(cfg.error_rate):
+                return self.send(429, b'{"error": "rate limited"}', 'application/json',
+                                 {'Retry-After': '1'})
+            qs = parse_qs(url.query)
+            data = fx.search(qs.get('query', [''])[0], int(qs.get('per_page', ['15'])[0]),
+                             int(qs.get('page', ['1'])[0]))
+            return self.send(200, json.dumps(data).encode(), 'application/json',
+                             fx.quota_headers())
+
+        self.send(404, b'Not Found')
+
+    def _send_range(self, body, etag):
+        """Beantwortet `Range: bytes=N-` mit 206 (bei passendem If-Range), sonst 200."""
+        headers = {'ETag': etag, 'Accept-Ranges': 'bytes'}
+        range_header = self.headers.get('Range', '')
+        if_range = self.headers.get('If-Range')
+        if (range_header.startswith('bytes=') and range_header.endswith('-')
+                and if_range in (None, etag)):
+            start = range_header[6:-1]
+            if start.isdigit() and int(start) < len(body):
+                start = int(start)
+                headers['Content-Range'] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+                return self.send(206, body[start:], 'image/jpeg', headers)
+        return self.send(200, body, 'image/jpeg', headers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokaler Fixture-Server")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--page-latency', type=float, default=0.0)
+    parser.add_argument('--image-latency', type=float, default=0.0)
+    parser.add_argument('--api-latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--captcha-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = ServerConfig(args.page_latency, args.image_latency, args.api_latency,
+                          args.error_rate, args.captcha_rate)
+    server = FixtureServer(config, port=args.port)
+    print(f"Fixture-Server laeuft auf {server.base_url} (Strg+C zum Beenden)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Build der Website nach dist/
+============================
+Die Seiten bleiben von Hand geschrieben und lesbar; ausgeliefert wird eine
+gebaute Kopie in dist/:
+
+  Fingerprints   Bilder, CSS & Co., auf die eine Seite verweist, bekommen den
+                 Inhalts-Hash in den Namen (article-styles.3f9a0c12d4.css) und
+                 alle Verweise (src, srcset, href, CSS url()) werden
+                 umgeschrieben. Diese Dateien aendern sich nie mehr und
+                 duerfen mit "Cache-Control: immutable" ausgeliefert werden
+                 (Liste in dist/_headers). Die HTML-Seiten selbst nicht.
+                 Achtung: _headers versteht nur Netlify bzw. Cloudflare
+                 Pages. GitHub Pages (hier per CNAME) ignoriert die Datei
+                 und schickt fuer alles max-age=600; dort bleibt nur, dass
+                 eine geaenderte Datei eine neue URL bekommt und kein
+                 Browser eine veraltete Version aus dem Cache nimmt.
+  Critical CSS   Regeln aus verlinkten Stylesheets, die der Anfang der Seite
+                 (ABOVE_FOLD_CHARS Zeichen ab <body>) braucht, landen inline
+                 im <head>; das ganze Stylesheet laedt per rel="preload"
+                 nach und blockiert das Rendern nicht mehr.
+  Minify         Kommentare und Leerraum in HTML und CSS raus. <script>,
+                 <pre> und <textarea> bleiben unveraendert (JSON-LD wird
+                 kompakt geschrieben).
+
+Inkrementell: dist/.build-index.json merkt sich pro Quelldatei Groesse,
+mtime und Hash und pro Ausgabe einen Schluessel aus Quelle + Fingerprints
+ihrer Abhaengigkeiten. Neu gebaut wird nur, was sich geaendert hat (oder
+wenn sich dieses Skript geaendert hat); veraltete Fingerprint-Dateien und
+Seiten ohne Quelle werden aus dist/ entfernt.
+
+Nutzung:
+  python3 build_site.py                 # nach ../../dist
+  python3 build_site.py --force         # alles neu bauen
+  python3 build_site.py --no-critical   # Stylesheets normal verlinken
+  python3 build_site.py --out /tmp/site
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import sys
+
+import html_tags
+from http_cache import sha256_file
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+SITE_ROOT = os.path.normpath(os.path.join(TOOLS_DIR, "..", ".."))
+DIST_DIR = os.path.join(SITE_ROOT, "dist")
+INDEX_FILE = ".build-index.json"
+SKIP_DIRS = ("dist", "tools", "node_modules")  # plus versteckte Ordner
+STATIC_FILES = ("CNAME", "robots.txt", "sitemap.xml", "logo.png")  # immer unter festem Namen
+HASH_LENGTH = 10
+ABOVE_FOLD_CHARS = 4000   # HTML ab <body>, das als erster Bildschirm gilt (Leerraum-Folge = 1 Zeichen)
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Attribute, deren Werte auf lokale Dateien zeigen koennen (wie asset_store.REFERENCE_RE,
+# aber ohne content= - og:image & Co. sind absolute URLs und bleiben stabil)
+REF_ATTR_RE = re.compile(r'(\s(?:src|srcset|href|poster)\s*=\s*)(["\'])([^"\']*)\2', re.I)
+CSS_URL_RE = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)', re.I)
+STYLESHEET_RE = re.compile(r'<link\b[^>]*>', re.I)
+PROTECTED_RE = re.compile(r'(<(script|style|pre|textarea)\b[^>]*>)(.*?)(</\2\s*>)', re.I | re.S)
+COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.S)
+BLOCK_TAGS = ("html|head|body|title|meta|link|script|style|noscript|div|section|article|"
+              "header|footer|nav|main|aside|p|h[1-6]|ul|ol|li|dl|dt|dd|table|thead|tbody|"
+              "tr|th|td|form|fieldset|figure|figcaption|blockquote|hr|br|!doctype")
+BLOCK_SPACE_RE = re.compile(r'\s*(</?(?:%s)\b[^>]*>)\s*' % BLOCK_TAGS, re.I)
+INTERACTIVE_RE = re.compile(r':(?:hover|focus|focus-within|focus-visible|active|visited|target|checked)\b')
+
+
+# --- Minify -----------------------------------------------------------------
+
+def minify_css(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    parts = re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', css)
+    for i in range(0, len(parts), 2):  # ungerade Indizes sind Strings
+        part = re.sub(r'\s+', ' ', parts[i])
+        part = re.sub(r'\s*([{};,>])\s*', r'\1', part)
+        parts[i] = re.sub(r':\s+', ':', part)
+    return ''.join(parts).strip().replace(';}', '}')
+
+
+def minify_html(text, css=minify_css):
+    """Kommentare und Leerraum raus; Inhalte von script/pre/textarea unveraendert, style per css()."""
+    protected = []
+
+    def protect(match):
+        open_tag, name, body, close_tag = match.groups()
+        name = name.lower()
+        if name == 'style':
+            body = css(body)
+        elif name == 'script' and (html_tags.get_attr(open_tag, 'type') or '').lower() == 'application/ld+json':
+            try:
+                body = json.dumps(json.loads(body), ensure_ascii=False, separators=(',', ':'))
+            except ValueError:
+                pass
+        protected.append(open_tag + body + close_tag)
+        return f'\x00{len(protected) - 1}\x00'
+
+    text = COMMENT_RE.sub('', PROTECTED_RE.sub(protect, text))
+    text = re.sub(r'\s+', ' ', text)
+    text = BLOCK_SPACE_RE.sub(r'\1', text).strip()
+    return re.sub(r'\x00(\d+)\x00', lambda m: protected[int(m.group(1))], text)
+
+
+# --- Verweise ---------------------------------------------------------------
+
+def resolve(url, base_dir):
+    """Site-relativer Pfad einer lokalen URL (base_dir site-relativ), sonst None."""
+    path = url.strip().split('#')[0].split('?')[0]
+    if not path or re.match(r'^[a-z][a-z0-9+.-]*:|^//', path, re.I):
+        return None
+    if path.startswith('/'):
+        return posixpath.normpath(path.lstrip('/'))
+    return posixpath.normpath(posixpath.join(base_dir, path))
+
+
+def _split_srcset(value):
+    return [candidate.strip().split(' ')[0] for candidate in value.split(',') if candidate.strip()]
+
+
+def html_refs(text, base_dir):
+    """Alle lokalen Verweise einer Seite (Attribute und url() in <style>)."""
+    refs = set()
+    for match in REF_ATTR_RE.finditer(text):
+        for url in _split_srcset(match.group(3)):
+            refs.add(resolve(url, base_dir))
+    for match in CSS_URL_RE.finditer(text):
+        refs.add(resolve(match.group(2), base_dir))
+    refs.discard(None)
+    return refs
+
+
+def css_refs(css, base_dir):
+    return {ref for ref in (resolve(m.group(2), base_dir) for m in CSS_URL_RE.finditer(css)) if ref}
+
+
+def _fingerprinted_url(url, base_dir, outputs):
+    """url mit dem Fingerprint-Namen aus outputs {quelle: ausgabe}, Query/Fragment bleiben."""
+    ref = resolve(url, base_dir)
+    if ref not in outputs:
+        return url
+    split = re.search(r'[?#]', url)
+    path, rest = (url[:split.start()], url[split.start():]) if split else (url, '')
+    return posixpath.join(posixpath.dirname(path), posixpath.basename(outputs[ref])) + rest
+
+
+def rewrite_html_refs(text, base_dir, outputs):
+    def attr(match):
+        prefix, quote, value = match.groups()
+        if 'srcset' not in prefix.lower():
+            return f'{prefix}{quote}{_fingerprinted_url(value, base_dir, outputs)}{quote}'
+        rewritten = []
+        for candidate in value.split(','):
+            parts = candidate.strip().split(None, 1)
+            parts[0] = _fingerprinted_url(parts[0], base_dir, outputs)
+            rewritten.append(' '.join(parts))
+        return f'{prefix}{quote}{", ".join(rewritten)}{quote}'
+    return REF_ATTR_RE.sub(attr, text)
+
+
+def rewrite_css_urls(css, base_dir, outputs, target_dir=None):
+    """url() auf Fingerprint-Namen; mit target_dir zusaetzlich relativ zu einem anderen Ordner."""
+    def url(match):
+        ref = resolve(match.group(2), base_dir)
+        if ref is None:
+            return match.group(0)
+        if target_dir is None:
+            return f'url({_fingerprinted_url(match.group(2), base_dir, outputs)})'
+        return f'url({posixpath.relpath(outputs.get(ref, ref), target_dir or ".")})'
+    return CSS_URL_RE.sub(url, css)
+
+
+# --- Critical CSS -----------------------------------------------------------
+
+def css_blocks(css):
+    """Oberste Ebene eines (minifizierten) Stylesheets als [(prelude, body|None), ...]."""
+    blocks = []
+    i = 0
+    while i < len(css):
+        open_ = css.find('{', i)
+        if open_ < 0:
+            break
+        semi = css.find(';', i)
+        if 0 <= semi < open_ and css[i:semi].lstrip().startswith('@'):  # @import, @charset
+            blocks.append((css[i:semi].strip(), None))
+            i = semi + 1
+            continue
+        depth = 0
+        j = open_
+        while j < len(css):
+            if css[j] == '{':
+                depth += 1
+            elif css[j] == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+            j += 1
+        blocks.append((css[i:open_].strip(), css[open_ + 1:j]))
+        i = j + 1
+    return blocks
+
+
+def fold_offset(text):
+    """
+    Position, ab der ein Tag unterhalb des ersten Bildschirms liegt. Leerraum-Folgen
+    zaehlen als ein Zeichen, damit Quelle und minifizierte Seite gleich gemessen werden;
+    ebenso data:-URIs (Platzhalter aus placeholders.py verschieben den Bildschirm nicht).
+    """
+    start = max(text.lower().find('<body'), 0)
+    for count, match in enumerate(re.finditer(r'data:[\w/+.-]+;base64,[\w+/=]+|\s+|\S',
+                                              text[start:]), 1):
+        if count == ABOVE_FOLD_CHARS:
+            return start + match.start()
+    return len(text)
+
+
+def used_selectors(text):
+    """(Tags, Klassen, IDs) im ersten Bildschirm einer Seite."""
+    start = max(text.lower().find('<body'), 0)
+    fold = text[start:fold_offset(text)]
+    tags = {tag.lower() for tag in re.findall(r'<([a-zA-Z][\w-]*)', fold)} | {'html', 'body'}
+    classes = set()
+    for value in re.findall(r'\sclass\s*=\s*["\']([^"\']*)["\']', fold, re.I):
+        classes.update(value.split())
+    ids = set(re.findall(r'\sid\s*=\s*["\']([^"\']*)["\']', fold, re.I))
+    return tags, classes, ids
+
+
+def _selector_visible(selector, used):
+    if INTERACTIVE_RE.search(selector):
+        return False
+    simple = re.sub(r'::?[\w-]+(?:\([^)]*\))?', '', selector)
+    simple = re.sub(r'\[[^\]]*\]', '', simple)
+    tags, classes, ids = used
+    return (all(c in classes for c in re.findall(r'\.([\w-]+)', simple))
+            and all(i in ids for i in re.findall(r'#([\w-]+)', simple))
+            and all(t.lower() in tags for t in re.findall(r'(?:^|[\s>+~])([a-zA-Z][\w-]*)', simple)))
+
+
+def critical_css(css, used):
+    """Die Regeln aus css, die Elemente im ersten Bildschirm betreffen."""
+    kept = []
+    keyframes = []
+    for prelude, body in css_blocks(css):
+        if body is None:
+            kept.append(prelude + ';')
+        elif prelude.startswith(('@media', '@supports')):
+            inner = critical_css(body, used)
+            if inner:
+                kept.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@font-face'):
+            kept.append(f'{prelude}{{{body}}}')
+        elif re.match(r'@(?:-\w+-)?keyframes\b', prelude):
+            keyframes.append((prelude.split()[-1], f'{prelude}{{{body}}}'))
+        elif not prelude.startswith('@'):
+            selectors = [s for s in prelude.split(',') if _selector_visible(s, used)]
+            if selectors:
+                kept.append(f'{",".join(selectors)}{{{body}}}')
+    result = ''.join(kept)
+    return result + ''.join(block for name, block in keyframes if re.search(rf'\b{re.escape(name)}\b', result))
+
+
+def inline_critical(text, page_dir, stylesheets):
+    """
+    Ersetzt <link rel="stylesheet"> auf lokale CSS (stylesheets: {quelle: (css, ausgabe)})
+    durch <style>kritische Regeln</style> + preload, das nach dem Laden zum Stylesheet wird.
+    """
+    used = used_selectors(text)
+
+    def link(match):
+        tag = match.group(0)
+        if (html_tags.get_attr(tag, 'rel') or '').lower() != 'stylesheet':
+            return tag
+        href = html_tags.get_attr(tag, 'href') or ''
+        ref = resolve(href, page_dir)
+        if ref not in stylesheets:
+            return tag
+        css, output = stylesheets[ref]
+        # url() im Stylesheet sind relativ zur CSS-Datei, inline gelten sie relativ zur Seite
+        critical = rewrite_css_urls(critical_css(css, used), posixpath.dirname(output), {},
+                                    target_dir=page_dir)
+        preload = html_tags.set_attr(html_tags.set_attr(tag, 'rel', 'preload'), 'as', 'style')
+        preload = preload[:-1].rstrip() + ''' onload="this.onload=null;this.rel='stylesheet'">'''
+        return f'<style>{critical}</style>{preload}<noscript>{tag}</noscript>'
+    return STYLESHEET_RE.sub(link, text)
+
+
+# --- Build ------------------------------------------------------------------
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.part'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def fingerprint_name(rel, digest):
+    base, ext = posixpath.splitext(rel)
+    return f"{base}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def site_pages(site_root=SITE_ROOT):
+    pages = []
+    for dirpath, dirnames, filenames in os.walk(site_root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d not in SKIP_DIRS)
+        for filename in sorted(filenames):
+            if filename.endswith('.html'):
+                pages.append(os.path.relpath(os.path.join(dirpath, filename), site_root)
+                             .replace(os.sep, '/'))
+    return pages
+
+
+class SiteBuilder:
+    """Baut site_root nach out_dir; Zustand in out_dir/.build-index.json."""
+
+    def __init__(self, site_root=SITE_ROOT, out_dir=DIST_DIR, critical=True, force=False):
+        self.site_root = site_root
+        self.out_dir = out_dir
+        self.critical = critical
+        self.tool = _key(sha256_file(os.path.abspath(__file__)), critical)
+        self.index_path = os.path.join(out_dir, INDEX_FILE)
+        self.index = {'version': 1, 'tool': self.tool, 'files': {}, 'assets': {}, 'pages': {}}
+        if not force and os.path.exists(self.index_path):
+            try:
+                with open(self.index_path) as f:
+                    index = json.load(f)
+                if index.get('tool') == self.tool:
+                    self.index = index
+            except (OSError, ValueError):
+                pass
+        self.outputs = {}     # quelle -> fingerprint-ausgabe
+        self.css = {}         # css-quelle -> minifiziertes css (fuer Critical CSS)
+        self.stats = {'pages': 0, 'pages_skipped': 0, 'assets': 0, 'assets_skipped': 0,
+                      'bytes_in': 0, 'bytes_out': 0, 'removed': 0}
+
+    def source(self, rel):
+        return os.path.join(self.site_root, rel)
+
+    def target(self, rel):
+        return os.path.join(self.out_dir, rel)
+
+    def file_info(self, rel):
+        """Hash und Verweise einer Quelldatei; unveraenderte Dateien (Groesse, mtime) nicht neu lesen."""
+        stat = os.stat(self.source(rel))
+        cached = self.index['files'].get(rel)
+        if cached and cached['size'] == stat.st_size and cached['mtime'] == stat.st_mtime_ns:
+            return cached
+        info = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': sha256_file(self.source(rel))}
+        if rel.endswith(('.html', '.css')):
+            with open(self.source(rel), encoding='utf-8') as f:
+                text = f.read()
+            find = html_refs if rel.endswith('.html') else css_refs
+            info['refs'] = sorted(ref for ref in find(text, posixpath.dirname(rel))
+                                  if not ref.endswith('.html') and os.path.isfile(self.source(ref)))
+        self.index['files'][rel] = info
+        return info
+
+    def existing(self, info):
+        """Verweise aus dem Index koennen auf inzwischen geloeschte Dateien zeigen."""
+        return [ref for ref in info.get('refs', ()) if os.path.isfile(self.source(ref))]
+
+    def build_asset(self, rel, seen=()):
+        """Fingerprint-Datei fuer rel (CSS-Abhaengigkeiten zuerst); gibt den Ausgabepfad zurueck."""
+        if rel in self.outputs:
+            return self.outputs[rel]
+        info = self.file_info(rel)
+        refs = self.existing(info)
+        for ref in refs:
+            if ref not in seen:
+                self.build_asset(ref, seen + (rel,))
+        key = _key(info['sha256'], [(ref, self.outputs.get(ref)) for ref in refs])
+        previous = self.index['assets'].get(rel)
+        if previous and previous['key'] == key and os.path.exists(self.target(previous['output'])):
+            self.outputs[rel] = previous['output']
+            self.stats['assets_skipped'] += 1
+            return previous['output']
+
+        if rel.endswith('.css'):
+            with open(self.source(rel), encoding='utf-8') as f:
+                css = f.read()
+            data = minify_css(rewrite_css_urls(css, posixpath.dirname(rel), self.outputs)).encode()
+            self.stats['bytes_in'] += info['size']
+            self.stats['bytes_out'] += len(data)
+        else:
+            with open(self.source(rel), 'rb') as f:
+                data = f.read()
+        output = fingerprint_name(rel, hashlib.sha256(data).hexdigest())
+        _write(self.target(output), data)
+        _write(self.target(rel), data)  # fester Name fuer alte Seiten in Caches und absolute Links
+        if previous and previous['output'] != output:
+            _remove(self.target(previous['output']))
+            self.stats['removed'] += 1
+        self.index['assets'][rel] = {'key': key, 'output': output}
+        self.outputs[rel] = output
+        self.stats['assets'] += 1
+        return output
+
+    def stylesheet(self, rel):
+        if rel not in self.css:
+            with open(self.target(self.outputs[rel]), encoding='utf-8') as f:
+                self.css[rel] = f.read()
+        return self.css[rel], self.outputs[rel]
+
+    def build_page(self, rel):
+        info = self.file_info(rel)
+        refs = self.existing(info)
+        for ref in refs:
+            self.build_asset(ref)
+        key = _key(info['sha256'], [(ref, self.outputs[ref]) for ref in refs])
+        if self.index['pages'].get(rel) == key and os.path.exists(self.target(rel)):
+            self.stats['pages_skipped'] += 1
+            return
+        with open(self.source(rel), encoding='utf-8') as f:
+            text = f.read()
+        page_dir = posixpath.dirname(rel)
+        if self.critical:
+            stylesheets = {ref: self.stylesheet(ref) for ref in refs if ref.endswith('.css')}
+            text = inline_critical(text, page_dir, stylesheets)
+        text = rewrite_html_refs(text, page_dir, self.outputs)
+        text = minify_html(text, css=lambda css: minify_css(rewrite_css_urls(css, page_dir, self.outputs)))
+        data = text.encode('utf-8')
+        _write(self.target(rel), data)
+        self.index['pages'][rel] = key
+        self.stats['pages'] += 1
+        self.stats['bytes_in'] += info['size']
+        self.stats['bytes_out'] += len(data)
+
+    def copy_static(self, rel):
+        if not os.path.isfile(self.source(rel)) or rel in self.outputs:
+            return
+        info = self.file_info(rel)
+        if self.index['assets'].get(rel, {}).get('key') != info['sha256'] or not os.path.exists(self.target(rel)):
+            os.makedirs(os.path.dirname(self.target(rel)), exist_ok=True)
+            shutil.copyfile(self.source(rel), self.target(rel))
+            self.index['assets'][rel] = {'key': info['sha256'], 'output': rel}
+
+    def write_headers(self):
+        """
+        dist/_headers (Netlify/Cloudflare-Pages-Format): Fingerprint-Dateien sind
+        immutable. Wirkt nur dort - GitHub Pages liefert die Datei nicht aus und
+        setzt keine eigenen Header.
+        """
+        lines = [f"/{output}\n  Cache-Control: {IMMUTABLE}\n" for output in sorted(set(self.outputs.values()))]
+        data = ''.join(lines).encode()
+        path = self.target('_headers')
+        if not os.path.exists(path) or open(path, 'rb').read() != data:
+            _write(path, data)
+
+    def prune(self, pages):
+        """Seiten ohne Quelle und Eintraege zu geloeschten Dateien entfernen."""
+        for rel in set(self.index['pages']) - set(pages):
+            _remove(self.target(rel))
+            del self.index['pages'][rel]
+            self.stats['removed'] += 1
+        for rel in set(self.index['assets']) - set(self.outputs) - set(STATIC_FILES):
+            _remove(self.target(self.index['assets'][rel]['output']))
+            _remove(self.target(rel))
+            del self.index['assets'][rel]
+            self.stats['removed'] += 1
+        for rel in list(self.index['files']):
+            if not os.path.exists(self.source(rel)):
+                del self.index['files'][rel]
+
+    def build(self):
+        pages = site_pages(self.site_root)
+        for rel in pages:
+            self.build_page(rel)
+        for rel in STATIC_FILES:
+            self.copy_static(rel)
+        self.prune(pages)
+        self.write_headers()
+        self.index['tool'] = self.tool
+        os.makedirs(self.out_dir, exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+        return self.stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Website nach dist/ bauen (Minify, Critical CSS, Fingerprints)")
+    parser.add_argument('--out', default=DIST_DIR, help="Zielordner (Standard: dist/ im Site-Root)")
+    parser.add_argument('--force', action='store_true', help="Index ignorieren, alles neu bauen")
+    parser.add_argument('--no-critical', action='store_true',
+                        help="Stylesheets normal verlinken statt Critical CSS inline")
+    args = parser.parse_args(argv)
+
+    stats = SiteBuilder(out_dir=os.path.abspath(args.out), critical=not args.no_critical,
+                        force=args.force).build()
+    print(f"Seiten:  {stats['pages']} gebaut, {stats['pages_skipped']} unveraendert")
+    print(f"Assets:  {stats['assets']} gebaut, {stats['assets_skipped']} unveraendert")
+    if stats['removed']:
+        print(f"Entfernt: {stats['removed']} veraltete Dateien")
+    if stats['bytes_in']:
+        saved = 100 * (1 - stats['bytes_out'] / stats['bytes_in'])
+        print(f"HTML/CSS: {stats['bytes_in']:,} -> {stats['bytes_out']:,} bytes (-{saved:.0f}%)")
+    print(f"Ausgabe: {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
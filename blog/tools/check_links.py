@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Links und Assets aller Seiten pruefen
+=====================================
+Liest jede HTML-Seite genau einmal, sammelt alle Verweise (<a href>,
+<img src/srcset>, <link href>, <script src>, <source>, og:image) zu einem
+Verweis-Graphen und prueft jedes Ziel genau einmal:
+
+  lokal      Datei vorhanden? Ordner-Links brauchen eine index.html, #anker
+             eine passende id auf der Zielseite. URLs auf BASE_URL (canonical,
+             og:image) zaehlen als lokal.
+  extern     HEAD-Requests parallel ueber http_pool (Keep-Alive und Drosselung
+             pro Host aus host_limits.py); Hosts, die HEAD ablehnen, bekommen
+             ein GET ohne Body. Ergebnisse landen in .link-cache.json und
+             gelten CACHE_TTL lang - kaputte Links werden immer neu geprueft.
+
+Bericht: kaputte Verweise (mit Seite und Zeile), Weiterleitungen, Assets
+ueber OVERSIZED_BYTES und pro Seite das Gewicht aller Bilder (jeweils die
+src eines <img>, also das, was ein Browser ohne srcset laedt; externe
+Bilder per Content-Length).
+
+Nutzung:
+  python3 check_links.py                       # alle Seiten
+  python3 check_links.py ../index.html         # nur diese Seiten
+  python3 check_links.py --offline             # nur lokale Ziele
+  python3 check_links.py --refresh             # Cache ignorieren
+
+Exit-Code 1, wenn ein Verweis kaputt ist.
+"""
+
+import argparse
+import json
+import os
+import posixpath
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import html_tags
+import http_pool
+from build_site import SITE_ROOT, resolve, site_pages
+from sitemap import BASE_URL
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".link-cache.json")
+CACHE_TTL = 24 * 3600      # Sekunden; nur fuer erreichbare Ziele
+WORKERS = 8
+TIMEOUT = 15
+OVERSIZED_BYTES = 300 * 1024
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.avif', '.svg')
+HEAD_REFUSED = (403, 405, 501)   # dann GET mit stream=True
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Tag -> Attribute mit Verweisen
+REF_TAGS = {
+    'a': ('href',),
+    'img': ('src', 'srcset'),
+    'link': ('href',),
+    'script': ('src',),
+    'source': ('src', 'srcset'),
+    'iframe': ('src',),
+    'video': ('src', 'poster'),
+    'meta': ('content',),
+}
+TAG_RE = re.compile(r'<(%s)\b[^>]*>' % '|'.join(REF_TAGS), re.I)
+ID_RE = re.compile(r'\s(?:id|name)\s*=\s*["\']([^"\']+)["\']', re.I)
+SKIP_SCHEMES = ('mailto:', 'tel:', 'javascript:', 'data:', 'sms:')
+SKIP_RELS = ('preconnect', 'dns-prefetch')
+META_REFS = ('og:image', 'og:url', 'twitter:image')
+
+
+class Reference:
+    """Ein Verweis: Seite, Zeile, Tag/Attribut und Ziel (lokaler Pfad oder URL)."""
+
+    def __init__(self, page, line, tag, attr, url, target, fragment, image):
+        self.page = page
+        self.line = line
+        self.tag = tag
+        self.attr = attr
+        self.url = url
+        self.target = target        # site-relativer Pfad oder externe URL
+        self.fragment = fragment
+        self.image = image          # zaehlt zum Bildgewicht der Seite
+
+    @property
+    def external(self):
+        return self.target.startswith(('http://', 'https://'))
+
+
+def _target(url, page_dir):
+    """(Ziel, Fragment) fuer eine URL; None fuer mailto:, javascript: & Co."""
+    url = url.strip()
+    if not url or url.lower().startswith(SKIP_SCHEMES):
+        return None
+    if url.startswith('//'):
+        url = 'https:' + url
+    fragment = url.split('#', 1)[1] if '#' in url else ''
+    if url.startswith(BASE_URL):
+        url = '/' + url[len(BASE_URL):]
+    if url.startswith(('http://', 'https://')):
+        return url.split('#')[0], fragment
+    if url.startswith('#'):
+        return None if not fragment else ('', fragment)
+    return resolve(url, page_dir), fragment
+
+
+def parse_page(rel, text):
+    """Alle Verweise einer Seite und die ids, die sie als Anker anbietet."""
+    page_dir = posixpath.dirname(rel)
+    refs = []
+    for match in TAG_RE.finditer(text):
+        tag_name = match.group(1).lower()
+        tag = match.group(0)
+        if tag_name == 'link' and (html_tags.get_attr(tag, 'rel') or '').lower() in SKIP_RELS:
+            continue
+        if tag_name == 'meta' and (html_tags.get_attr(tag, 'property')
+                                   or html_tags.get_attr(tag, 'name')) not in META_REFS:
+            continue
+        line = text.count('\n', 0, match.start()) + 1
+        for attr in REF_TAGS[tag_name]:
+            value = html_tags.get_attr(tag, attr)
+            if not value:
+                continue
+            urls = ([c.strip().split()[0] for c in value.split(',') if c.strip()]
+                    if attr == 'srcset' else [value])
+            for url in urls:
+                resolved = _target(url, page_dir)
+                if resolved is None:
+                    continue
+                target, fragment = resolved
+                image = tag_name == 'img' and attr == 'src'
+                refs.append(Reference(rel, line, tag_name, attr, url, target or rel, fragment, image))
+    return refs, set(ID_RE.findall(text))
+
+
+class LinkCache:
+    """Ergebnisse externer Pruefungen mit TTL (nur erreichbare Ziele)."""
+
+    def __init__(self, path=CACHE_FILE, ttl=CACHE_TTL, refresh=False):
+        self.path = path
+        self.ttl = ttl
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.entries = json.load(f).get('entries', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, url):
+        if self.refresh:
+            return None
+        with self._lock:
+            entry = self.entries.get(url)
+        if not entry or time.time() - entry.get('checked', 0) > self.ttl:
+            return None
+        return entry
+
+    def put(self, url, result):
+        with self._lock:
+            if result['ok']:
+                self.entries[url] = dict(result, checked=int(time.time()))
+            else:
+                self.entries.pop(url, None)
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            self.entries = {url: entry for url, entry in self.entries.items()
+                            if now - entry.get('checked', 0) <= self.ttl}
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': 1, 'entries': self.entries}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
+def check_external(url):
+    """{'ok', 'status', 'redirect', 'size', 'error'} fuer eine externe URL."""
+    try:
+        resp = http_pool.head(url, headers=HEADERS, timeout=TIMEOUT, allow_redirects=True)
+        if resp.status_code in HEAD_REFUSED:
+            resp.close()
+            resp = http_pool.get(url, headers=HEADERS, timeout=TIMEOUT, allow_redirects=True,
+                                 stream=True)
+            resp.close()
+    except requests.RequestException as e:
+        return {'ok': False, 'status': None, 'redirect': None, 'size': None,
+                'error': type(e).__name__}
+    length = resp.headers.get('Content-Length')
+    return {
+        'ok': resp.status_code < 400,
+        'status': resp.status_code,
+        'redirect': resp.url if resp.history and resp.url != url else None,
+        'size': int(length) if length and length.isdigit() else None,
+        'error': None,
+    }
+
+
+def check_local(target, fragment, anchors):
+    """Wie check_external, fuer eine Datei im Site-Root."""
+    path = os.path.join(SITE_ROOT, target)
+    if os.path.isdir(path):
+        path = os.path.join(path, 'index.html')
+        target = posixpath.normpath(posixpath.join(target, 'index.html'))
+    if not os.path.isfile(path):
+        return {'ok': False, 'status': None, 'redirect': None, 'size': None, 'error': 'fehlt'}
+    if fragment and target in anchors and fragment not in anchors[target]:
+        return {'ok': False, 'status': None, 'redirect': None, 'size': os.path.getsize(path),
+                'error': f'kein Anker #{fragment}'}
+    return {'ok': True, 'status': None, 'redirect': None, 'size': os.path.getsize(path), 'error': None}
+
+
+def check_site(pages=None, offline=False, refresh=False, workers=WORKERS):
+    """(Verweise, Ergebnisse {ziel: ergebnis}, Seiten) fuer die angegebenen bzw. alle Seiten."""
+    all_pages = site_pages(SITE_ROOT)
+    pages = pages or all_pages
+    refs = []
+    anchors = {}
+    for rel in all_pages:  # Anker auch von Seiten, die nur verlinkt werden
+        with open(os.path.join(SITE_ROOT, rel), encoding='utf-8', errors='replace') as f:
+            page_refs, ids = parse_page(rel, f.read())
+        anchors[rel] = ids
+        if rel in pages:
+            refs.extend(page_refs)
+
+    results = {}
+    for ref in refs:
+        if not ref.external:
+            key = f'{ref.target}#{ref.fragment}' if ref.fragment else ref.target
+            if key not in results:
+                results[key] = check_local(ref.target, ref.fragment, anchors)
+
+    external = sorted({ref.target for ref in refs if ref.external})
+    if external and not offline:
+        cache = LinkCache(refresh=refresh)
+        todo = []
+        for url in external:
+            cached = cache.get(url)
+            if cached:
+                results[url] = cached
+            else:
+                todo.append(url)
+        if todo:
+            print(f"Pruefe {len(todo)} externe URLs ({len(external) - len(todo)} aus dem Cache) ...")
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for url, result in zip(todo, pool.map(check_external, todo)):
+                    results[url] = result
+                    cache.put(url, result)
+        cache.save()
+    return refs, results, pages
+
+
+def result_for(ref, results):
+    if ref.external:
+        return results.get(ref.target)
+    return results.get(f'{ref.target}#{ref.fragment}' if ref.fragment else ref.target)
+
+
+def report(refs, results, pages, oversized=OVERSIZED_BYTES):
+    """Druckt den Bericht; gibt die Anzahl kaputter Verweise zurueck."""
+    broken = [ref for ref in refs if result_for(ref, results) and not result_for(ref, results)['ok']]
+    redirected = [ref for ref in refs if (result_for(ref, results) or {}).get('redirect')]
+    heavy = {}
+    for ref in refs:
+        result = result_for(ref, results) or {}
+        is_asset = ref.image or ref.tag != 'a' and ref.target.lower().endswith(IMAGE_EXTENSIONS)
+        if is_asset and (result.get('size') or 0) > oversized:
+            heavy.setdefault(ref.target, (result['size'], ref))
+
+    if broken:
+        print(f"\nKaputt ({len(broken)}):")
+        for ref in broken:
+            result = result_for(ref, results)
+            reason = result['error'] or f"HTTP {result['status']}"
+            print(f"  {ref.page}:{ref.line}  <{ref.tag} {ref.attr}> {ref.url}  -> {reason}")
+    if redirected:
+        print(f"\nWeitergeleitet ({len(redirected)}):")
+        for ref in redirected:
+            print(f"  {ref.page}:{ref.line}  {ref.url}\n      -> {result_for(ref, results)['redirect']}")
+    if heavy:
+        print(f"\nZu gross (> {oversized // 1024} KB):")
+        for target, (size, ref) in sorted(heavy.items(), key=lambda item: -item[1][0]):
+            print(f"  {size / 1024:8.0f} KB  {target}  ({ref.page}:{ref.line})")
+
+    print(f"\n{'Seite':45s} {'Verweise':>8s} {'Bilder':>7s} {'Bild-KB':>9s} {'unbekannt':>9s}")
+    for page in pages:
+        page_refs = [ref for ref in refs if ref.page == page]
+        images = {ref.target: result_for(ref, results) for ref in page_refs if ref.image}
+        known = [r['size'] for r in images.values() if r and r.get('size') is not None]
+        print(f"{page:45s} {len(page_refs):8d} {len(images):7d} {sum(known) / 1024:9.0f} "
+              f"{len(images) - len(known):9d}")
+    return len(broken)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Links und Assets aller Seiten pruefen")
+    parser.add_argument('pages', nargs='*', help="HTML-Dateien (Standard: alle Seiten)")
+    parser.add_argument('--offline', action='store_true', help="externe URLs nicht pruefen")
+    parser.add_argument('--refresh', action='store_true', help="Cache fuer externe URLs ignorieren")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="parallele externe Checks")
+    args = parser.parse_args(argv)
+
+    pages = [os.path.relpath(os.path.abspath(p), SITE_ROOT).replace(os.sep, '/') for p in args.pages]
+    start = time.perf_counter()
+    try:
+        refs, results, pages = check_site(pages, offline=args.offline, refresh=args.refresh,
+                                          workers=args.workers)
+    finally:
+        http_pool.get_pool().close()
+    broken = report(refs, results, pages)
+    print(f"\n{len(refs)} Verweise, {len(results)} Ziele, {broken} kaputt "
+          f"({time.perf_counter() - start:.1f}s)")
+    return 1 if broken else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
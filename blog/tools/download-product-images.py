@@ -8,10 +8,15 @@ für Blog-Artikel auf anni.
 Nutzung:
   1. JSON-Datei:   python3 download-product-images.py products.json
   2. Inline:       PRODUCTS-Liste unten bearbeiten, dann: python3 download-product-images.py
+  3. Parallel:     python3 download-product-images.py products.json --workers 8
+  4. Lokalisieren: python3 download-product-images.py --localize ../valentines-day-gift-ideas.html
+  5. Neu aufloesen: python3 download-product-images.py products.json --refresh
+  6. Messen:       python3 download-product-images.py products.json --metrics json --trace trace.json
 
 Beispiel JSON-Datei (products.json):
 {
   "output_dir": "images",
+  "workers": 8,
   "products": [
     {
       "url": "https://www.amazon.com/dp/B0CGY4X222",
@@ -19,14 +24,70 @@ Beispiel JSON-Datei (products.json):
     }
   ]
 }
+
+Lokalisieren (--localize):
+  Sucht im Artikel alle <img> mit externer src (z.B. m.media-amazon.com),
+  laedt sie parallel nach <artikelordner>/images/<artikelname>/, erzeugt
+  mit optimize_images.py verkleinerte Varianten (falls Pillow installiert)
+  und schreibt die <img>-Tags auf die lokalen Dateien um - inkl. srcset,
+  width/height, loading="lazy", decoding="async" und einem unscharfen
+  Platzhalter (placeholders.py) als Hintergrund.
+
+Wiederholte Laeufe:
+  ETag/Last-Modified von Produktseiten und Bildern landen in
+  <output_dir>/.http-cache.json. Bekannte Dateien werden per bedingtem
+  Request geprueft und nur bei Aenderungen neu geladen.
+
+Aufgeloeste Bild-URLs:
+  Welche Bild-URL zu einer ASIN gehoert, steht 14 Tage lang in
+  tools/.resolved-urls.json (siehe resolved_urls.py) und gilt fuer alle
+  Artikel. Warme Laeufe laden dann keine Produktseite mehr, nur noch das
+  Bild (bedingt). --refresh laedt alle Produktseiten neu.
+
+Abgebrochene Laeufe:
+  <output_dir>/.download-journal.json haelt den Stand jedes Produkts fest
+  (siehe journal.py). Der naechste Lauf ueberspringt fertige Bilder, laedt
+  bekannte Bild-URLs ohne Produktseite und setzt halbe Downloads per Range
+  fort. Nach einem vollstaendigen Lauf wird das Journal geloescht.
+
+Strategien:
+  Die Produktseite wird nur so weit ausgewertet, bis eine Bild-URL gefunden
+  ist; die naechste Strategie laeuft erst, wenn deren Bild nicht ladbar ist.
+  tools/.strategy-stats.json zaehlt pro Domain Treffer, geladene Bilder und
+  Dauer jeder Strategie und bestimmt daraus die Reihenfolge (siehe
+  product_page.StrategyStats). Die Zusammenfassung steht am Ende des Laufs.
+
+Pruefung:
+  Ob ein Bild brauchbar ist, entscheidet verify_images.py am Inhalt (Typ,
+  Abmessungen, vollstaendig dekodierbar), nicht mehr an einer
+  Mindestgroesse. Vor jedem Lauf werden vorhandene Dateien geprueft
+  (Prozess-Pool, Ergebnisse in <output_dir>/.verified-images.json) und
+  kaputte neu geladen; ein neuer Download ersetzt die alte Datei nur,
+  wenn er die Pruefung besteht.
+
+Watch-Modus:
+  python3 watch.py --products products.json laeuft weiter und laedt nach
+  jedem Speichern nur neue oder geaenderte Produkte (siehe watch.py).
 """
 
 import os
 import sys
 import json
 import re
-import requests
-from bs4 import BeautifulSoup
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import image_info
+import metrics
+import verify_images
+from html_tags import find_img_tags, get_attr, replace_spans, set_attr
+from http_cache import HttpCache
+from journal import PAGE, PARTIAL, RESOLVED, Journal
+from product_page import (StrategyStats, is_captcha, iter_image_candidates, page_title,
+                          try_highres_url)
+from resolved_urls import ResolvedUrls
 
 # =============================================================================
 # KONFIGURATION - Nur diesen Block anpassen!
@@ -34,6 +95,8 @@ from bs4 import BeautifulSoup
 
 OUTPUT_DIR = "images"  # Relativer Ordner (wird neben diesem Skript erstellt)
 
+WORKERS = 1  # Anzahl paralleler Downloads (1 = nacheinander wie bisher)
+
 PRODUCTS = [
     # {"url": "https://www.amazon.com/dp/ASIN", "filename": "dein-dateiname.jpg"},
 ]
@@ -53,6 +116,16 @@ HEADERS = {
 }
 
 
+# --localize: Standard-Parallelitaet, src-Breite und sizes fuer umgeschriebene <img>
+LOCALIZE_WORKERS = 8
+LOCALIZE_HOSTS = ('m.media-amazon.com', 'images-na.ssl-images-amazon.com')  # leer = alle Hosts
+LOCALIZE_SRC_WIDTH = 800
+LOCALIZE_SIZES = "(max-width: 640px) 100vw, 400px"
+
+# Sorgt dafuer, dass die Log-Bloecke paralleler Downloads nicht vermischt werden
+PRINT_LOCK = threading.Lock()
+
+
 def get_script_dir():
     return os.path.dirname(os.path.abspath(__file__))
 
@@ -63,136 +136,446 @@ def ensure_dir(path):
         print(f"  Ordner erstellt: {path}")
 
 
-def try_highres_url(img_url):
+def fetch_image(url, filepath, min_size, cache=None, journal=None):
     """
-    Versucht aus einer Amazon-Thumbnail-URL eine hochaufgeloeste Version zu machen.
-    Amazon-Bild-URLs enthalten Groessen-Parameter wie ._SX38_ oder ._SS40_.
-    Wir ersetzen diese durch ._SL1500_ fuer maximale Aufloesung.
+    Streamt ein Bild atomar nach filepath, bedingt falls im Cache bekannt.
+    Mit `journal` bleibt ein abgebrochener Download als .part liegen und wird
+    im naechsten Lauf per Range fortgesetzt.
     """
-    # Pattern: ._XXNNN_ wobei XX = Buchstaben, NNN = Zahlen
-    highres = re.sub(r'\._[A-Z]{2}\d+_', '._SL1500_', img_url)
-    if highres != img_url:
-        return highres
+    import http_pool  # requests erst laden, wenn wirklich etwas geladen wird
+
+    headers = dict(HEADERS)
+    if cache:
+        headers.update(cache.validators(url, filepath))
+    if journal is None:
+        return http_pool.download_file(url, filepath, min_size=min_size,
+                                       headers=headers, timeout=15,
+                                       verify=verify_images.check_path)
+
+    key = os.path.basename(filepath)
+    entry = journal.get(key)
+    if_range = entry.get('validator') if entry.get('part_url') == url else None
 
-    # Alternativ: ._SCLZZZZZZZ_SXNNN_ Pattern
-    highres = re.sub(r'\._SCL[Z]+_SX\d+_', '._SL1500_', img_url)
-    if highres != img_url:
-        return highres
+    def started(response):
+        journal.mark(key, PARTIAL, part_url=url,
+                     validator=http_pool.resume_validator(response.headers))
 
-    return None
+    try:
+        return http_pool.download_file(url, filepath, min_size=min_size, headers=headers,
+                                       timeout=15, resumable=True, if_range=if_range,
+                                       on_response=started, verify=verify_images.check_path)
+    except BaseException:
+        part = http_pool.part_path(filepath)
+        if os.path.exists(part):
+            journal.mark(key, PARTIAL, bytes=os.path.getsize(part))
+        raise
 
 
-def find_image_url(soup):
+def fetch_highres(img_url, filepath, cache=None, journal=None, log=print):
+    """
+    Versucht die hochaufgeloeste Version - sie wird direkt zur finalen Datei,
+    statt erst geprobt und dann ein zweites Mal geladen zu werden.
+    Liefert (url, result) bzw. (img_url, None), wenn es sie nicht gibt.
     """
-    Sucht die Produktbild-URL mit mehreren Strategien (in Prioritaetsreihenfolge).
+    highres_url = try_highres_url(img_url)
+    if highres_url:
+        try:
+            with metrics.span('highres'):
+                result = fetch_image(highres_url, filepath, 1000, cache, journal)
+            if result.ok:
+                log(f"        Hochaufgeloest: ja")
+                return highres_url, result
+        except Exception:
+            pass  # Fallback auf Original-URL
+    return img_url, None
+
+
+def download_candidates(first, candidates, filepath, domain, strategies=None, cache=None,
+                        journal=None, log=print):
     """
-    strategies = []
-
-    # Strategie 1: Amazon landingImage (zuverlaessigstes Element)
-    img = soup.find('img', {'id': 'landingImage'})
-    if img:
-        # data-old-hires hat oft die hoechste Aufloesung
-        if img.get('data-old-hires'):
-            strategies.append(('landingImage[data-old-hires]', img['data-old-hires']))
-        if img.get('src'):
-            strategies.append(('landingImage[src]', img['src']))
-
-    # Strategie 2: hiRes aus dem JavaScript-Daten-Block
-    scripts = soup.find_all('script', string=re.compile(r'"hiRes"\s*:'))
-    for script in scripts:
-        matches = re.findall(r'"hiRes"\s*:\s*"([^"]+)"', script.string or '')
-        for match in matches:
-            if 'm.media-amazon.com' in match or 'images-na.ssl-images-amazon.com' in match:
-                strategies.append(('hiRes-script', match))
-                break
+    Laedt das Bild des ersten Kandidaten (quelle, url); erst wenn das scheitert,
+    wertet `candidates` (product_page.iter_image_candidates) die naechste
+    Strategie aus. Liefert (quelle, original_url, geladene_url, result) des
+    letzten Versuchs.
+    """
+    import requests
+
+    key = os.path.basename(filepath)
+    strategy_name, img_url = first
+    while True:
+        log(f"        Quelle: {strategy_name}")
+        if journal:
+            journal.mark(key, RESOLVED, image_url=img_url)
+        original_url = img_url
+        error = None
+        try:
+            img_url, result = fetch_highres(img_url, filepath, cache, journal, log)
+            if result is None:
+                with metrics.span('image'):
+                    result = fetch_image(img_url, filepath, 100, cache, journal)
+        except requests.RequestException as e:
+            result, error = None, e
+        ok = result is not None and (result.written or result.not_modified)
         if strategies:
-            break
-
-    # Strategie 3: Open Graph meta tag (funktioniert auch auf nicht-Amazon-Seiten)
-    meta = soup.find('meta', property='og:image')
-    if meta and meta.get('content'):
-        strategies.append(('og:image', meta['content']))
-
-    # Strategie 4: Erstes grosses Amazon-CDN-Bild im HTML
-    for img in soup.find_all('img'):
-        src = img.get('src', '') or ''
-        if 'm.media-amazon.com/images/I/' in src:
-            strategies.append(('media-amazon-scan', src))
-            break
-
-    return strategies
-
-
-def download_image(product, save_dir):
-    """Laedt ein einzelnes Produktbild herunter."""
-    filepath = os.path.join(save_dir, product['filename'])
+            strategies.downloaded(domain, strategy_name, ok)
+        if ok:
+            return strategy_name, original_url, img_url, result
+        with metrics.span('parse'):
+            following = next(candidates, None)
+        if following is None:
+            if error:
+                raise error
+            return strategy_name, original_url, img_url, result
+        reason = type(error).__name__ if error else (result.problem or f"HTTP {result.status_code}")
+        log(f"        Bild nicht ladbar ({reason}) - naechste Strategie")
+        strategy_name, img_url = following
+
+
+def fetch_page(product, page_entry=None, cache=None):
+    """Produktseite laden, bedingt falls die Bild-URL schon im Cache steht."""
+    import http_pool
+
+    page_headers = dict(HEADERS)
+    if page_entry and page_entry.get('image_url'):
+        page_headers.update(cache.validators(product['url']))
+    return http_pool.get(product['url'], headers=page_headers, timeout=20)
+
+
+def download_image(product, save_dir, log=print, cache=None, journal=None, resolved=None,
+                   strategies=None, replace=False):
+    """
+    Laedt ein einzelnes Produktbild herunter.
+    Alle Ausgaben laufen ueber `log`, damit parallele Downloads ihre Zeilen
+    sammeln und am Stueck ausgeben koennen.
+    Mit `cache` (HttpCache) werden Produktseite und Bild bedingt angefragt;
+    bei 304 entfallen Parsen und Download.
+    Mit `journal` (Journal) setzt ein neuer Lauf dort an, wo der letzte
+    abgebrochen ist.
+    Mit `resolved` (ResolvedUrls) entfaellt die Produktseite ganz, solange
+    die Bild-URL des Produkts dort noch gueltig ist.
+    Mit `strategies` (StrategyStats) laufen die Strategien in der Reihenfolge,
+    die fuer die Domain bisher am schnellsten zu einem Bild gefuehrt hat.
+    Mit `replace` (watch.py: URL des Eintrags geaendert) wird eine vorhandene
+    Datei neu geladen statt uebersprungen.
+    """
+    import http_pool
+    import requests
 
-    if os.path.exists(filepath):
-        size = os.path.getsize(filepath)
-        if size > 100:  # Platzhalter-GIFs sind ~43 Bytes
-            print(f"  SKIP  {product['filename']} (existiert bereits, {size:,} bytes)")
-            return True
+    key = product['filename']
+    filepath = os.path.join(save_dir, key)
+    if journal and journal.is_verified(key) and not replace:
+        log(f"  SKIP  {key} (im abgebrochenen Lauf bereits fertig)")
+        return True
+    entry = journal.get(key) if journal else {}
+    page_entry = cache.get(product['url']) if cache else None
+
+    # Ohne Cache-Eintrag reicht, dass die Datei da ist: kaputte Dateien hat
+    # main() vorher per verify_images beiseitegelegt (.broken)
+    if page_entry is None and not entry.get('image_url') and os.path.exists(filepath) and not replace:
+        log(f"  SKIP  {key} (existiert bereits, {os.path.getsize(filepath):,} bytes)")
+        if journal:
+            journal.verified(key, filepath)
+        return True
 
-    print(f"  LOAD  {product['filename']}")
+    log(f"  LOAD  {key}")
 
+    result = None
+    hit = resolved.get(product['url']) if resolved and not entry.get('image_url') else None
     try:
-        response = requests.get(product['url'], headers=HEADERS, timeout=20)
-        if response.status_code != 200:
-            print(f"        HTTP {response.status_code} - Seite nicht erreichbar")
-            return False
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-        strategies = find_image_url(soup)
-
-        if not strategies:
-            title = soup.find('title')
-            title_text = (title.text.strip()[:60] + '...') if title else 'unbekannt'
-            print(f"        FEHLER: Kein Bild gefunden (Seite: {title_text})")
-            return False
-
-        # Beste Strategie nehmen
-        strategy_name, img_url = strategies[0]
-        print(f"        Quelle: {strategy_name}")
-
-        # Hochaufgeloeste Version versuchen
-        highres_url = try_highres_url(img_url)
-        if highres_url:
-            try:
-                hr_resp = requests.get(highres_url, headers=HEADERS, timeout=15)
-                if hr_resp.status_code == 200 and len(hr_resp.content) > 1000:
-                    img_url = highres_url
-                    print(f"        Hochaufgeloest: ja")
-            except Exception:
-                pass  # Fallback auf Original-URL
-
-        # Bild herunterladen
-        img_resp = requests.get(img_url, headers=HEADERS, timeout=15)
-        if img_resp.status_code != 200 or len(img_resp.content) < 100:
-            print(f"        FEHLER: Bild-Download fehlgeschlagen")
+        if entry.get('image_url'):
+            # Abgebrochener Lauf: Bild-URL ist bekannt, die Produktseite entfaellt
+            log(f"        Fortsetzen: Bild-URL aus dem Journal")
+            if entry.get('part_url'):
+                img_url = entry['part_url']  # halbe Datei zuerst fertig laden
+            else:
+                img_url, result = fetch_highres(entry['image_url'], filepath, cache, journal, log)
+        elif hit:
+            # Bild-URL bekannt -> Produktseite wird gar nicht erst geladen
+            img_url = hit['image_url']
+            log(f"        Quelle: {hit['strategy']} (URL-Cache)")
+            if journal:
+                journal.mark(key, RESOLVED, image_url=img_url)
+            if hit.get('highres_url'):
+                img_url, result = fetch_highres(img_url, filepath, cache, journal, log)
+        else:
+            with metrics.span('page'):
+                response = fetch_page(product, page_entry, cache)
+
+            if response.status_code == 304:
+                # Seite unveraendert -> aufgeloeste Bild-URL aus dem Cache
+                img_url = page_entry['image_url']
+                log(f"        Seite unveraendert (304)")
+                if resolved:
+                    resolved.put(product['url'], page_entry.get('strategy'), img_url)
+            else:
+                if response.status_code != 200:
+                    if is_captcha(response.content):
+                        http_pool.throttled(product['url'])  # Amazons 503-Robot-Seite
+                    log(f"        HTTP {response.status_code} - Seite nicht erreichbar")
+                    return False
+                if journal:
+                    journal.mark(key, PAGE)
+
+                domain = urlsplit(product['url']).hostname
+                candidates = iter_image_candidates(response.content, domain, strategies)
+                with metrics.span('parse'):
+                    first = next(candidates, None)
+
+                if first is None and is_captcha(response.content):
+                    # Amazon drosselt -> Host langsamer machen, Produkt schlaegt fehl
+                    http_pool.throttled(product['url'])
+                    log(f"        FEHLER: Captcha/Robot Check - Amazon drosselt, Rate wird reduziert")
+                    return False
+                if first is None:
+                    title = page_title(response.content)
+                    title_text = (title[:60] + '...') if title else 'unbekannt'
+                    log(f"        FEHLER: Kein Bild gefunden (Seite: {title_text})")
+                    return False
+
+                strategy_name, original_url, img_url, result = download_candidates(
+                    first, candidates, filepath, domain, strategies, cache, journal, log)
+                if result.written or result.not_modified:
+                    if resolved:
+                        resolved.put(product['url'], strategy_name, original_url,
+                                     highres_url=img_url if img_url != original_url else None)
+                    if cache:
+                        cache.update(product['url'], response, response.content,
+                                     image_url=img_url, strategy=strategy_name)
+
+        # Bild herunterladen (bedingt, falls die lokale Datei zum Cache passt)
+        if result is None:
+            with metrics.span('image'):
+                result = fetch_image(img_url, filepath, 100, cache, journal)
+        if result.not_modified:
+            size = os.path.getsize(filepath)
+            log(f"        SKIP  unveraendert (304, {size:,} bytes)")
+            if journal:
+                journal.verified(key, filepath)
+            return True
+        if not result.written:
+            problem = f" ({result.problem})" if result.problem else ""
+            log(f"        FEHLER: Bild-Download fehlgeschlagen{problem}")
+            if hit:
+                resolved.invalidate(product['url'])  # naechstes Mal Seite neu laden
+            if journal:
+                journal.mark(key, RESOLVED, part_url=None, validator=None)
             return False
 
-        with open(filepath, 'wb') as f:
-            f.write(img_resp.content)
-
-        size = os.path.getsize(filepath)
-        print(f"        OK ({size:,} bytes)")
+        if cache:
+            cache.record(img_url, result.headers, result.sha256, result.size,
+                         filename=key)
+        if journal:
+            journal.verified(key, filepath, result.sha256)
+        resumed = f", {result.resumed:,} davon fortgesetzt" if result.resumed else ""
+        log(f"        OK ({result.size:,} bytes{resumed})")
         return True
 
     except requests.Timeout:
-        print(f"        FEHLER: Timeout")
+        log(f"        FEHLER: Timeout")
         return False
     except Exception as e:
-        print(f"        FEHLER: {e}")
+        log(f"        FEHLER: {e}")
         return False
 
 
+def process_product(index, total, product, save_dir, cache=None, journal=None, resolved=None,
+                    strategies=None, replace=False):
+    """
+    Verarbeitet ein Produkt und gibt den gesammelten Log-Block erst am Ende
+    aus, damit sich die Zeilen paralleler Worker nicht vermischen.
+    """
+    lines = [f"[{index}/{total}] {product.get('filename', '???')}"]
+    with metrics.item(product.get('filename', '???')) as info:
+        ok = download_image(product, save_dir, log=lines.append, cache=cache, journal=journal,
+                            resolved=resolved, strategies=strategies, replace=replace)
+        info['ok'] = ok
+    lines.append('')
+    with PRINT_LOCK:
+        print('\n'.join(lines))
+    return ok
+
+
+def slugify(text, fallback):
+    slug = re.sub(r'[^a-z0-9]+', '-', (text or '').lower()).strip('-')[:60].strip('-')
+    return slug or fallback
+
+
+def plan_localization(html_text, hosts=LOCALIZE_HOSTS):
+    """Ordnet jeder externen <img>-URL einen lokalen Dateinamen zu (aus dem alt-Text)."""
+    files = {}
+    used = set()
+    for _, _, tag in find_img_tags(html_text):
+        src = get_attr(tag, 'src') or ''
+        if not src.startswith(('http://', 'https://')) or src in files:
+            continue
+        if hosts and urlsplit(src).hostname not in hosts:
+            continue
+        path = urlsplit(src).path
+        ext = os.path.splitext(path)[1].lower() or '.jpg'
+        fallback = slugify(os.path.splitext(os.path.basename(path))[0], 'bild')
+        base = slugify(get_attr(tag, 'alt'), fallback)
+        name, n = base + ext, 2
+        while name in used:
+            name, n = f"{base}-{n}{ext}", n + 1
+        used.add(name)
+        files[src] = name
+    return files
+
+
+def localize_article(html_path, workers=LOCALIZE_WORKERS, hosts=LOCALIZE_HOSTS):
+    """Ersetzt Hotlinks im Artikel durch lokale, optimierte Kopien."""
+    import http_pool
+    import placeholders
+    import requests
+
+    article_dir = os.path.dirname(os.path.abspath(html_path))
+    stem = os.path.splitext(os.path.basename(html_path))[0]
+    rel_dir = f"images/{stem}"
+    save_dir = os.path.join(article_dir, rel_dir)
+
+    with open(html_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    files = plan_localization(text, hosts)
+
+    print(f"\n{'='*60}")
+    print(f"Hotlinks lokalisieren: {os.path.basename(html_path)}")
+    print(f"{'='*60}")
+    print(f"Zielordner: {save_dir}")
+    print(f"Bilder:     {len(files)}")
+    print(f"{'='*60}\n")
+    if not files:
+        print("Keine externen Bilder gefunden.")
+        return
+    ensure_dir(save_dir)
+
+    cache = HttpCache(save_dir)
+
+    def fetch(item):
+        url, filename = item
+        filepath = os.path.join(save_dir, filename)
+        try:
+            with metrics.item(filename), metrics.span('image'):
+                result = fetch_image(url, filepath, 100, cache)
+        except requests.RequestException as e:
+            return url, None, str(e)
+        if result.written:
+            cache.record(url, result.headers, result.sha256, result.size, filename=filename)
+        if result.ok:
+            return url, filepath, None
+        return url, None, f"HTTP {result.status_code}"
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            fetched = list(pool.map(fetch, files.items()))
+    finally:
+        cache.save()
+
+    local = {}
+    for url, filepath, error in fetched:
+        if filepath:
+            local[url] = filepath
+            print(f"  OK     {os.path.basename(filepath)} ({os.path.getsize(filepath):,} bytes)")
+        else:
+            print(f"  FEHLER {url}: {error} (Hotlink bleibt)")
+
+    try:
+        import optimize_images
+        records = optimize_images.optimize_paths(list(local.values()), log=lambda *_: None)
+        prefix = f"{rel_dir}/{optimize_images.OPTIMIZED_DIR}/"
+        lqip = placeholders.PlaceholderCache()
+    except ImportError:
+        print("  Pillow nicht installiert - Bilder werden unoptimiert eingebunden")
+        records, lqip = {}, None
+
+    fit = placeholders.image_fit(text)
+    replacements = []
+    sizes = {}  # url -> (vorher, nachher)
+    for start, end, tag in find_img_tags(text):
+        src = get_attr(tag, 'src')
+        filepath = local.get(src)
+        if not filepath:
+            continue
+        record = records.get(filepath)
+        # Record ohne JPEG-Variante (z.B. nach geaenderten Formaten) wie kein Record
+        jpegs = sorted((v for v in record['variants'] if v['format'] == 'jpeg'),
+                       key=lambda v: v['width']) if record else []
+        if jpegs:
+            main = max((v for v in jpegs if v['width'] <= LOCALIZE_SRC_WIDTH),
+                       key=lambda v: v['width'], default=jpegs[0])
+            new = set_attr(tag, 'src', prefix + main['file'])
+            new = set_attr(new, 'srcset', optimize_images.srcset(record, 'jpeg', prefix))
+            new = set_attr(new, 'sizes', LOCALIZE_SIZES)
+            dimensions = (main['width'], main['height'])
+            served = main['bytes']
+        else:
+            new = set_attr(tag, 'src', f"{rel_dir}/{os.path.basename(filepath)}")
+            dimensions = image_info.image_size(filepath)
+            served = os.path.getsize(filepath)
+        if dimensions:
+            new = set_attr(new, 'width', dimensions[0])
+            new = set_attr(new, 'height', dimensions[1])
+        new = set_attr(new, 'loading', 'lazy')
+        new = set_attr(new, 'decoding', 'async')
+        uri = lqip.for_file(filepath) if lqip else None
+        if uri:
+            new = set_attr(new, 'style', placeholders.placeholder_style(uri, fit, get_attr(new, 'style')))
+        replacements.append((start, end, new))
+        sizes[src] = (os.path.getsize(filepath), served)
+
+    if lqip:
+        lqip.save()
+    tmp_path = html_path + '.part'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(replace_spans(text, replacements))
+    os.replace(tmp_path, html_path)
+
+    before = sum(b for b, _ in sizes.values())
+    after = sum(a for _, a in sizes.values())
+    print(f"\n{'='*60}")
+    print(f"ERGEBNIS: {len(replacements)} <img>-Tags umgeschrieben, {len(sizes)} Bilder lokal")
+    for url, (b, a) in sizes.items():
+        print(f"  {os.path.basename(local[url]):45s} {b:>10,} -> {a:>10,} bytes")
+    if before:
+        print(f"  {'GESAMT':45s} {before:>10,} -> {after:>10,} bytes "
+              f"(-{100 * (before - after) / before:.0f}%)")
+    print(f"{'='*60}")
+    http_pool.print_stats()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Blog-Produktbilder Downloader")
+    parser.add_argument('config', nargs='?', help="JSON-Datei mit output_dir/products")
+    parser.add_argument('--workers', type=int, default=None,
+                        help=f"Anzahl paralleler Downloads (Standard: {WORKERS})")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Produktseiten neu laden statt Bild-URLs aus dem URL-Cache zu nehmen")
+    parser.add_argument('--metrics', nargs='?', const='table', choices=['table', 'json'],
+                        help="Zeiten pro Phase messen: Tabelle, mit 'json' zusaetzlich JSON-Zeilen")
+    parser.add_argument('--metrics-out', metavar='DATEI',
+                        help="JSON-Zeilen in diese Datei statt auf stdout")
+    parser.add_argument('--trace', metavar='DATEI.json',
+                        help="Chrome-/Perfetto-Trace aller Phasen schreiben")
+    parser.add_argument('--localize', metavar='ARTIKEL.html',
+                        help="Externe <img> im Artikel herunterladen und lokal einbinden")
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    if args.metrics or args.trace:
+        metrics.enable()
+    if args.localize:
+        localize_article(args.localize, args.workers or LOCALIZE_WORKERS)
+        metrics.write_report(args.metrics, args.metrics_out, args.trace)
+        return
+
     products = PRODUCTS
     output_dir = OUTPUT_DIR
+    workers = WORKERS
 
     # JSON-Datei als Argument?
-    if len(sys.argv) > 1:
-        json_path = sys.argv[1]
+    if args.config:
+        json_path = args.config
         if not os.path.exists(json_path):
             print(f"Datei nicht gefunden: {json_path}")
             sys.exit(1)
@@ -200,13 +583,23 @@ def main():
             config = json.load(f)
         products = config.get('products', [])
         output_dir = config.get('output_dir', OUTPUT_DIR)
+        workers = config.get('workers', WORKERS)
+
+    # --workers auf der Kommandozeile hat Vorrang vor der JSON-Datei
+    if args.workers is not None:
+        workers = args.workers
+    workers = max(1, int(workers))
 
     if not products:
         print("Keine Produkte definiert!")
         print("Entweder PRODUCTS-Liste im Skript fuellen oder JSON-Datei uebergeben.")
-        print(f"Nutzung: python3 {os.path.basename(__file__)} [products.json]")
+        print(f"Nutzung: python3 {os.path.basename(__file__)} [products.json] [--workers N]")
         sys.exit(1)
 
+    import http_pool
+    import placeholders
+    http_pool.configure(pool_maxsize=max(http_pool.POOL_MAXSIZE, workers))
+
     # Ausgabe-Ordner relativ zum Skript-Verzeichnis
     save_dir = os.path.join(get_script_dir(), output_dir)
     ensure_dir(save_dir)
@@ -216,26 +609,60 @@ def main():
     print(f"{'='*60}")
     print(f"Zielordner: {save_dir}")
     print(f"Produkte:   {len(products)}")
+    print(f"Worker:     {workers}")
     print(f"{'='*60}\n")
 
-    success = 0
-    failed = []
-
-    for i, product in enumerate(products, 1):
-        print(f"[{i}/{len(products)}] {product.get('filename', '???')}")
-        if download_image(product, save_dir):
-            success += 1
-        else:
-            failed.append(product['filename'])
+    total = len(products)
+    cache = HttpCache(save_dir)
+    journal = Journal(save_dir)
+    resolved = ResolvedUrls(refresh=args.refresh)
+    strategies = StrategyStats()
+    broken = verify_images.verify_and_requeue(save_dir, [p['filename'] for p in products])
+    for name, reason in broken.items():
+        print(f"  KAPUTT  {name}: {reason} - wird neu geladen")
+    if broken:
         print()
+    done = journal.start([p['filename'] for p in products])
+    if journal.resuming:
+        print(f"Journal: Setze abgebrochenen Lauf fort ({done}/{total} bereits fertig)\n")
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        results = list(pool.map(
+            lambda item: process_product(item[0], total, item[1], save_dir, cache, journal,
+                                         resolved, strategies),
+            enumerate(products, 1),
+        ))
+    except KeyboardInterrupt:
+        print("\nAbgebrochen - laufende Downloads werden beendet, der Stand steht im Journal.")
+        print(f"Erneut starten setzt dort an: python3 {os.path.basename(__file__)} ...")
+        sys.exit(130)
+    finally:
+        try:
+            pool.shutdown(cancel_futures=True)
+        finally:
+            cache.save()
+            resolved.save()
+            strategies.save()
+            journal.finish()
+
+    success = sum(1 for ok in results if ok)
+    failed = [p['filename'] for p, ok in zip(products, results) if not ok]
 
     print(f"{'='*60}")
-    print(f"ERGEBNIS: {success}/{len(products)} erfolgreich")
+    print(f"ERGEBNIS: {success}/{total} erfolgreich")
     if failed:
         print(f"FEHLGESCHLAGEN:")
         for f in failed:
             print(f"  - {f}")
     print(f"{'='*60}")
+    count = placeholders.compute_paths(
+        [os.path.join(save_dir, p['filename']) for p, ok in zip(products, results) if ok])
+    if count:
+        print(f"Platzhalter: {count} Bilder (placeholders.py setzt sie in die Artikel)")
+    strategies.print_summary()
+    http_pool.print_stats()
+    metrics.write_report(args.metrics, args.metrics_out, args.trace)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,142 @@
+"""
+Drosselung pro Host fuer die Blog-Tools
+=======================================
+Jeder Host bekommt einen HostLimiter aus drei Teilen:
+
+  Token-Bucket     hoechstens `rate` Requests/s, kurze Spitzen bis `burst`
+  AIMD             jede Erfolgsantwort erhoeht die Rate ein kleines Stueck
+                   (additiv), 429, 503 mit Retry-After und Captcha-Seiten
+                   halbieren sie (multiplikativ) - so pendelt sich die Rate
+                   knapp unter der Grenze des Hosts ein. Andere 5xx sind
+                   Fehler, aber kein Zeichen fuer "zu schnell".
+  Circuit-Breaker  nach BREAKER_THRESHOLD Fehlern in Folge pausiert der Host
+                   (30s, dann doppelt so lange ...), danach darf genau ein
+                   Probe-Request durch. Wird die Pause laenger als
+                   BREAKER_MAX_PAUSE, gibt der Lauf den Host auf (HostUnavailable)
+                   statt den Rest des Batches zu verbrennen.
+
+http_pool.HostPool ruft acquire() vor und success()/throttled()/failure()
+nach jedem Request auf; Aufrufer melden Captcha-Seiten ueber
+http_pool.throttled(url).
+"""
+
+import threading
+import time
+
+import requests
+
+# Startrate, Burst, Unter- und Obergrenze (Requests/s) pro Host
+HOST_LIMITS = {
+    'www.amazon.com':  dict(rate=2.0, burst=2, min_rate=0.2, max_rate=5.0),
+    'amazon.com':      dict(rate=2.0, burst=2, min_rate=0.2, max_rate=5.0),
+    'api.pexels.com':  dict(rate=1.0, burst=3, min_rate=0.1, max_rate=3.0),
+}
+DEFAULT_LIMIT = dict(rate=50.0, burst=50, min_rate=1.0, max_rate=200.0)  # CDNs und Co.
+
+INCREASE = 0.05           # Requests/s mehr pro Erfolg
+DECREASE = 0.5            # Faktor bei 429/503/Captcha
+DECREASE_COOLDOWN = 2.0   # Sekunden; Fehler gleichzeitig laufender Requests zaehlen einmal
+BREAKER_THRESHOLD = 5     # Fehler in Folge bis zur Pause
+BREAKER_PAUSE = 30.0      # Sekunden, verdoppelt sich bei jedem erneuten Ausloesen
+BREAKER_MAX_PAUSE = 300.0
+
+
+class HostUnavailable(requests.ConnectionError):
+    """Der Circuit-Breaker hat den Host fuer diesen Lauf aufgegeben."""
+
+
+class HostLimiter:
+    """Token-Bucket mit AIMD-Rate und Circuit-Breaker fuer einen Host."""
+
+    def __init__(self, host, rate, burst, min_rate, max_rate):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0    # Retry-After oder offener Breaker
+        self.last_decrease = 0.0
+        self.failures = 0          # in Folge
+        self.pause = BREAKER_PAUSE
+        self.open = False
+        self.probing = False
+        self.gave_up = False
+        self.throttles = 0
+        self.trips = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blockiert, bis der naechste Request an diesen Host erlaubt ist."""
+        while True:
+            with self.lock:
+                if self.gave_up:
+                    raise HostUnavailable(f"{self.host} nach wiederholten Fehlern aufgegeben")
+                now = time.monotonic()
+                wait = self.paused_until - now
+                if wait <= 0 and self.open:
+                    if not self.probing:
+                        self.probing = True  # Halb offen: ein Probe-Request
+                        return
+                    wait = 0.5
+                if wait <= 0:
+                    self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + INCREASE)
+            self.failures = 0
+            if self.open:
+                self.open = self.probing = False
+                self.pause = BREAKER_PAUSE
+
+    def throttled(self, retry_after=None):
+        """429/503/Captcha: Rate halbieren, ggf. Retry-After abwarten."""
+        with self.lock:
+            now = time.monotonic()
+            self.throttles += 1
+            if now - self.last_decrease >= DECREASE_COOLDOWN:
+                self.rate = max(self.min_rate, self.rate * DECREASE)
+                self.tokens = min(self.tokens, 0.0)
+                self.last_decrease = now
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+        self.failure()
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or (not self.open and self.failures >= BREAKER_THRESHOLD):
+                self._trip()
+
+    def _trip(self):
+        if self.probing:
+            self.pause *= 2
+        if self.pause > BREAKER_MAX_PAUSE:
+            self.gave_up = True
+            print(f"    {self.host}: aufgegeben nach {self.failures} Fehlern in Folge")
+            return
+        self.open = True
+        self.probing = False
+        self.trips += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + self.pause)
+        print(f"    {self.host}: {self.failures} Fehler in Folge - Pause {self.pause:.0f}s")
+
+
+def limiter_for(host):
+    """Neuer HostLimiter mit den Grenzen aus HOST_LIMITS (ohne Port)."""
+    limits = HOST_LIMITS.get(host.split(':')[0].lower(), DEFAULT_LIMIT)
+    return HostLimiter(host, **limits)
+
+
+def retry_after_seconds(headers):
+    """Retry-After in Sekunden (nur die Sekunden-Form) oder None."""
+    value = (headers.get('Retry-After') or '').strip()
+    return float(value) if value.isdigit() else None
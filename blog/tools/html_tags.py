@@ -0,0 +1,59 @@
+"""
+Einzelne HTML-Tags lesen und umschreiben
+========================================
+Die Seiten sind von Hand geschrieben; ein Parser-Roundtrip (BeautifulSoup)
+wuerde Einrueckung und Attribut-Schreibweise veraendern. Deshalb werden nur
+die betroffenen Tags per Regex gefunden und gezielt Attribute gesetzt - der
+Rest der Datei bleibt Byte fuer Byte gleich.
+"""
+
+import html
+import re
+
+IMG_TAG_RE = re.compile(r'<img\b[^>]*>', re.I | re.S)
+ATTR_RE_TEMPLATE = r'(\s{name})(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+)))?(?=[\s/>])'
+
+
+def _attr_re(name):
+    return re.compile(ATTR_RE_TEMPLATE.format(name=re.escape(name)), re.I)
+
+
+def get_attr(tag, name):
+    """Attributwert (HTML-Entities dekodiert), '' fuer leere Attribute, None wenn nicht vorhanden."""
+    match = _attr_re(name).search(tag)
+    if not match:
+        return None
+    value = next((g for g in match.groups()[1:] if g is not None), '')
+    return html.unescape(value)
+
+
+def set_attr(tag, name, value):
+    """Setzt/ersetzt ein Attribut; value=None setzt ein boolsches Attribut ohne Wert."""
+    rendered = f' {name}' if value is None else f' {name}="{html.escape(str(value), quote=True)}"'
+    pattern = _attr_re(name)
+    if pattern.search(tag):
+        return pattern.sub(lambda m: rendered, tag, count=1)
+    if tag.endswith('/>'):
+        return tag[:-2].rstrip() + rendered + ' />'
+    return tag[:-1].rstrip() + rendered + '>'
+
+
+def remove_attr(tag, name):
+    return _attr_re(name).sub('', tag, count=1)
+
+
+def find_img_tags(text):
+    """Liste von (start, ende, tag) aller <img>-Tags in Dokumentreihenfolge."""
+    return [(m.start(), m.end(), m.group(0)) for m in IMG_TAG_RE.finditer(text)]
+
+
+def replace_spans(text, replacements):
+    """Ersetzt [(start, ende, neu), ...] in einem Durchgang (Positionen bleiben gueltig)."""
+    parts = []
+    last = 0
+    for start, end, new in sorted(replacements):
+        parts.append(text[last:start])
+        parts.append(new)
+        last = end
+    parts.append(text[last:])
+    return ''.join(parts)
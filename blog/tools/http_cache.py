@@ -0,0 +1,114 @@
+"""
+HTTP-Cache fuer wiederholte Laeufe der Bild-Downloader
+======================================================
+Speichert pro URL die Validatoren (ETag, Last-Modified) sowie Hash und Groesse
+der heruntergeladenen Datei in einer JSON-Datei im Ausgabeordner
+(`.http-cache.json`). Beim naechsten Lauf werden daraus bedingte Requests
+(If-None-Match / If-Modified-Since); unveraenderte Bilder kosten dann nur
+noch eine 304-Antwort statt eines kompletten Downloads.
+
+Nutzung:
+    cache = HttpCache(output_dir)
+    headers = {**HEADERS, **cache.validators(url, filepath)}
+    resp = http_pool.get(url, headers=headers)
+    if resp.status_code == 304: ...            # Datei ist aktuell
+    else: cache.update(url, resp, resp.content, filename=...)
+    # bzw. nach http_pool.download_file(): cache.record(url, r.headers, r.sha256, r.size)
+    cache.save()
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+CACHE_FILENAME = ".http-cache.json"
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class HttpCache:
+    """Persistente Metadaten (ETag, Last-Modified, Hash, Groesse) pro URL."""
+
+    def __init__(self, directory, filename=CACHE_FILENAME):
+        self.path = os.path.join(directory, filename)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f).get('entries', {})
+            except (OSError, ValueError):
+                # Kaputte Cache-Datei ist kein Fehler - dann eben alles neu laden
+                self.entries = {}
+
+    def get(self, url):
+        with self._lock:
+            entry = self.entries.get(url)
+            return dict(entry) if entry else None
+
+    def url_for(self, filename):
+        """URL, unter der `filename` zuletzt geladen wurde (oder None)."""
+        with self._lock:
+            for url, entry in self.entries.items():
+                if entry.get('filename') == filename:
+                    return url
+        return None
+
+    def validators(self, url, filepath=None):
+        """
+        Header fuer einen bedingten Request. Leer, wenn es keinen Eintrag gibt
+        oder die lokale Datei nicht mehr zum gespeicherten Hash passt.
+        """
+        entry = self.get(url)
+        if not entry:
+            return {}
+        if filepath is not None:
+            if not os.path.exists(filepath) or os.path.getsize(filepath) != entry.get('size'):
+                return {}
+            if sha256_file(filepath) != entry.get('sha256'):
+                return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def update(self, url, response, content, **extra):
+        """Merkt sich Validatoren und Inhalt-Hash einer 200-Antwort."""
+        self.record(url, response.headers, hashlib.sha256(content).hexdigest(),
+                    len(content), **extra)
+
+    def record(self, url, headers, sha256, size, **extra):
+        """Wie update(), aber fuer gestreamte Downloads mit bereits bekanntem Hash."""
+        entry = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'sha256': sha256,
+            'size': size,
+            'fetched': int(time.time()),
+        }
+        entry.update(extra)
+        with self._lock:
+            self.entries[url] = entry
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': 1, 'entries': self.entries}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
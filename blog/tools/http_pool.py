@@ -0,0 +1,394 @@
+"""
+Gemeinsame HTTP-Schicht fuer die Blog-Tools
+===========================================
+Statt fuer jede URL ein nacktes `requests.get(...)` (= neue TCP+TLS-Verbindung)
+haelt dieses Modul pro Host eine `requests.Session` mit Keep-Alive-Pool.
+Wiederholte Zugriffe auf images.pexels.com oder m.media-amazon.com nutzen so
+dieselben Verbindungen.
+
+Zusaetzlich:
+  - Retry mit exponentiellem Backoff bei 429/5xx und Verbindungsfehlern
+  - Retry-After-Header wird respektiert (429/503)
+  - Drosselung pro Host: Token-Bucket, AIMD und Circuit-Breaker
+    (host_limits.py); Captcha-Seiten meldet der Aufrufer per throttled(url)
+  - Statistik pro Host: Requests vs. neu aufgebaute Verbindungen
+  - download_file(): Streaming-Download in eine Temp-Datei mit fsync und
+    atomarem Umbenennen, Mindestgroesse wird waehrend des Streams geprueft,
+    der Inhalt optional vor dem Umbenennen (verify=); fortsetzbar per
+    Range/If-Range (resumable=True)
+
+Nutzung:
+    import http_pool
+    resp = http_pool.get(url, headers=HEADERS, timeout=15)
+    ...
+    http_pool.print_stats()
+"""
+
+import hashlib
+import os
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+import host_limits
+import metrics
+
+# =============================================================================
+# KONFIGURATION
+# =============================================================================
+
+POOL_CONNECTIONS = 4     # Anzahl gecachter Verbindungs-Pools pro Session
+POOL_MAXSIZE = 16        # Max. offene Keep-Alive-Verbindungen pro Host
+RETRIES = 3              # Wiederholungen bei 429/5xx/Verbindungsfehlern
+BACKOFF_FACTOR = 0.5     # Wartezeit: 0.5s, 1s, 2s, ...
+RETRY_STATUS = (429, 500, 502, 503, 504)
+THROTTLE_STATUS = (429,)  # "zu schnell" -> Rate halbieren; 503 nur mit Retry-After
+CHUNK_SIZE = 64 * 1024   # Blockgroesse beim Streaming (RAM bleibt konstant)
+
+# =============================================================================
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        with metrics.span('connect', host=self.host):
+            super().connect()
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        # DNS + TCP + TLS-Handshake einer neuen Verbindung
+        with metrics.span('connect', host=self.host):
+            super().connect()
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+TIMED_POOL_CLASSES = {'http': _TimedHTTPConnectionPool, 'https': _TimedHTTPSConnectionPool}
+
+
+class HostPool:
+    """Verwaltet eine Session mit Verbindungs-Pool pro Host."""
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                 retries=RETRIES, backoff_factor=BACKOFF_FACTOR):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._sessions = {}
+        self._requests = {}
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def _make_session(self):
+        # urllib3 wiederholt nur Verbindungsfehler; 429/5xx wiederholt request(),
+        # damit jede dieser Antworten beim HostLimiter ankommt
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,  # Letzte Antwort zurueckgeben, Aufrufer prueft status_code
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+        adapter.poolmanager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def session_for(self, url):
+        """Gibt die (ggf. neu angelegte) Session fuer den Host der URL zurueck."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._make_session()
+                self._sessions[host] = session
+                self._requests[host] = 0
+            self._requests[host] += 1
+        return session
+
+    def limiter_for(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = host_limits.limiter_for(host)
+            return limiter
+
+    def request(self, method, url, **kwargs):
+        """
+        Request ueber den Pool des Hosts, gedrosselt durch dessen HostLimiter.
+        429/5xx werden bis zu `retries` Mal wiederholt; die letzte Antwort
+        geht an den Aufrufer.
+        """
+        limiter = self.limiter_for(url)
+        for attempt in range(self.retries + 1):
+            limiter.acquire()
+            try:
+                resp = self.session_for(url).request(method, url, **kwargs)
+            except requests.RequestException:
+                limiter.failure()
+                raise
+            retry_after = host_limits.retry_after_seconds(resp.headers)
+            throttle = (resp.status_code in THROTTLE_STATUS
+                        or (resp.status_code == 503 and retry_after is not None))
+            if throttle:
+                limiter.throttled(retry_after)
+            elif resp.status_code >= 500:
+                limiter.failure()
+            else:
+                limiter.success()
+                if not kwargs.get('stream'):
+                    metrics.add_bytes(urlsplit(url).netloc, len(resp.content))
+                return resp
+            if attempt == self.retries or resp.status_code not in RETRY_STATUS:
+                return resp
+            resp.close()
+            if not throttle:  # bei Drosselung wartet acquire() auf den Limiter
+                time.sleep(self.backoff_factor * (2 ** attempt))
+        return resp
+
+    def throttled(self, url):
+        """Vom Aufrufer erkannte Drosselung (z.B. Amazon-Captcha) melden."""
+        self.limiter_for(url).throttled()
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def stats(self):
+        """
+        Liefert pro Host: Anzahl Requests und tatsaechlich aufgebaute Verbindungen.
+        Die Differenz sind eingesparte TCP/TLS-Handshakes.
+        """
+        result = {}
+        with self._lock:
+            items = list(self._sessions.items())
+            counts = dict(self._requests)
+            limiters = dict(self._limiters)
+        for host, session in items:
+            connections = 0
+            seen = set()
+            for adapter in session.adapters.values():
+                if id(adapter) in seen:
+                    continue
+                seen.add(id(adapter))
+                pools = adapter.poolmanager.pools
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is not None:
+                        connections += pool.num_connections
+            limiter = limiters.get(host)
+            result[host] = {'requests': counts.get(host, 0), 'connections': connections,
+                            'rate': limiter.rate if limiter else None,
+                            'throttled': limiter.throttles if limiter else 0,
+                            'paused': limiter.trips if limiter else 0}
+        return result
+
+    def print_stats(self):
+        stats = self.stats()
+        if not stats:
+            return
+        print("Verbindungen pro Host:")
+        for host, s in sorted(stats.items()):
+            reused = max(0, s['requests'] - s['connections'])
+            line = (f"  {host:32s} {s['requests']:4d} Requests, "
+                    f"{s['connections']:3d} Verbindungen, {reused:4d} wiederverwendet")
+            if s['throttled'] or s['paused']:
+                line += (f", {s['throttled']}x gedrosselt, {s['paused']}x pausiert, "
+                         f"zuletzt {s['rate']:.1f} Req/s")
+            print(line)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+class DownloadResult:
+    """Ergebnis von download_file()."""
+
+    def __init__(self, status_code, headers, size=0, sha256=None, written=False, resumed=0,
+                 problem=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.size = size
+        self.sha256 = sha256
+        self.written = written  # True = Zieldatei wurde (neu) geschrieben
+        self.resumed = resumed  # Bytes, die aus einer .part-Datei uebernommen wurden
+        self.problem = problem  # Fehlertext von verify(), z.B. "HTML statt Bild"
+
+    @property
+    def not_modified(self):
+        return self.status_code == 304
+
+    @property
+    def ok(self):
+        return self.written or self.not_modified
+
+
+def part_path(filepath):
+    """Feste Temp-Datei fuer fortsetzbare Downloads (.name.part neben filepath)."""
+    directory, name = os.path.split(filepath)
+    return os.path.join(directory, f".{name}.part")
+
+
+def resume_validator(headers):
+    """Starker ETag oder Last-Modified fuer If-Range; None = nicht fortsetzbar."""
+    etag = headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return headers.get('Last-Modified')
+
+
+def _range_start(resp):
+    """Startbyte aus `Content-Range: bytes N-M/L` oder None."""
+    value = resp.headers.get('Content-Range', '')
+    if value.startswith('bytes ') and '-' in value:
+        start = value[6:].split('-', 1)[0]
+        if start.isdigit():
+            return int(start)
+    return None
+
+
+def download_file(url, filepath, min_size=0, headers=None, timeout=30, pool=None,
+                  resumable=False, if_range=None, on_response=None, verify=None):
+    """
+    Streamt `url` blockweise in eine Temp-Datei neben `filepath` und ersetzt
+    die Zieldatei erst nach fsync per os.replace(). Ein abgebrochener oder zu
+    kleiner Download hinterlaesst daher nie eine halbe Datei.
+
+    Mit resumable=True ist die Temp-Datei part_path(filepath) und bleibt bei
+    Abbruechen liegen. Mit `if_range` (Validator der abgebrochenen Antwort)
+    wird sie per `Range: bytes=N-` fortgesetzt; liefert der Server statt 206
+    die ganze Datei (Bild hat sich geaendert), wird von vorn geschrieben.
+    `on_response(resp)` wird vor dem Lesen des Bodys aufgerufen, z.B. um den
+    Validator fuer einen spaeteren Neustart zu speichern.
+    `verify(temp_pfad, dateiname)` prueft den fertigen Download vor dem
+    Umbenennen (z.B. verify_images.check_path); liefert sie einen Fehlertext,
+    wird die Temp-Datei verworfen und die Zieldatei bleibt, wie sie war.
+    """
+    pool = pool or get_pool()
+    if resumable:
+        tmp_path = part_path(filepath)
+    else:
+        directory, name = os.path.split(filepath)
+        tmp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.part")
+
+    offset = os.path.getsize(tmp_path) if resumable and if_range and os.path.exists(tmp_path) else 0
+    if offset:
+        headers = dict(headers or {}, Range=f"bytes={offset}-", **{'If-Range': if_range})
+    with metrics.span('headers'):
+        resp = pool.get(url, headers=headers, timeout=timeout, stream=True)
+    try:
+        if resp.status_code == 206 and _range_start(resp) == offset:
+            mode = 'ab'
+        elif resp.status_code == 200:
+            mode, offset = 'wb' if resumable else 'xb', 0
+        else:
+            if resp.status_code == 206 and os.path.exists(tmp_path):
+                os.remove(tmp_path)  # unerwarteter Bereich -> naechstes Mal von vorn
+            return DownloadResult(resp.status_code, resp.headers)
+
+        # Content-Length bereits zu klein -> Body gar nicht erst lesen
+        length = resp.headers.get('Content-Length')
+        if length and length.isdigit() and offset + int(length) < min_size:
+            return DownloadResult(resp.status_code, resp.headers, size=offset + int(length))
+
+        if on_response:
+            on_response(resp)
+
+        digest = hashlib.sha256()
+        if offset:
+            with open(tmp_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        size = offset
+        try:
+            with open(tmp_path, mode) as f:
+                with metrics.span('body'):
+                    for chunk in resp.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+                with metrics.span('fsync'):
+                    f.flush()
+                    os.fsync(f.fileno())
+            metrics.add_bytes(urlsplit(url).netloc, size - offset)
+            if size < min_size:
+                os.remove(tmp_path)
+                return DownloadResult(resp.status_code, resp.headers, size=size)
+            problem = verify(tmp_path, os.path.basename(filepath)) if verify else None
+            if problem:
+                os.remove(tmp_path)
+                return DownloadResult(resp.status_code, resp.headers, size=size, problem=problem)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            # Fortsetzbare Teil-Dateien bleiben fuer den naechsten Lauf liegen
+            if not resumable and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return DownloadResult(resp.status_code, resp.headers, size, digest.hexdigest(),
+                              written=True, resumed=offset)
+    finally:
+        resp.close()
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def configure(**kwargs):
+    """Ersetzt den globalen Pool, z.B. configure(pool_maxsize=32) bei vielen Workern."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is not None:
+            _default_pool.close()
+        _default_pool = HostPool(**kwargs)
+    return _default_pool
+
+
+def get_pool():
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = HostPool()
+        return _default_pool
+
+
+def get(url, **kwargs):
+    return get_pool().get(url, **kwargs)
+
+
+def head(url, **kwargs):
+    return get_pool().head(url, **kwargs)
+
+
+def throttled(url):
+    get_pool().throttled(url)
+
+
+def print_stats():
+    get_pool().print_stats()
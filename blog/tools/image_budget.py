@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Byte-Budget pro Seite und <img>-Tags fuer LCP/CLS
+=================================================
+Misst pro Seite, was vor dem ersten Bild auf dem Bildschirm geladen werden
+muss, und vergleicht es mit BUDGETS (KB):
+
+  html     die Seite selbst (inkl. inline <style>/<script>)
+  css      render-blockierende lokale Stylesheets (<link rel="stylesheet">)
+  images   Bilder im ersten Bildschirm (build_site.fold_offset)
+  total    alles zusammen
+
+Mit --fix werden die <img>-Tags der Seiten umgeschrieben:
+
+  - width/height aus der Bilddatei, wenn beides fehlt (kein Layout-Shift;
+    die Seiten-CSS setzt Breite/Hoehe bzw. height:auto, die Attribute
+    liefern nur das Seitenverhaeltnis)
+  - unterhalb des ersten Bildschirms loading="lazy" und decoding="async",
+    im ersten Bildschirm wird ein loading="lazy" entfernt
+  - das Hero-Bild (erstes Bild im ersten Bildschirm, das kein Icon/Badge
+    ist) bekommt fetchpriority="high"
+
+Externe Bilder (Amazon-Hotlinks) kennt das Tool nur mit --remote: dann
+holt ein Range-Request die ersten REMOTE_PROBE_BYTES fuer die Abmessungen
+und Content-Range liefert die Groesse.
+
+Nutzung:
+  python3 image_budget.py                        # pruefen, Exit 1 bei Ueberschreitung
+  python3 image_budget.py --fix                  # <img>-Tags umschreiben, dann pruefen
+  python3 image_budget.py --fix --remote ../valentines-day-gift-ideas.html
+  python3 image_budget.py --root ../../dist      # gebaute Seiten (build_site.py) messen
+"""
+
+import argparse
+import fnmatch
+import io
+import os
+import posixpath
+import re
+import sys
+
+import image_info
+from build_site import SITE_ROOT, STYLESHEET_RE, fold_offset, resolve, site_pages
+from html_tags import find_img_tags, get_attr, remove_attr, replace_spans, set_attr
+
+# Budget in KB pro Seite (erstes passendes Muster gilt)
+BUDGETS = {
+    "blog/*": dict(html=50, css=20, images=350, total=400),
+    "*": dict(html=40, css=20, images=350, total=400),
+}
+NOSCRIPT_RE = re.compile(r'<noscript\b.*?</noscript>', re.I | re.S)
+ICON_MAX = 256               # Pixel; kleinere Bilder (Logo, Store-Badges) sind nie das Hero-Bild
+REMOTE_PROBE_BYTES = 64 * 1024
+TIMEOUT = 15
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "image/avif,image/webp,image/*,*/*;q=0.8",
+}
+
+
+def budget_for(rel):
+    return next(value for pattern, value in BUDGETS.items() if fnmatch.fnmatch(rel, pattern))
+
+
+def remote_facts(url):
+    """((breite, hoehe) oder None, bytes oder None) eines externen Bildes per Range-Request."""
+    import http_pool  # requests nur mit --remote
+    import requests
+
+    headers = dict(HEADERS, Range=f"bytes=0-{REMOTE_PROBE_BYTES - 1}")
+    try:
+        resp = http_pool.get(url, headers=headers, timeout=TIMEOUT, stream=True)
+        data = b''
+        if resp.status_code in (200, 206):
+            for chunk in resp.iter_content(16 * 1024):
+                data += chunk
+                if len(data) >= REMOTE_PROBE_BYTES:
+                    break
+        resp.close()
+    except requests.RequestException:
+        return None, None
+    if resp.status_code == 206:
+        total = resp.headers.get('Content-Range', '').rpartition('/')[2]
+    elif resp.status_code == 200:
+        total = resp.headers.get('Content-Length', '')
+    else:
+        return None, None
+    return image_info.read_size(io.BytesIO(data)), int(total) if total.isdigit() else None
+
+
+class ImageFacts:
+    """Abmessungen und Groesse der Bilder einer Site (pro Lauf einmal ermittelt)."""
+
+    def __init__(self, root=SITE_ROOT, remote=False):
+        self.root = root
+        self.remote = remote
+        self._facts = {}
+
+    def get(self, src, page_dir):
+        """((breite, hoehe) oder None, bytes oder None)"""
+        if src.startswith('//'):
+            src = 'https:' + src
+        if src.startswith(('http://', 'https://')):
+            key = src
+        else:
+            key = resolve(src, page_dir)
+            if key is None:
+                return None, None
+        if key not in self._facts:
+            if key.startswith(('http://', 'https://')):
+                self._facts[key] = remote_facts(key) if self.remote else (None, None)
+            else:
+                path = os.path.join(self.root, key)
+                if os.path.isfile(path):
+                    self._facts[key] = image_info.image_size(path), os.path.getsize(path)
+                else:
+                    self._facts[key] = None, None
+        return self._facts[key]
+
+
+def classify(text, page_dir, facts):
+    """[(start, ende, tag, above_fold, hero)] fuer alle <img> einer Seite."""
+    fold = fold_offset(text)
+    result = []
+    hero_found = False
+    for start, end, tag in find_img_tags(text):
+        above = start < fold
+        hero = False
+        if above and not hero_found:
+            size, _ = facts.get(get_attr(tag, 'src') or '', page_dir)
+            declared = [get_attr(tag, 'width'), get_attr(tag, 'height')]
+            if size is None and all(d and d.isdigit() for d in declared):
+                size = tuple(int(d) for d in declared)
+            hero = size is not None and max(size) > ICON_MAX
+            hero_found = hero
+        result.append((start, end, tag, above, hero))
+    return result
+
+
+def rewrite_images(text, page_dir, facts):
+    """(neuer Text, Anzahl geaenderter Tags)"""
+    replacements = []
+    for start, end, tag, above, hero in classify(text, page_dir, facts):
+        new = tag
+        if get_attr(new, 'width') is None and get_attr(new, 'height') is None:
+            size, _ = facts.get(get_attr(new, 'src') or '', page_dir)
+            if size:
+                new = set_attr(new, 'width', size[0])
+                new = set_attr(new, 'height', size[1])
+        if above and (get_attr(new, 'loading') or '').lower() == 'lazy':
+            # Im ersten Bildschirm verzoegert lazy nur das Laden (LCP)
+            new = remove_attr(new, 'loading')
+        if hero:
+            new = set_attr(new, 'fetchpriority', 'high')
+        elif not above:
+            if get_attr(new, 'loading') is None:
+                new = set_attr(new, 'loading', 'lazy')
+            if get_attr(new, 'decoding') is None:
+                new = set_attr(new, 'decoding', 'async')
+        if new != tag:
+            replacements.append((start, end, new))
+    return replace_spans(text, replacements), len(replacements)
+
+
+def measure(rel, text, facts, root=SITE_ROOT):
+    """{'html', 'css', 'images', 'total'} in Bytes plus Anzahl unbekannter Groessen."""
+    page_dir = posixpath.dirname(rel)
+    css = 0
+    unknown = 0
+    # <noscript><link rel="stylesheet"> aus build_site.inline_critical blockiert nicht
+    for match in STYLESHEET_RE.finditer(NOSCRIPT_RE.sub('', text)):
+        tag = match.group(0)
+        if (get_attr(tag, 'rel') or '').lower() != 'stylesheet' or get_attr(tag, 'media') == 'print':
+            continue
+        ref = resolve(get_attr(tag, 'href') or '', page_dir)
+        if ref and os.path.isfile(os.path.join(root, ref)):
+            css += os.path.getsize(os.path.join(root, ref))
+        else:
+            unknown += 1
+    images = 0
+    seen = set()
+    for _, _, tag, above, hero in classify(text, page_dir, facts):
+        src = get_attr(tag, 'src') or ''
+        if not above or src in seen:
+            continue
+        seen.add(src)
+        _, size = facts.get(src, page_dir)
+        if size is None:
+            unknown += 1
+        else:
+            images += size
+    html = len(text.encode('utf-8'))
+    return {'html': html, 'css': css, 'images': images, 'total': html + css + images,
+            'unknown': unknown}
+
+
+def over_budget(rel, sizes):
+    budget = budget_for(rel)
+    return [f"{key} {sizes[key] / 1024:.0f}/{limit} KB" for key, limit in budget.items()
+            if sizes[key] > limit * 1024]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Byte-Budget pruefen und <img>-Tags umschreiben")
+    parser.add_argument('pages', nargs='*', help="HTML-Dateien (Standard: alle Seiten)")
+    parser.add_argument('--root', default=SITE_ROOT, help="Site-Root (z.B. dist/ von build_site.py)")
+    parser.add_argument('--fix', action='store_true',
+                        help="width/height, loading, decoding und fetchpriority setzen")
+    parser.add_argument('--remote', action='store_true',
+                        help="Abmessungen/Groesse externer Bilder per Range-Request holen")
+    args = parser.parse_args(argv)
+
+    root = os.path.abspath(args.root)
+    pages = ([os.path.relpath(os.path.abspath(p), root).replace(os.sep, '/') for p in args.pages]
+             or site_pages(root))
+    facts = ImageFacts(root, remote=args.remote)
+    failed = 0
+
+    print(f"{'Seite':45s} {'HTML':>6s} {'CSS':>6s} {'Bilder':>7s} {'Summe':>7s}  (KB)")
+    try:
+        for rel in pages:
+            path = os.path.join(root, rel)
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+            if args.fix:
+                text, changed = rewrite_images(text, posixpath.dirname(rel), facts)
+                if changed:
+                    tmp_path = path + '.part'
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        f.write(text)
+                    os.replace(tmp_path, path)
+                    print(f"  {rel}: {changed} <img>-Tags umgeschrieben")
+            sizes = measure(rel, text, facts, root)
+            problems = over_budget(rel, sizes)
+            failed += bool(problems)
+            note = f"  {sizes['unknown']} unbekannt" if sizes['unknown'] else ""
+            status = "  UEBER BUDGET: " + ", ".join(problems) if problems else ""
+            print(f"{rel:45s} {sizes['html'] / 1024:6.0f} {sizes['css'] / 1024:6.0f} "
+                  f"{sizes['images'] / 1024:7.0f} {sizes['total'] / 1024:7.0f}{note}{status}")
+    finally:
+        if args.remote:
+            import http_pool
+            http_pool.get_pool().close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Bildformat und -abmessungen ohne Pillow
+=======================================
+Liest nur die ersten Bytes einer Datei: Typ (JPEG, PNG, GIF, WebP, AVIF,
+oder HTML-Fehlerseite) und Breite/Hoehe aus dem Header.
+"""
+
+import struct
+
+# Alle JPEG Start-of-Frame-Marker ausser DHT (C4), JPG (C8) und DAC (CC)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+MIME_TYPES = {
+    'jpeg': 'image/jpeg', 'png': 'image/png', 'gif': 'image/gif',
+    'webp': 'image/webp', 'avif': 'image/avif', 'svg': 'image/svg+xml',
+}
+
+
+def sniff_type(header):
+    """Erkennt den Dateityp an den ersten Bytes (mind. 32 Bytes uebergeben)."""
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'webp'
+    if header[4:8] == b'ftyp' and header[8:12] in (b'avif', b'avis'):
+        return 'avif'
+    start = header.lstrip()[:64].lower()
+    if start.startswith((b'<!doctype html', b'<html', b'<head', b'<body')):
+        return 'html'
+    if start.startswith((b'<svg', b'<?xml')):
+        return 'svg'
+    return None
+
+
+def _jpeg_size(f):
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            continue  # Marker ohne Laengenfeld
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if marker in JPEG_SOF_MARKERS:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack('>HH', data[1:5])
+            return width, height
+        f.seek(length - 2, 1)
+
+
+def _webp_size(header):
+    chunk = header[12:16]
+    if chunk == b'VP8 ' and len(header) >= 30:
+        width, height = struct.unpack('<HH', header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(header) >= 25:
+        bits = int.from_bytes(header[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(header) >= 30:
+        width = int.from_bytes(header[24:27], 'little') + 1
+        height = int.from_bytes(header[27:30], 'little') + 1
+        return width, height
+    return None
+
+
+def image_size(path):
+    """(breite, hoehe) aus dem Header oder None, wenn unbekannt/kaputt."""
+    with open(path, 'rb') as f:
+        return read_size(f)
+
+
+def read_size(f):
+    """Wie image_size() fuer ein offenes Binaerfile, z.B. io.BytesIO mit den ersten KB."""
+    header = f.read(32)
+    kind = sniff_type(header)
+    if kind == 'jpeg':
+        return _jpeg_size(f)
+    if kind == 'png' and len(header) >= 24:
+        return struct.unpack('>II', header[16:24])
+    if kind == 'gif' and len(header) >= 10:
+        return struct.unpack('<HH', header[6:10])
+    if kind == 'webp':
+        return _webp_size(header)
+    return None
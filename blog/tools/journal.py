@@ -0,0 +1,144 @@
+"""
+Job-Journal fuer unterbrochene Download-Laeufe
+==============================================
+Haelt pro Datei fest, wie weit sie gekommen ist, und liegt als
+`.download-journal.json` im Ausgabeordner:
+
+    pending   noch nichts passiert
+    page      Produktseite geladen
+    resolved  Bild-URL bekannt (image_url)
+    partial   Bild-Download begonnen; Rest liegt in <.datei.part>, wird per
+              Range/If-Range fortgesetzt (part_url, validator, bytes)
+    verified  fertig, Hash und Groesse stehen im Journal
+
+Bricht ein Lauf ab (Strg+C, WLAN weg), setzt der naechste dort an: fertige
+Dateien werden ohne Request uebersprungen, aufgeloeste Bild-URLs ohne
+Produktseite geladen und halbe Dateien nur um den fehlenden Rest ergaenzt.
+Sind am Ende alle Dateien 'verified', wird das Journal geloescht - ein
+spaeterer Lauf prueft dann wieder ganz normal per bedingtem Request.
+
+Mehrere Manifeste koennen denselben Ausgabeordner (und damit dasselbe
+Journal) benutzen, und watch.py bzw. review.py starten oft nur einen Teil
+der Dateien. Eintraege, die der aktuelle Lauf nicht gestartet hat, bleiben
+deshalb mit ihrem Fortsetz-Stand (page, resolved, partial) erhalten, bis
+sie STALE_AFTER lang nicht mehr angefasst wurden (Produkt entfernt, Manifest
+aufgegeben) - dann fallen sie samt .part-Datei raus. Fremde 'pending'- und
+'verified'-Eintraege enthalten nichts zum Fortsetzen und werden sofort
+entfernt.
+"""
+
+import json
+import os
+import threading
+import time
+
+from http_cache import sha256_file
+
+JOURNAL_FILENAME = ".download-journal.json"
+SAVE_INTERVAL = 2.0  # Sekunden; Zustandswechsel werden hoechstens so oft geschrieben
+STALE_AFTER = 14 * 24 * 3600  # Sekunden; so lange bleibt der Fortsetz-Stand fremder Dateien
+
+PENDING = 'pending'
+PAGE = 'page'
+RESOLVED = 'resolved'
+PARTIAL = 'partial'
+VERIFIED = 'verified'
+RESUMABLE = (PAGE, RESOLVED, PARTIAL)
+
+
+class Journal:
+    """Zustand pro Datei (Schluessel = Dateiname) eines Download-Laufs."""
+
+    def __init__(self, directory, filename=JOURNAL_FILENAME):
+        self.path = os.path.join(directory, filename)
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self._dirty = False
+        self._keys = set()  # alle Dateien, die start() in diesem Lauf bekommen hat
+        self.entries = {}
+        self.resuming = os.path.exists(self.path)
+        if self.resuming:
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f).get('entries', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def start(self, keys):
+        """Traegt alle Dateien des Laufs ein; liefert die Zahl bereits fertiger."""
+        with self._lock:
+            for key in keys:
+                self.entries.setdefault(key, {'state': PENDING})
+                self._keys.add(key)
+            self._dirty = True
+        return sum(1 for key in keys if self.is_verified(key))
+
+    def get(self, key):
+        with self._lock:
+            return dict(self.entries.get(key) or {'state': PENDING})
+
+    def mark(self, key, state, **fields):
+        with self._lock:
+            entry = self.entries.setdefault(key, {})
+            entry.update(fields, state=state, updated=int(time.time()))
+            self._dirty = True
+        self.save(force=False)
+
+    def verified(self, key, filepath, sha256=None):
+        """Markiert `key` als fertig (Hash wird bei Bedarf aus der Datei berechnet)."""
+        self.mark(key, VERIFIED, sha256=sha256 or sha256_file(filepath),
+                  size=os.path.getsize(filepath), part_url=None, validator=None)
+
+    def is_verified(self, key):
+        """Fertig und die Datei ist noch genau die aus dem Journal."""
+        entry = self.get(key)
+        if entry.get('state') != VERIFIED:
+            return False
+        filepath = os.path.join(self.directory, key)
+        return (os.path.exists(filepath)
+                and os.path.getsize(filepath) == entry.get('size')
+                and sha256_file(filepath) == entry.get('sha256'))
+
+    def save(self, force=True):
+        with self._lock:
+            if not self._dirty:
+                return
+            if not force and time.monotonic() - self._last_save < SAVE_INTERVAL:
+                return
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': 1, 'entries': self.entries}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+    def finish(self):
+        """Loescht das Journal, wenn alles fertig ist, sonst wird es gespeichert."""
+        with self._lock:
+            # Dateien, die der Lauf nicht gestartet hat: nur ohne (frischen) Fortsetz-Stand raus
+            now = time.time()
+            stale = [key for key in set(self.entries) - self._keys
+                     if self.entries[key].get('state') not in RESUMABLE
+                     or now - self.entries[key].get('updated', 0) > STALE_AFTER]
+            if stale and self._keys:
+                for key in stale:
+                    if self.entries.pop(key).get('state') == PARTIAL:
+                        self._remove_part(key)
+                self._dirty = True
+            done = all(e.get('state') == VERIFIED for e in self.entries.values())
+        if done:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._dirty = False
+        else:
+            self.save()
+        return done
+
+    def _remove_part(self, key):
+        from http_pool import part_path
+
+        try:
+            os.remove(part_path(os.path.join(self.directory, key)))
+        except OSError:
+            pass
@@ -0,0 +1,230 @@
+"""
+Zeitmessung pro Download-Phase
+==============================
+Spans um jede Phase eines Downloads (Produktseite, Parsen, Hochaufloesung,
+Bild, fsync, Verbindungsaufbau ...), damit klar ist, wohin die Zeit geht.
+Ausgeschaltet kostet ein Span nur einen Funktionsaufruf.
+
+    metrics.enable()
+    with metrics.item('lego-roses.jpg') as info:
+        with metrics.span('page'):
+            ...
+        info['ok'] = True
+    metrics.add_bytes('m.media-amazon.com', 123456)
+
+    rec = metrics.recorder()
+    rec.print_table()             # p50/p95/max pro Phase, Bytes pro Host
+    rec.write_json(sys.stdout)    # JSON-Zeilen: eine pro Datei + Gesamt
+    rec.write_trace('trace.json') # chrome://tracing bzw. ui.perfetto.dev
+
+Phasen:
+  page, parse, highres, image, search, copy  (von den Tools gesetzt)
+  connect   DNS + TCP + TLS einer neuen Verbindung (http_pool)
+  headers   Request bis Antwort-Header, inkl. connect (download_file)
+  body      Body streamen und schreiben (download_file)
+  fsync     fsync der Temp-Datei (download_file)
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_recorder = None
+_local = threading.local()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class Recorder:
+    """Sammelt Spans (Name, Datei, Start, Ende, Thread) und Bytes pro Host."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []        # (name, item, start, end, thread_id, attrs)
+        self.items = {}        # item -> info-Dict aus item()
+        self.host_bytes = {}
+        self.lock = threading.Lock()
+
+    def add(self, name, item, start, end, attrs):
+        self.spans.append((name, item, start, end, threading.get_ident(), attrs))
+
+    def add_bytes(self, host, nbytes):
+        with self.lock:
+            self.host_bytes[host] = self.host_bytes.get(host, 0) + nbytes
+
+    # --- Auswertung -------------------------------------------------------
+
+    def stages(self):
+        """{phase: [dauer_s, ...]}"""
+        result = {}
+        for name, _, start, end, _, _ in self.spans:
+            result.setdefault(name, []).append(end - start)
+        return result
+
+    def per_item(self):
+        """Ein Dict pro Datei: Gesamtdauer, Summe pro Phase, Ergebnis."""
+        stages = {}
+        for name, item, start, end, _, _ in self.spans:
+            if item is not None and name != 'item':
+                per = stages.setdefault(item, {})
+                per[name] = per.get(name, 0.0) + (end - start)
+        rows = []
+        for item, info in self.items.items():
+            row = {'type': 'item', 'item': item}
+            row.update(info)
+            row['stages_ms'] = {k: round(v * 1000, 1)
+                                for k, v in sorted(stages.get(item, {}).items())}
+            rows.append(row)
+        return rows
+
+    def aggregate(self):
+        return {
+            'type': 'aggregate',
+            'wall_ms': round((time.perf_counter() - self.started) * 1000, 1),
+            'items': len(self.items),
+            'ok': sum(1 for info in self.items.values() if info.get('ok')),
+            'stages': {name: {'count': len(values),
+                              'p50_ms': round(percentile(values, 50) * 1000, 1),
+                              'p95_ms': round(percentile(values, 95) * 1000, 1),
+                              'max_ms': round(max(values) * 1000, 1),
+                              'total_ms': round(sum(values) * 1000, 1)}
+                       for name, values in sorted(self.stages().items())},
+            'bytes_per_host': dict(sorted(self.host_bytes.items())),
+        }
+
+    # --- Ausgabe ----------------------------------------------------------
+
+    def write_json(self, out):
+        for row in self.per_item():
+            out.write(json.dumps(row, sort_keys=True) + '\n')
+        out.write(json.dumps(self.aggregate(), sort_keys=True) + '\n')
+
+    def write_trace(self, path):
+        """Chrome-Trace-Format (JSON), laesst sich in Perfetto oder chrome://tracing oeffnen."""
+        threads = {}
+        events = []
+        for name, item, start, end, thread_id, attrs in self.spans:
+            tid = threads.setdefault(thread_id, len(threads) + 1)
+            args = dict(attrs)
+            if item is not None:
+                args['item'] = item
+            events.append({
+                'name': item if name == 'item' else name, 'cat': name, 'ph': 'X',
+                'ts': round((start - self.started) * 1e6), 'dur': round((end - start) * 1e6),
+                'pid': os.getpid(), 'tid': tid, 'args': args,
+            })
+        for tid in threads.values():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid,
+                           'args': {'name': f"Worker {tid}"}})
+        tmp_path = path + '.part'
+        with open(tmp_path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        os.replace(tmp_path, path)
+
+    def print_table(self):
+        agg = self.aggregate()
+        print(f"\n{'Phase':12s} {'Anzahl':>7s} {'p50 ms':>9s} {'p95 ms':>9s} "
+              f"{'max ms':>9s} {'Summe s':>9s}")
+        for name, s in agg['stages'].items():
+            print(f"{name:12s} {s['count']:7d} {s['p50_ms']:9.1f} {s['p95_ms']:9.1f} "
+                  f"{s['max_ms']:9.1f} {s['total_ms'] / 1000:9.2f}")
+        if agg['bytes_per_host']:
+            print(f"\n{'Host':40s} {'Bytes':>14s}")
+            for host, nbytes in agg['bytes_per_host'].items():
+                print(f"{host:40s} {nbytes:14,d}")
+
+
+class _NoSpan:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def enable():
+    global _recorder
+    _recorder = Recorder()
+    return _recorder
+
+
+def recorder():
+    return _recorder
+
+
+def span(name, **attrs):
+    """Misst den with-Block als Phase `name` (no-op, solange nicht enable())."""
+    if _recorder is None:
+        return _NO_SPAN
+    return _span(name, attrs)
+
+
+@contextmanager
+def _span(name, attrs):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _recorder.add(name, getattr(_local, 'item', None), start, time.perf_counter(), attrs)
+
+
+@contextmanager
+def item(name):
+    """Ordnet alle Spans im Block (im selben Thread) der Datei `name` zu."""
+    info = {}
+    if _recorder is None:
+        yield info
+        return
+    previous = getattr(_local, 'item', None)
+    _local.item = name
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        end = time.perf_counter()
+        info['total_ms'] = round((end - start) * 1000, 1)
+        earlier = _recorder.items.get(name)
+        if earlier:
+            # Mehrere Tasks fuer dieselbe Datei (z.B. Seite, dann Bild): Zeiten addieren
+            info['total_ms'] = round(info['total_ms'] + earlier.get('total_ms', 0), 1)
+        _recorder.items[name] = info
+        _recorder.add('item', name, start, end, {})
+        _local.item = previous
+
+
+def add_bytes(host, nbytes):
+    if _recorder is not None:
+        _recorder.add_bytes(host, nbytes)
+
+
+def write_report(fmt=None, out_path=None, trace_path=None):
+    """
+    Ausgabe fuer --metrics [json] / --metrics-out / --trace der Tools:
+    Tabelle, JSON-Zeilen (Datei oder stdout) und Trace-Datei.
+    """
+    if _recorder is None:
+        return
+    _recorder.print_table()
+    if fmt == 'json':
+        if out_path:
+            with open(out_path, 'w') as f:
+                _recorder.write_json(f)
+            print(f"\nMetriken: {out_path}")
+        else:
+            print()
+            _recorder.write_json(sys.stdout)
+    if trace_path:
+        _recorder.write_trace(trace_path)
+        print(f"Trace: {trace_path} (in https://ui.perfetto.dev oeffnen)")
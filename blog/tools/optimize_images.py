@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Post-download image optimization for the blog articles.
+=======================================================
+For every image it writes resized variants (default 400/800/1200 px wide)
+as recompressed JPEG, WebP and - if the Pillow build supports it - AVIF,
+with all metadata stripped. Work is spread across cores with a process pool.
+
+Variants land in <dir>/optimized/ and a record per image is kept in
+<dir>/optimized/images.json (dimensions, variants, bytes saved). Images
+whose source hash did not change since the last run are skipped.
+
+Usage:
+  python3 optimize_images.py ../images/date-ideas
+  python3 optimize_images.py ../images/date-ideas --widths 480 960 1440
+  python3 optimize_images.py ../images/date-ideas --html picnic-final-a.jpg --alt "Picnic"
+
+Requires Pillow (pip install Pillow).
+"""
+
+import argparse
+import html
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from http_cache import sha256_file
+
+WIDTHS = (400, 800, 1200)
+QUALITY = {"jpeg": 82, "webp": 80, "avif": 60}
+EXTENSIONS = {"jpeg": ".jpg", "webp": ".webp", "avif": ".avif"}
+MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp", "avif": "image/avif"}
+SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+OPTIMIZED_DIR = "optimized"
+RECORD_FILE = "images.json"
+RECORD_VERSION = 2        # 1 flattened transparent images onto black
+JPEG_BACKGROUND = (255, 255, 255)  # JPEG has no alpha: transparent areas become white
+
+
+def available_formats():
+    from PIL import features
+    formats = ["jpeg"]
+    if features.check("webp"):
+        formats.append("webp")
+    if features.check("avif"):
+        formats.append("avif")
+    return formats
+
+
+def _has_alpha(image):
+    return image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+
+def _flatten(image):
+    """RGBA -> RGB on JPEG_BACKGROUND, using the alpha channel as the mask."""
+    from PIL import Image
+    background = Image.new("RGB", image.size, JPEG_BACKGROUND)
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def _save(image, path, fmt):
+    tmp_path = path + ".part"
+    if fmt == "jpeg" and image.mode == "RGBA":
+        image = _flatten(image)
+    if fmt == "jpeg":
+        image.save(tmp_path, "JPEG", quality=QUALITY[fmt], optimize=True, progressive=True)
+    elif fmt == "webp":
+        image.save(tmp_path, "WEBP", quality=QUALITY[fmt], method=6)
+    else:
+        image.save(tmp_path, "AVIF", quality=QUALITY[fmt], speed=6)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def optimize_one(source, out_dir, widths, formats):
+    """Creates all variants of one image and returns its record (runs in a worker process)."""
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as original:
+        # Apply EXIF rotation before the metadata is dropped
+        image = ImageOps.exif_transpose(original)
+        if _has_alpha(image):
+            # WebP/AVIF keep the alpha channel, _save() flattens it for JPEG
+            image = image.convert("RGBA")
+        elif image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        # A fresh image without info/exif/icc means nothing is carried over
+        image = Image.frombytes(image.mode, image.size, image.tobytes())
+    width, height = image.size
+
+    stem = os.path.splitext(os.path.basename(source))[0]
+    variants = []
+    for target_width in sorted({min(w, width) for w in widths}):
+        target_height = round(height * target_width / width)
+        resized = image if target_width == width else image.resize(
+            (target_width, target_height), Image.LANCZOS)
+        for fmt in formats:
+            name = f"{stem}-{target_width}{EXTENSIONS[fmt]}"
+            size = _save(resized, os.path.join(out_dir, name), fmt)
+            variants.append({"file": name, "format": fmt, "width": target_width,
+                             "height": target_height, "bytes": size})
+
+    source_bytes = os.path.getsize(source)
+    largest = max(v["width"] for v in variants)
+    best = min(v["bytes"] for v in variants if v["width"] == largest)
+    return {
+        "version": RECORD_VERSION,
+        "source": os.path.basename(source),
+        "sha256": sha256_file(source),
+        "width": width,
+        "height": height,
+        "bytes": source_bytes,
+        "variants": variants,
+        "bytes_saved": source_bytes - best,
+    }
+
+
+def load_records(out_dir):
+    path = os.path.join(out_dir, RECORD_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_records(out_dir, records):
+    path = os.path.join(out_dir, RECORD_FILE)
+    with open(path + ".part", "w") as f:
+        json.dump(records, f, indent=1, sort_keys=True)
+    os.replace(path + ".part", path)
+
+
+def is_current(record, source, out_dir, widths, formats):
+    if not record or record.get("version") != RECORD_VERSION:
+        return False
+    if record.get("sha256") != sha256_file(source):
+        return False
+    expected = {(min(w, record["width"]), fmt) for w in widths for fmt in formats}
+    present = {(v["width"], v["format"]) for v in record["variants"]
+               if os.path.exists(os.path.join(out_dir, v["file"]))}
+    return expected <= present
+
+
+def optimize_paths(paths, widths=WIDTHS, workers=None, log=print):
+    """
+    Optimizes the given image files; records are kept per source directory.
+    Returns {source path: record}.
+    """
+    formats = available_formats()
+    by_dir = {}
+    for path in paths:
+        if path.lower().endswith(SOURCE_EXTENSIONS) and os.path.isfile(path):
+            by_dir.setdefault(os.path.dirname(os.path.abspath(path)), []).append(path)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for directory, sources in by_dir.items():
+            out_dir = os.path.join(directory, OPTIMIZED_DIR)
+            os.makedirs(out_dir, exist_ok=True)
+            records = load_records(out_dir)
+
+            jobs = {}
+            for source in sources:
+                name = os.path.basename(source)
+                if is_current(records.get(name), source, out_dir, widths, formats):
+                    results[source] = records[name]
+                    log(f"  SKIP {name} (variants up to date)")
+                    continue
+                jobs[source] = pool.submit(optimize_one, source, out_dir, widths, formats)
+
+            for source, job in jobs.items():
+                try:
+                    record = job.result()
+                except Exception as e:
+                    log(f"  FAILED {os.path.basename(source)}: {e}")
+                    continue
+                records[record["source"]] = record
+                results[source] = record
+                log(f"  OK   {record['source']}: {len(record['variants'])} variants, "
+                    f"{record['bytes']:,} -> {record['bytes'] - record['bytes_saved']:,} bytes")
+            save_records(out_dir, records)
+    return results
+
+
+def srcset(record, fmt, prefix):
+    return ", ".join(f"{prefix}{v['file']} {v['width']}w"
+                     for v in record["variants"] if v["format"] == fmt)
+
+
+def picture_html(record, prefix, alt, sizes="(max-width: 800px) 100vw, 800px"):
+    """<picture> markup for an article, AVIF/WebP first with a JPEG fallback."""
+    formats = {v["format"] for v in record["variants"]}
+    jpegs = [v for v in record["variants"] if v["format"] == "jpeg"]
+    fallback = max(jpegs, key=lambda v: v["width"])
+    lines = ["<picture>"]
+    for fmt in ("avif", "webp"):
+        if fmt in formats:
+            lines.append(f'    <source type="{MIME_TYPES[fmt]}" srcset="{srcset(record, fmt, prefix)}" sizes="{sizes}">')
+    lines.append(
+        f'    <img src="{prefix}{fallback["file"]}" srcset="{srcset(record, "jpeg", prefix)}" '
+        f'sizes="{sizes}" width="{fallback["width"]}" height="{fallback["height"]}" '
+        f'alt="{html.escape(alt, quote=True)}" loading="lazy" decoding="async">'
+    )
+    lines.append("</picture>")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resize/recompress blog images into srcset variants")
+    parser.add_argument("paths", nargs="+", help="Image files or directories")
+    parser.add_argument("--widths", type=int, nargs="+", default=list(WIDTHS))
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: all cores)")
+    parser.add_argument("--html", metavar="FILENAME", help="Print <picture> markup for this image")
+    parser.add_argument("--alt", default="")
+    parser.add_argument("--prefix", default="images/date-ideas/optimized/",
+                        help="URL prefix of the variants in the article")
+    args = parser.parse_args()
+
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("Pillow is not installed: pip install Pillow")
+        sys.exit(1)
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)))
+        else:
+            files.append(path)
+
+    print(f"\nOptimizing {len(files)} files (formats: {', '.join(available_formats())})\n")
+    results = optimize_paths(files, widths=args.widths, workers=args.workers)
+
+    saved = sum(r["bytes_saved"] for r in results.values())
+    total = sum(r["bytes"] for r in results.values())
+    print(f"\n{'='*50}")
+    print(f"Result: {len(results)} images, {total:,} -> {total - saved:,} bytes "
+          f"at full width ({saved:,} saved)")
+    print(f"{'='*50}\n")
+
+    import placeholders
+    placeholders.compute_paths(files)
+
+    if args.html:
+        for source, record in results.items():
+            if os.path.basename(source) == args.html:
+                print(picture_html(record, args.prefix, args.alt))
+
+
+if __name__ == "__main__":
+    main()
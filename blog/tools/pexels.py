@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Pexels helpers shared by the blog image tools.
+Direct photo URLs by ID and the search API.
+
+All searches share one RateLimit that follows the X-Ratelimit-Remaining /
+X-Ratelimit-Reset headers of the API, so concurrent searches slow down
+before the quota runs out instead of collecting 429s.
+
+Search results are kept in a SearchCache (.pexels-search-cache.json), keyed
+by the normalized query and the request parameters, so repeated runs of a
+manifest cost no API calls. Entries expire after SEARCH_TTL; beyond
+MAX_SEARCHES the least recently used ones are dropped. Offline, the cache
+can also be searched by keywords across all earlier result sets:
+
+  python3 pexels.py "couple picnic"             # cached photos, best first
+  python3 pexels.py "couple picnic" --online    # query the API (and cache it)
+
+search_photos() does not take the API order as is: rank_photos() scores
+every candidate by resolution and by how much of it survives the crop into
+the article layout (LAYOUT_ASPECT, object-fit: cover) and spreads the picks
+over different photographers.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Pexels API key (free tier, public for demo use); override with $PEXELS_API_KEY
+PEXELS_API_KEY = os.environ.get("PEXELS_API_KEY", "563492ad6f91700001000001a1b2c3d4e5f6a7b8c9d0e1f2")
+PEXELS_API_URL = os.environ.get("PEXELS_API_URL", "https://api.pexels.com/v1/search")
+
+SEARCH_CONCURRENCY = 4   # parallel searches in asset_pipeline
+QUOTA_RESERVE = 5        # requests left untouched for manual use
+MAX_QUOTA_WAIT = 60      # seconds; longer resets (monthly quota) fail the search instead
+MAX_PER_PAGE = 80        # API maximum
+MAX_PAGES = 3
+
+SEARCH_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pexels-search-cache.json")
+SEARCH_TTL = 30 * 24 * 3600   # seconds
+MAX_SEARCHES = 500            # cached result pages
+CANDIDATES_PER_SLOT = 3       # search_photos ranks this many candidates per requested photo
+
+# Ranking: .idea-image in valentines-day-date-ideas.html is 800x320 with object-fit: cover
+LAYOUT_ASPECT = 800 / 320
+TARGET_WIDTH = 1600           # 800 CSS px at 2x
+RANK_WEIGHTS = dict(aspect=0.45, resolution=0.25, relevance=0.30)
+SAME_PHOTOGRAPHER = 0.5       # score factor for each earlier pick by the same photographer
+# Fields kept per cached photo
+PHOTO_FIELDS = ("id", "width", "height", "url", "alt", "photographer", "photographer_id", "src")
+
+
+class RateLimit:
+    """Remaining Pexels quota as reported by the last API response (thread-safe)."""
+
+    def __init__(self, reserve=QUOTA_RESERVE):
+        self.reserve = reserve
+        self.remaining = None
+        self.reset_at = 0.0
+        self.lock = threading.Lock()
+
+    def update(self, headers):
+        remaining = headers.get("X-Ratelimit-Remaining", "")
+        reset = headers.get("X-Ratelimit-Reset", "")
+        with self.lock:
+            if remaining.isdigit():
+                self.remaining = int(remaining)
+            if reset.isdigit():
+                self.reset_at = float(reset)
+
+    def take(self):
+        """Reserves one request; returns the seconds to wait first (0 = go)."""
+        with self.lock:
+            if self.remaining is None or self.remaining > self.reserve:
+                if self.remaining is not None:
+                    self.remaining -= 1
+                return 0.0
+            return max(0.0, self.reset_at - time.time())
+
+
+RATE_LIMIT = RateLimit()
+
+
+def pexels_url(photo_id, width=1200):
+    return f"https://images.pexels.com/photos/{photo_id}/pexels-photo-{photo_id}.jpeg?auto=compress&cs=tinysrgb&w={width}"
+
+
+def preview_url(url, width=300):
+    """A Pexels image URL resized to `width` by the CDN (w=, no h=); other URLs unchanged."""
+    parts = urlsplit(url)
+    if parts.hostname != "images.pexels.com":
+        return url
+    params = [(k, v) for k, v in parse_qsl(parts.query) if k not in ("w", "h", "dpr")]
+    if not params:
+        params = [("auto", "compress"), ("cs", "tinysrgb")]
+    return urlunsplit(parts._replace(query=urlencode(params + [("w", width)])))
+
+
+def normalize_query(query):
+    """Lowercase words only: 'Couple  Picnic!' and 'couple picnic' are the same search."""
+    return " ".join(re.findall(r"[a-z0-9]+", query.lower()))
+
+
+class SearchCache:
+    """Persistent search results (one entry per result page) with TTL and LRU."""
+
+    def __init__(self, path=SEARCH_CACHE_FILE, ttl=SEARCH_TTL, max_entries=MAX_SEARCHES,
+                 refresh=False, offline=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.refresh = refresh  # True: ignore cached results, store the new ones
+        self.offline = offline  # True: never call the API
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.entries = json.load(f).get("entries", {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def key(query, per_page, page, orientation):
+        return f"{normalize_query(query)}|{orientation}|{per_page}|{page}"
+
+    def get(self, query, per_page, page, orientation):
+        if self.refresh:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self.entries.get(self.key(query, per_page, page, orientation))
+            if not entry or (now - entry.get("fetched", 0) > self.ttl and not self.offline):
+                return None
+            entry["used"] = int(now)
+            self._dirty = True
+            return entry["data"]
+
+    def put(self, query, per_page, page, orientation, data):
+        now = int(time.time())
+        photos = [{k: photo[k] for k in PHOTO_FIELDS if k in photo}
+                  for photo in data.get("photos", [])]
+        with self._lock:
+            self.entries[self.key(query, per_page, page, orientation)] = {
+                "query": normalize_query(query),
+                "orientation": orientation,
+                "data": {"photos": photos, "page": page, "per_page": per_page,
+                         "total_results": data.get("total_results"),
+                         "next_page": bool(data.get("next_page"))},
+                "fetched": now,
+                "used": now,
+            }
+            self._dirty = True
+
+    def find(self, query, orientation=None):
+        """
+        Offline search over every cached result set: photos whose query or
+        alt text share words with `query`, most shared words first.
+        """
+        words = set(normalize_query(query).split())
+        matches = {}
+        with self._lock:
+            entries = list(self.entries.values())
+        for entry in entries:
+            if orientation and entry.get("orientation") != orientation:
+                continue
+            query_words = set(entry["query"].split())
+            for position, photo in enumerate(entry["data"]["photos"]):
+                text = query_words | set(normalize_query(photo.get("alt") or "").split())
+                hits = len(words & text)
+                if not hits:
+                    continue
+                # Relevance like the API: matching words, then rank in the original results
+                score = (hits, -(entry["data"]["page"] - 1) * entry["data"]["per_page"] - position)
+                if photo["id"] not in matches or matches[photo["id"]][0] < score:
+                    matches[photo["id"]] = (score, photo)
+        return [photo for _, photo in sorted(matches.values(), key=lambda m: m[0], reverse=True)]
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            if len(self.entries) > self.max_entries:
+                keep = sorted(self.entries.items(), key=lambda item: item[1].get("used", 0),
+                              reverse=True)[:self.max_entries]
+                self.entries = dict(keep)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"version": 1, "entries": self.entries}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
+def search_page(query, per_page=5, page=1, orientation="landscape", limit=RATE_LIMIT, cache=None):
+    """One page of the search API as returned by Pexels, or None on errors."""
+    if cache:
+        data = cache.get(query, per_page, page, orientation)
+        if data is not None or cache.offline:
+            return data
+    delay = limit.take()
+    if delay > MAX_QUOTA_WAIT:
+        print(f"    Pexels quota used up, resets in {delay / 60:.0f} min - skipping '{query}'")
+        return None
+    if delay:
+        print(f"    Pexels quota almost used up, waiting {delay:.0f}s")
+        time.sleep(delay)
+
+    import http_pool  # requests only loads once the API is actually called
+
+    headers = {"Authorization": PEXELS_API_KEY}
+    params = {"query": query, "per_page": per_page, "page": page, "orientation": orientation}
+    try:
+        resp = http_pool.get(PEXELS_API_URL, headers=headers, params=params, timeout=15)
+        limit.update(resp.headers)
+        if resp.status_code == 200:
+            data = resp.json()
+            if cache:
+                cache.put(query, per_page, page, orientation, data)
+            return data
+        print(f"    Pexels API error: HTTP {resp.status_code}")
+        print(f"    Response: {resp.text[:200]}")
+        return None
+    except Exception as e:
+        print(f"    Pexels API error: {e}")
+        return None
+
+
+def search_pexels(query, per_page=5, page=1, orientation="landscape"):
+    """Search Pexels API for photos."""
+    data = search_page(query, per_page, page, orientation)
+    return data.get("photos", []) if data else []
+
+
+def score_photo(photo, position, total, aspect=LAYOUT_ASPECT):
+    """0..1: share of the photo left after the cover crop, resolution, API rank."""
+    width, height = photo.get("width") or 0, photo.get("height") or 0
+    if width and height:
+        ratio = width / height
+        fit = min(ratio, aspect) / max(ratio, aspect)
+        # Width of the cropped area that ends up on screen
+        visible = width if ratio <= aspect else height * aspect
+        resolution = min(1.0, visible / TARGET_WIDTH)
+    else:
+        fit = resolution = 0.5
+    relevance = 1.0 - position / max(1, total)
+    return (RANK_WEIGHTS["aspect"] * fit + RANK_WEIGHTS["resolution"] * resolution
+            + RANK_WEIGHTS["relevance"] * relevance)
+
+
+def _author(photo):
+    return photo.get("photographer_id") or photo.get("photographer")
+
+
+def rank_photos(photos, aspect=LAYOUT_ASPECT):
+    """
+    Photos best first. Picked greedily: every earlier pick by the same
+    photographer multiplies a photo's score by SAME_PHOTOGRAPHER, so two
+    slots of one idea rarely end up with the same shoot.
+    """
+    remaining = [(score_photo(photo, i, len(photos), aspect), i, photo)
+                 for i, photo in enumerate(photos)]
+    picked = {}
+    ranked = []
+    while remaining:
+        best = max(remaining, key=lambda r: (
+            r[0] * SAME_PHOTOGRAPHER ** picked.get(_author(r[2]), 0), -r[1]))
+        remaining.remove(best)
+        picked[_author(best[2])] = picked.get(_author(best[2]), 0) + 1
+        ranked.append(best[2])
+    return ranked
+
+
+def search_photos(query, count, per_page=5, orientation="landscape", size="large", cache=None):
+    """
+    Photos with a usable `src[size]` URL, best first (rank_photos). Pages
+    through the results until there are CANDIDATES_PER_SLOT * `count`
+    candidates to choose from; may return fewer than `count`. With an
+    offline cache and no cached result set for exactly this query, the
+    cache is searched by keywords instead.
+    """
+    wanted = count * CANDIDATES_PER_SLOT
+    per_page = min(MAX_PER_PAGE, max(per_page, wanted))
+    photos = []
+    seen = set()
+    for page in range(1, MAX_PAGES + 1):
+        data = search_page(query, per_page, page, orientation, cache=cache)
+        if not data:
+            if page == 1 and cache and cache.offline:
+                photos = cache.find(query, orientation)[:wanted]
+            break
+        for photo in data.get("photos", []):
+            if photo.get("src", {}).get(size) and photo.get("id") not in seen:
+                seen.add(photo.get("id"))
+                photos.append(photo)
+        if len(photos) >= wanted or not data.get("next_page"):
+            break
+    return rank_photos([p for p in photos if p.get("src", {}).get(size)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search Pexels photos, offline from the cache")
+    parser.add_argument("query")
+    parser.add_argument("--count", type=int, default=10, help="Photos to list")
+    parser.add_argument("--orientation", default="landscape")
+    parser.add_argument("--online", action="store_true",
+                        help="Query the API for result sets not in the cache")
+    args = parser.parse_args(argv)
+
+    cache = SearchCache(offline=not args.online)
+    photos = search_photos(args.query, args.count, orientation=args.orientation, cache=cache)
+    cache.save()
+    if not photos:
+        print(f"No cached photos for '{args.query}'" + ("" if args.online else " (try --online)"))
+        return 1
+    print(f"{'ID':>10s} {'Size':>11s}  Photographer / alt")
+    for photo in photos[:args.count]:
+        size = f"{photo.get('width', '?')}x{photo.get('height', '?')}"
+        print(f"{photo['id']:>10} {size:>11s}  "
+              f"{photo.get('photographer', '?')}: {photo.get('alt') or ''}")
+        print(f"{'':30s}{photo['src'].get('large', '')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
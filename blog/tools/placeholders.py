@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Platzhalter (LQIP) fuer Artikelbilder
+=====================================
+Lazy geladene Bilder zeigen bis zum letzten Byte nichts, die Amazon-Bilder
+im Geschenke-Artikel lassen leere Flaechen. Dieses Tool erzeugt pro Bild
+eine winzige, unscharfe Vorschau (laengste Seite PLACEHOLDER_SIZE Pixel,
+WebP, als data:-URI ~200-400 Bytes) und setzt sie als CSS-Hintergrund
+direkt in das <img>-Tag:
+
+  <img src="images/date-ideas/picnic.jpg" ...
+       style="background:url(data:image/webp;base64,...) center/cover no-repeat content-box">
+
+Der Hintergrund ist sofort da (kein zusaetzlicher Request) und liegt
+spaeter unter dem fertigen Bild. background-size folgt dem object-fit,
+das die Seiten-CSS fuer <img> setzt (cover/contain, content-box wegen
+padding). Bilder mit Transparenz und Icons/Badges (<= ICON_MAX Pixel)
+bekommen keinen Platzhalter.
+
+Platzhalter stehen nach Inhalt-Hash in tools/.placeholders.json; die
+Downloader und optimize_images.py fuellen den Cache nach jedem Lauf, das
+Umschreiben hier kostet dann nur noch Hashes. Externe Bilder (Hotlinks)
+werden nur mit --remote geladen.
+
+Nutzung:
+  python3 placeholders.py                                   # alle Artikel (blog/) umschreiben
+  python3 placeholders.py ../valentines-day-date-ideas.html
+  python3 placeholders.py --remote ../valentines-day-gift-ideas.html
+  python3 placeholders.py --dry-run                         # nur zaehlen
+
+Benoetigt Pillow zum Erzeugen neuer Platzhalter.
+"""
+
+import argparse
+import base64
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import posixpath
+import re
+import sys
+import threading
+import time
+
+from html_tags import find_img_tags, get_attr, replace_spans, set_attr
+from http_cache import sha256_file
+
+# requests/http_pool, build_site und image_budget werden erst in den Funktionen
+# importiert: die Downloader rufen compute_paths() nach jedem Lauf auf
+PLACEHOLDER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".placeholders.json")
+PLACEHOLDER_SIZE = 20        # Pixel, laengste Seite
+PLACEHOLDER_QUALITY = 40
+MAX_ENTRIES = 5000
+TIMEOUT = 20
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+ARTICLE_PAGES = "blog/*"     # Standard ohne Seitenangabe
+
+# Ein frueher gesetzter Platzhalter im style-Attribut (wird ersetzt, nicht gestapelt)
+PLACEHOLDER_STYLE_RE = re.compile(r'background:\s*url\(data:image/[^)]*\)[^;]*;?\s*')
+CSS_RULE_RE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+OBJECT_FIT_RE = re.compile(r'object-fit\s*:\s*(cover|contain)', re.I)
+STYLE_BLOCK_RE = re.compile(r'<style\b[^>]*>(.*?)</style>', re.I | re.S)
+
+
+def make_placeholder(data):
+    """data:-URI der Vorschau fuer Bild-Bytes; None bei Transparenz, Icons oder Fehlern."""
+    from PIL import Image, ImageOps, features
+    from image_budget import ICON_MAX
+
+    try:
+        with Image.open(io.BytesIO(data)) as original:
+            if max(original.size) <= ICON_MAX:
+                return None
+            # JPEG direkt verkleinert dekodieren (DCT-Skalierung) - viel schneller
+            original.draft('RGB', (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+            image = ImageOps.exif_transpose(original)
+            if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+                alpha = image.convert('RGBA').getchannel('A')
+                if alpha.getextrema()[0] < 255:
+                    return None
+            image = image.convert('RGB')
+            image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.LANCZOS)
+    except Exception:
+        return None
+    out = io.BytesIO()
+    if features.check('webp'):
+        image.save(out, 'WEBP', quality=PLACEHOLDER_QUALITY, method=6)
+        mime = 'image/webp'
+    else:
+        image.save(out, 'JPEG', quality=PLACEHOLDER_QUALITY, optimize=True)
+        mime = 'image/jpeg'
+    return f"data:{mime};base64,{base64.b64encode(out.getvalue()).decode('ascii')}"
+
+
+class PlaceholderCache:
+    """Platzhalter pro Inhalt-Hash (auch None = 'keiner moeglich'), dazu URL -> Hash."""
+
+    def __init__(self, path=PLACEHOLDER_FILE, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries = {}
+        self.urls = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                self.entries = data.get('entries', {})
+                self.urls = data.get('urls', {})
+            except (OSError, ValueError):
+                self.entries, self.urls = {}, {}
+
+    def get(self, sha256):
+        """(True, uri) wenn bekannt, sonst (False, None)."""
+        with self._lock:
+            entry = self.entries.get(sha256)
+            if entry is None:
+                return False, None
+            entry['used'] = int(time.time())
+            self._dirty = True
+            return True, entry['uri']
+
+    def put(self, sha256, uri):
+        with self._lock:
+            self.entries[sha256] = {'uri': uri, 'used': int(time.time())}
+            self._dirty = True
+
+    def for_bytes(self, data, sha256=None):
+        sha256 = sha256 or hashlib.sha256(data).hexdigest()
+        known, uri = self.get(sha256)
+        if not known:
+            uri = make_placeholder(data)
+            self.put(sha256, uri)
+        return uri
+
+    def for_file(self, path):
+        sha256 = sha256_file(path)
+        known, uri = self.get(sha256)
+        if known:
+            return uri
+        with open(path, 'rb') as f:
+            return self.for_bytes(f.read(), sha256)
+
+    def for_url(self, url):
+        """Externes Bild; geladen wird nur, wenn die URL noch keinen Hash hat."""
+        with self._lock:
+            sha256 = self.urls.get(url)
+        if sha256:
+            known, uri = self.get(sha256)
+            if known:
+                return uri
+        import http_pool
+        import requests
+        from image_budget import HEADERS
+
+        try:
+            resp = http_pool.get(url, headers=HEADERS, timeout=TIMEOUT)
+        except requests.RequestException:
+            return None
+        if resp.status_code != 200:
+            return None
+        sha256 = hashlib.sha256(resp.content).hexdigest()
+        with self._lock:
+            self.urls[url] = sha256
+            self._dirty = True
+        return self.for_bytes(resp.content, sha256)
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            if len(self.entries) > self.max_entries:
+                keep = sorted(self.entries.items(), key=lambda item: item[1].get('used', 0),
+                              reverse=True)[:self.max_entries]
+                self.entries = dict(keep)
+            known = set(self.entries)
+            self.urls = {url: h for url, h in self.urls.items() if h in known}
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': 1, 'entries': self.entries, 'urls': self.urls}, f,
+                          indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
+def compute_paths(paths, cache=None):
+    """
+    Platzhalter fuer frisch geladene/optimierte Dateien in den Cache legen.
+    Liefert die Zahl der Dateien mit Platzhalter, None ohne Pillow.
+    """
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return None
+    own_cache = cache is None
+    cache = cache or PlaceholderCache()
+    count = 0
+    for path in paths:
+        if path.lower().endswith(SOURCE_EXTENSIONS) and os.path.isfile(path):
+            count += cache.for_file(path) is not None
+    if own_cache:
+        cache.save()
+    return count
+
+
+def placeholder_style(uri, fit='cover', style=None):
+    """style-Attribut mit dem Platzhalter als Hintergrund; ein alter Platzhalter wird ersetzt."""
+    rest = PLACEHOLDER_STYLE_RE.sub('', style or '').strip()
+    own = f"background:url({uri}) center/{fit} no-repeat content-box"
+    return f"{own};{' ' + rest if rest else ''}"
+
+
+def image_fit(text):
+    """object-fit, das die <style>-Bloecke der Seite fuer <img> setzen (sonst cover)."""
+    fits = set()
+    for block in STYLE_BLOCK_RE.findall(text):
+        for selector, body in CSS_RULE_RE.findall(block):
+            if re.search(r'\bimg\s*$', selector.split(',')[-1].strip()):
+                fits.update(fit.lower() for fit in OBJECT_FIT_RE.findall(body))
+    return fits.pop() if len(fits) == 1 else 'cover'
+
+
+def rewrite_placeholders(text, page_dir, lookup):
+    """
+    (neuer Text, Anzahl geaenderter Tags). `lookup(src, page_dir)` liefert
+    die data:-URI oder None.
+    """
+    fit = image_fit(text)
+    replacements = []
+    for start, end, tag in find_img_tags(text):
+        src = get_attr(tag, 'src')
+        if not src or src.startswith('data:'):
+            continue
+        uri = lookup(src, page_dir)
+        if not uri:
+            continue
+        new = set_attr(tag, 'style', placeholder_style(uri, fit, get_attr(tag, 'style')))
+        if new != tag:
+            replacements.append((start, end, new))
+    return replace_spans(text, replacements), len(replacements)
+
+
+def make_lookup(cache, root, remote=False):
+    from build_site import resolve
+
+    def lookup(src, page_dir):
+        if src.startswith('//'):
+            src = 'https:' + src
+        if src.startswith(('http://', 'https://')):
+            return cache.for_url(src) if remote else None
+        ref = resolve(src, page_dir)
+        path = os.path.join(root, ref) if ref else None
+        if not path or not os.path.isfile(path) or not path.lower().endswith(SOURCE_EXTENSIONS):
+            return None
+        return cache.for_file(path)
+    return lookup
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Unscharfe Platzhalter (LQIP) in <img>-Tags einsetzen")
+    parser.add_argument('pages', nargs='*', help="HTML-Dateien (Standard: alle Artikel)")
+    parser.add_argument('--root', help="Site-Root (Standard: build_site.SITE_ROOT)")
+    parser.add_argument('--remote', action='store_true', help="externe Bilder laden (Hotlinks)")
+    parser.add_argument('--dry-run', action='store_true', help="nichts schreiben, nur zaehlen")
+    args = parser.parse_args(argv)
+
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("Pillow ist nicht installiert: pip install Pillow")
+        return 1
+
+    from build_site import SITE_ROOT, site_pages
+
+    root = os.path.abspath(args.root or SITE_ROOT)
+    pages = ([os.path.relpath(os.path.abspath(p), root).replace(os.sep, '/') for p in args.pages]
+             or [rel for rel in site_pages(root) if fnmatch.fnmatch(rel, ARTICLE_PAGES)])
+    cache = PlaceholderCache()
+    lookup = make_lookup(cache, root, args.remote)
+    try:
+        for rel in pages:
+            path = os.path.join(root, rel)
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+            new_text, changed = rewrite_placeholders(text, posixpath.dirname(rel), lookup)
+            if new_text != text and not args.dry_run:
+                tmp_path = path + '.part'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(new_text)
+                os.replace(tmp_path, path)
+            if changed:
+                added = len(new_text.encode('utf-8')) - len(text.encode('utf-8'))
+                print(f"  {rel:45s} {changed:3d} Platzhalter ({added:+,} Bytes HTML)")
+    finally:
+        cache.save()
+        if args.remote:
+            import http_pool
+            http_pool.get_pool().close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,361 @@
+"""
+Produktseiten auswerten (Amazon & Co.)
+======================================
+Findet die Produktbild-URL in einer Produktseite.
+
+Amazon-Seiten sind mehrere hundert KB gross; ein kompletter BeautifulSoup-Baum
+mit 'html.parser' ist der CPU-Engpass bei vielen Produkten. Deshalb:
+
+  1. Schnellpfad: vorkompilierte Regexe auf dem rohen HTML fuer
+     landingImage, "hiRes" und og:image - kein DOM noetig.
+  2. Nur wenn das nichts findet: voller DOM-Aufbau, mit lxml falls
+     installiert (deutlich schneller), sonst 'html.parser'. bs4 wird erst
+     dann importiert.
+
+Die Downloader nehmen iter_image_candidates(): ein Generator, der die
+Strategien erst auswertet, wenn der Aufrufer den naechsten Kandidaten
+braucht - normalerweise nur die erste. Weitere laufen nur, wenn die Bild-URL
+der ersten nicht ladbar ist, der DOM-Aufbau ganz am Ende. Mit StrategyStats
+lernt die Reihenfolge pro Domain mit: welche Strategie wie oft trifft, wie
+oft ihr Bild geladen werden konnte und wie lange sie braucht
+(.strategy-stats.json).
+
+Benchmark: python3 bench_parse.py [seite.html ...]
+"""
+
+import html
+import importlib.util
+import json
+import os
+import re
+import threading
+import time
+
+# bs4 wird erst im langsamen Pfad importiert (parse()), lxml nur gesucht
+PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+
+# Schnellpfad-Regexe (arbeiten direkt auf den Bytes der Antwort)
+LANDING_IMAGE_RE = re.compile(rb'<img\b[^>]*\bid\s*=\s*["\']landingImage["\'][^>]*>', re.I)
+OG_IMAGE_RE = re.compile(rb'<meta\b[^>]*\bproperty\s*=\s*["\']og:image["\'][^>]*>', re.I)
+HIRES_RE = re.compile(rb'"hiRes"\s*:\s*"([^"]+)"')
+TITLE_RE = re.compile(rb'<title[^>]*>(.*?)</title>', re.I | re.S)
+AMAZON_CDN_HOSTS = ('m.media-amazon.com', 'images-na.ssl-images-amazon.com')
+# Nicht 'amazon.com': so heissen auch normale Produktseiten
+CAPTCHA_TITLES = ('robot check', 'sorry! something went wrong!')
+MEDIA_AMAZON_IMG_RE = re.compile(
+    rb'<img\b[^>]*\ssrc\s*=\s*["\']([^"\']*m\.media-amazon\.com/images/I/[^"\']+)["\']', re.I)
+CAPTCHA_MARKERS = (b'/errors/validateCaptcha', b'api-services-support@amazon.com')
+
+STATS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".strategy-stats.json")
+DEFAULT_COST = 0.001   # Sekunden; angenommene Dauer einer noch nie gelaufenen Strategie
+MIN_COST = 0.001       # Sekunden; kuerzere Messungen sind Rauschen und zaehlen als MIN_COST
+
+
+def _attr(tag, name):
+    """Liest ein Attribut aus einem einzelnen Tag (bytes) und dekodiert Entities."""
+    match = re.search(rb'\s' + re.escape(name) + rb'\s*=\s*(["\'])(.*?)\1', tag, re.S)
+    if not match:
+        return None
+    return html.unescape(match.group(2).decode('utf-8', 'replace')) or None
+
+
+def resize_url(img_url, size):
+    """
+    Amazon-Bild-URL in einer anderen Groesse. Amazon-Bild-URLs enthalten
+    Groessen-Parameter wie ._SX38_ oder ._SS40_, die wir durch ._SL<size>_
+    ersetzen. None, wenn die URL keinen solchen Parameter hat.
+    """
+    # Pattern: ._XXNNN_ wobei XX = Buchstaben, NNN = Zahlen
+    resized = re.sub(r'\._[A-Z]{2}\d+_', f'._SL{size}_', img_url)
+    if resized != img_url:
+        return resized
+
+    # Alternativ: ._SCLZZZZZZZ_SXNNN_ Pattern
+    resized = re.sub(r'\._SCL[Z]+_SX\d+_', f'._SL{size}_', img_url)
+    if resized != img_url:
+        return resized
+
+    return None
+
+
+def try_highres_url(img_url):
+    """
+    Versucht aus einer Amazon-Thumbnail-URL eine hochaufgeloeste Version zu machen
+    (._SL1500_ fuer maximale Aufloesung, siehe resize_url).
+    """
+    return resize_url(img_url, 1500)
+
+
+def thumbnail_url(img_url, size=300):
+    """
+    Kleine Vorschau eines Amazon-Bildes. Ohne Groessen-Parameter (z.B.
+    data-old-hires oder ._AC_SL1500_) wird der Parameter-Block vor der
+    Endung durch ._SL<size>_ ersetzt.
+    """
+    return resize_url(img_url, size) or re.sub(
+        r'^(.*/[^/.]+)\.(?:_[^/]*_\.)?(jpe?g|png|webp|gif)$', rf'\1._SL{size}_.\2', img_url)
+
+
+# --- Strategien: Generatoren ueber den rohen Bytes der Seite -----------------
+
+def _landing_image(content):
+    """Amazon landingImage (zuverlaessigstes Element), data-old-hires zuerst."""
+    tag = LANDING_IMAGE_RE.search(content)
+    if tag:
+        for attr in (b'data-old-hires', b'src'):
+            value = _attr(tag.group(0), attr)
+            if value:
+                yield f"landingImage[{attr.decode()}]", value
+
+
+def _hires_script(content):
+    """hiRes aus dem JavaScript-Daten-Block."""
+    for match in HIRES_RE.finditer(content):
+        url = match.group(1).decode('utf-8', 'replace')
+        if any(host in url for host in AMAZON_CDN_HOSTS):
+            yield 'hiRes-script', url
+            return
+
+
+def _og_image(content):
+    """Open Graph meta tag (funktioniert auch auf nicht-Amazon-Seiten)."""
+    tag = OG_IMAGE_RE.search(content)
+    if tag:
+        value = _attr(tag.group(0), b'content')
+        if value:
+            yield 'og:image', value
+
+
+def _media_amazon_scan(content):
+    """Erstes Amazon-CDN-Bild im HTML."""
+    match = MEDIA_AMAZON_IMG_RE.search(content)
+    if match:
+        yield 'media-amazon-scan', html.unescape(match.group(1).decode('utf-8', 'replace'))
+
+
+def _dom(content):
+    """Letzter Ausweg: voller DOM-Baum, falls die Regexe an ungewoehnlichem Markup scheitern."""
+    for name, url in find_image_url(parse(content)):
+        yield f"dom:{name}", url
+
+
+# Standardreihenfolge; StrategyStats sortiert pro Domain um, 'dom' bleibt immer zuletzt
+STRATEGIES = {
+    'landingImage': _landing_image,
+    'hiRes-script': _hires_script,
+    'og:image': _og_image,
+    'media-amazon-scan': _media_amazon_scan,
+}
+FALLBACK_STRATEGY = 'dom'
+# Bildqualitaet: landingImage/hiRes liefern die grosse Version, og:image und der
+# CDN-Scan oft nur eine Vorschau. StrategyStats sortiert nur innerhalb einer Stufe.
+STRATEGY_TIERS = {
+    'landingImage': 0,
+    'hiRes-script': 0,
+    'og:image': 1,
+    'media-amazon-scan': 1,
+}
+
+
+def strategy_group(name):
+    """'landingImage[src]' -> 'landingImage', 'dom:og:image' -> 'dom'"""
+    if name.startswith(FALLBACK_STRATEGY + ':'):
+        return FALLBACK_STRATEGY
+    return name.split('[')[0]
+
+
+def iter_image_candidates(content, domain=None, stats=None):
+    """
+    Liefert (quelle, url) lazy: eine Strategie laeuft erst, wenn der Aufrufer
+    den naechsten Kandidaten will. Doppelte URLs werden uebersprungen.
+    Mit `stats` (StrategyStats) kommt die Reihenfolge aus den bisherigen
+    Treffern fuer `domain`, und jede Auswertung wird dort gezaehlt.
+    """
+    order = stats.order(domain) if stats else list(STRATEGIES)
+    seen = set()
+    for strategy in order + [FALLBACK_STRATEGY]:
+        candidates = STRATEGIES.get(strategy, _dom)(content)
+        start = time.perf_counter()
+        hit = False
+        for name, url in candidates:
+            if not hit:
+                hit = True
+                if stats:  # Kosten = Zeit bis zum ersten Treffer, ohne die Zeit beim Aufrufer
+                    stats.evaluated(domain, strategy, time.perf_counter() - start, True)
+            if url not in seen:
+                seen.add(url)
+                yield name, url
+        if not hit and stats:
+            stats.evaluated(domain, strategy, time.perf_counter() - start, False)
+
+
+def find_image_url_fast(content):
+    """
+    Strategien 1-3 per Regex auf dem rohen HTML (bytes). Gleiche Reihenfolge
+    und Namen wie find_image_url(); leere Liste = DOM-Fallback noetig.
+    """
+    return [candidate for strategy in ('landingImage', 'hiRes-script', 'og:image')
+            for candidate in STRATEGIES[strategy](content)]
+
+
+def find_image_url(soup):
+    """
+    Sucht die Produktbild-URL mit mehreren Strategien (in Prioritaetsreihenfolge).
+    """
+    strategies = []
+
+    # Strategie 1: Amazon landingImage (zuverlaessigstes Element)
+    img = soup.find('img', {'id': 'landingImage'})
+    if img:
+        # data-old-hires hat oft die hoechste Aufloesung
+        if img.get('data-old-hires'):
+            strategies.append(('landingImage[data-old-hires]', img['data-old-hires']))
+        if img.get('src'):
+            strategies.append(('landingImage[src]', img['src']))
+
+    # Strategie 2: hiRes aus dem JavaScript-Daten-Block
+    scripts = soup.find_all('script', string=re.compile(r'"hiRes"\s*:'))
+    for script in scripts:
+        matches = re.findall(r'"hiRes"\s*:\s*"([^"]+)"', script.string or '')
+        for match in matches:
+            if any(host in match for host in AMAZON_CDN_HOSTS):
+                strategies.append(('hiRes-script', match))
+                break
+        if strategies:
+            break
+
+    # Strategie 3: Open Graph meta tag (funktioniert auch auf nicht-Amazon-Seiten)
+    meta = soup.find('meta', property='og:image')
+    if meta and meta.get('content'):
+        strategies.append(('og:image', meta['content']))
+
+    # Strategie 4: Erstes grosses Amazon-CDN-Bild im HTML
+    for img in soup.find_all('img'):
+        src = img.get('src', '') or ''
+        if 'm.media-amazon.com/images/I/' in src:
+            strategies.append(('media-amazon-scan', src))
+            break
+
+    return strategies
+
+
+def parse(content, parser=None):
+    """Baut den vollen DOM-Baum (langsamer Pfad)."""
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(content, parser or PARSER)
+
+
+def page_title(content):
+    """Seitentitel ohne DOM, z.B. fuer Fehlermeldungen ('Robot Check')."""
+    match = TITLE_RE.search(content)
+    if not match:
+        return None
+    return html.unescape(match.group(1).decode('utf-8', 'replace')).strip() or None
+
+
+def is_captcha(content):
+    """Amazon hat statt der Produktseite eine Robot-Check-/Drossel-Seite geliefert."""
+    if any(marker in content for marker in CAPTCHA_MARKERS):
+        return True
+    title = page_title(content)
+    return bool(title) and title.lower() in CAPTCHA_TITLES
+
+
+def find_image_strategies(content):
+    """
+    Alle Kandidaten auf einmal (fuer bench_parse.py): erst der Regex-Schnellpfad,
+    dann der DOM. Die Downloader nehmen iter_image_candidates().
+    """
+    strategies = find_image_url_fast(content)
+    if strategies:
+        return strategies
+    return find_image_url(parse(content))
+
+
+class StrategyStats:
+    """
+    Treffer, erfolgreiche Downloads und Dauer pro Domain und Strategie.
+
+    Reihenfolge: zuerst nach Qualitaetsstufe (STRATEGY_TIERS), innerhalb einer
+    Stufe absteigend nach p / Dauer, mit p = (Downloads ok + 1) /
+    (Auswertungen + 2) und Dauer mindestens MIN_COST. Bei unabhaengigen
+    Versuchen ist das die Reihenfolge mit der kleinsten erwarteten
+    Gesamtdauer bis zum ersten Erfolg; eine schnellere Vorschau-Strategie
+    ueberholt so nie eine, die das grosse Bild liefert. Ohne Daten bleibt es
+    bei der Standardreihenfolge aus STRATEGIES.
+    """
+
+    def __init__(self, path=STATS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.domains = {}
+        self.session = {}   # nur dieser Lauf, fuer print_summary()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.domains = json.load(f).get('domains', {})
+            except (OSError, ValueError):
+                self.domains = {}
+
+    def _entry(self, table, strategy):
+        return table.setdefault(strategy, {'runs': 0, 'hits': 0, 'wins': 0, 'fails': 0,
+                                           'seconds': 0.0})
+
+    def order(self, domain):
+        with self._lock:
+            known = {strategy: entry for strategy, entry in self.domains.get(domain or '', {}).items()
+                     if entry['runs']}
+            # Noch nie gelaufene Strategien: p = 1/2 und die mittlere Dauer der anderen
+            typical = (sum(e['seconds'] for e in known.values()) / sum(e['runs'] for e in known.values())
+                       if known else DEFAULT_COST)
+
+            def score(item):
+                position, strategy = item
+                tier = STRATEGY_TIERS.get(strategy, len(STRATEGY_TIERS))
+                entry = known.get(strategy)
+                if not entry:
+                    return (tier, -0.5 / max(typical, MIN_COST), position)
+                p = (entry['wins'] + 1) / (entry['runs'] + 2)
+                cost = max(entry['seconds'] / entry['runs'], MIN_COST)
+                return (tier, -p / cost, position)
+            return [strategy for _, strategy in sorted(enumerate(STRATEGIES), key=score)]
+
+    def evaluated(self, domain, strategy, seconds, hit):
+        with self._lock:
+            for table in (self.domains.setdefault(domain or '', {}), self.session):
+                entry = self._entry(table, strategy)
+                entry['runs'] += 1
+                entry['hits'] += hit
+                entry['seconds'] += seconds
+            self._dirty = True
+
+    def downloaded(self, domain, name, ok):
+        """Ergebnis des Bild-Downloads fuer den Kandidaten aus Quelle `name`."""
+        strategy = strategy_group(name)
+        with self._lock:
+            for table in (self.domains.setdefault(domain or '', {}), self.session):
+                self._entry(table, strategy)['wins' if ok else 'fails'] += 1
+            self._dirty = True
+
+    def print_summary(self):
+        if not self.session:
+            return
+        print(f"\n{'Strategie':20s} {'Laeufe':>7s} {'Treffer':>8s} {'Bild ok':>8s} "
+              f"{'Fehlschlag':>10s} {'ms/Lauf':>8s}")
+        for strategy, e in sorted(self.session.items(), key=lambda item: -item[1]['wins']):
+            per_run = e['seconds'] / e['runs'] * 1000 if e['runs'] else 0.0
+            print(f"{strategy:20s} {e['runs']:7d} {e['hits']:8d} {e['wins']:8d} "
+                  f"{e['fails']:10d} {per_run:8.2f}")
+        print()
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': 1, 'domains': self.domains}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
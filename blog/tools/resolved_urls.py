@@ -0,0 +1,99 @@
+"""
+Cache fuer aufgeloeste Amazon-Bild-URLs
+=======================================
+Teuer an einem Produktbild ist nicht das Bild, sondern die Produktseite:
+laden (~400 KB), parsen, Strategie waehlen, Hochaufloesung pruefen. Das
+Ergebnis aendert sich praktisch nie. Dieser Cache merkt es sich pro ASIN
+(bzw. URL, wenn keine ASIN drinsteht) - Strategie, Original- und
+hochaufgeloeste Bild-URL, Zeitpunkt - und wird von allen Artikeln geteilt.
+
+    resolved = ResolvedUrls()
+    entry = resolved.get(product_url)       # None: abgelaufen/unbekannt/--refresh
+    ...
+    resolved.put(product_url, strategy, image_url, highres_url)
+    resolved.save()
+
+Eintraege verfallen nach TTL; ueber MAX_ENTRIES fliegen die am laengsten
+nicht benutzten (LRU) raus.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+RESOLVED_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".resolved-urls.json")
+TTL = 14 * 24 * 3600   # Sekunden
+MAX_ENTRIES = 5000
+
+ASIN_RE = re.compile(r'/(?:dp|gp/product|gp/aw/d)/([A-Z0-9]{10})(?:[/?#]|$)')
+
+
+def product_key(url):
+    """ASIN aus einer Amazon-URL, sonst die URL selbst."""
+    match = ASIN_RE.search(url)
+    return match.group(1) if match else url
+
+
+class ResolvedUrls:
+    """Persistente Zuordnung Produkt -> Bild-URL mit TTL und LRU."""
+
+    def __init__(self, path=RESOLVED_FILE, ttl=TTL, max_entries=MAX_ENTRIES, refresh=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.refresh = refresh  # True: nichts lesen, nur neu schreiben
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.entries = json.load(f).get('entries', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, url):
+        if self.refresh:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self.entries.get(product_key(url))
+            if not entry or now - entry.get('fetched', 0) > self.ttl:
+                return None
+            entry['used'] = int(now)
+            self._dirty = True
+            return dict(entry)
+
+    def put(self, url, strategy, image_url, highres_url=None):
+        now = int(time.time())
+        with self._lock:
+            self.entries[product_key(url)] = {
+                'url': url,
+                'strategy': strategy,
+                'image_url': image_url,
+                'highres_url': highres_url,
+                'fetched': now,
+                'used': now,
+            }
+            self._dirty = True
+
+    def invalidate(self, url):
+        with self._lock:
+            if self.entries.pop(product_key(url), None) is not None:
+                self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            if len(self.entries) > self.max_entries:
+                keep = sorted(self.entries.items(), key=lambda item: item[1].get('used', 0),
+                              reverse=True)[:self.max_entries]
+                self.entries = dict(keep)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': 1, 'entries': self.entries}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
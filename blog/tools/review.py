@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Thumbnail-first review of candidate images.
+===========================================
+The v2/v3 manifests download two or more full-size alternatives per idea so
+we can pick the best one - and then throw most of those bytes away. Review
+mode splits this into two phases:
+
+  1. previews: every candidate of a manifest is fetched as a small preview
+     (Pexels w=300, Amazon ._SL300_) in parallel, and a contact sheet is
+     written to review/<manifest>/index.html. Pexels searches show all
+     ranked candidates (pexels.rank_photos), not only as many as there
+     are filenames.
+  2. --fetch: full-size downloads only for the picks recorded in
+     review/<manifest>/picks.json, through the normal asset_pipeline.
+
+Usage:
+  python3 review.py manifests/date-ideas-v2.json             # previews + contact sheet
+  python3 review.py manifests/date-ideas-v2.json --fetch     # full size for the picks
+  python3 review.py manifests/date-ideas-v2.json --fetch --picks ~/Downloads/picks.json
+
+picks.json is a list of candidate keys: the filename for fixed slots
+(URL, Pexels ID, Amazon), "pexels-<id>" for search results. The first
+candidate of every group is preselected; the contact sheet updates the
+list as you tick boxes and offers it as a download. Picked search results
+fill the filenames of their slot in the order they were picked.
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import http_pool
+from asset_pipeline import AMAZON_HEADERS, HEADERS, WORKERS, Node, Pipeline, plan
+from pexels import CANDIDATES_PER_SLOT, SearchCache, preview_url, search_photos
+from product_page import StrategyStats, iter_image_candidates, thumbnail_url
+from resolved_urls import ResolvedUrls
+import verify_images
+
+REVIEW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "review")
+PREVIEW_WIDTH = 300
+# camping-tent-a.jpg, camping-tent-v3b.jpg -> camping-tent
+ALTERNATIVE_RE = re.compile(r'-(?:v\d+)?[a-z]$')
+
+
+class Candidate:
+    """One image on the contact sheet."""
+
+    def __init__(self, key, group, article, label, node, url=None, page_url=None):
+        self.key = key
+        self.group = group
+        self.article = article
+        self.label = label
+        self.node = node          # planned node this candidate would be downloaded by
+        self.url = url            # full-size URL (None for Amazon until resolved)
+        self.page_url = page_url
+        self.preview = None       # preview URL once known
+        self.error = None
+        self.bytes = 0
+
+
+def group_key(filename):
+    return ALTERNATIVE_RE.sub('', os.path.splitext(filename)[0])
+
+
+def review_dir(manifest_path):
+    return os.path.join(REVIEW_DIR, os.path.splitext(os.path.basename(manifest_path))[0])
+
+
+def fixed_candidates(nodes):
+    """Candidates for slots with a known source (one target each)."""
+    result = []
+    for node in nodes:
+        if node.kind == 'pexels_search':
+            continue
+        target = node.targets[0]
+        candidate = Candidate(target.filename, group_key(target.filename), target.article,
+                              target.filename, node, url=node.url, page_url=node.page_url)
+        if node.url:
+            candidate.preview = preview_url(node.url, PREVIEW_WIDTH)
+        result.append(candidate)
+    return result
+
+
+def search_candidates(node, cache):
+    """All ranked results of a Pexels search node."""
+    photos = search_photos(node.query, len(node.targets), cache=cache)
+    result = []
+    for photo in photos[:len(node.targets) * CANDIDATES_PER_SLOT]:
+        label = f"{photo.get('photographer', '?')}, {photo.get('width', '?')}x{photo.get('height', '?')}"
+        candidate = Candidate(f"pexels-{photo['id']}", node.query, node.targets[0].article, label,
+                              node, url=photo["src"]["large"])
+        candidate.preview = preview_url(photo["src"].get("medium") or photo["src"]["large"],
+                                        PREVIEW_WIDTH)
+        result.append(candidate)
+    return result
+
+
+def resolve_amazon(candidate, resolved, strategies):
+    """Image URL of an Amazon slot: from ResolvedUrls, else from the product page."""
+    hit = resolved.get(candidate.page_url)
+    if hit:
+        return hit["image_url"]
+    resp = http_pool.get(candidate.page_url, headers=AMAZON_HEADERS, timeout=20)
+    if resp.status_code != 200:
+        raise ValueError(f"product page HTTP {resp.status_code}")
+    found = next(iter_image_candidates(resp.content, urlsplit(candidate.page_url).hostname,
+                                       strategies), None)
+    if found is None:
+        raise ValueError("no product image found")
+    strategy, img_url = found
+    # Phase 2 (asset_pipeline.start_amazon) reuses this instead of loading the page again
+    resolved.put(candidate.page_url, strategy, img_url)
+    return img_url
+
+
+def fetch_preview(candidate, thumbs_dir, resolved, strategies):
+    path = os.path.join(thumbs_dir, os.path.splitext(candidate.key)[0] + ".jpg")
+    if os.path.exists(path):
+        return path  # kept from the last review run
+    try:
+        if candidate.page_url:
+            candidate.url = resolve_amazon(candidate, resolved, strategies)
+            candidate.preview = thumbnail_url(candidate.url, PREVIEW_WIDTH)
+        result = http_pool.download_file(candidate.preview, path, headers=HEADERS, timeout=20,
+                                         verify=verify_images.check_path)
+        if not result.written:
+            raise ValueError(result.problem or f"HTTP {result.status_code}, {result.size} bytes")
+        candidate.bytes = result.size
+        return path
+    except Exception as e:
+        candidate.error = str(e)
+        return None
+
+
+def default_picks(candidates):
+    seen = set()
+    picks = []
+    for candidate in candidates:
+        if candidate.group not in seen:
+            seen.add(candidate.group)
+            picks.append(candidate.key)
+    return picks
+
+
+def load_picks(path):
+    with open(path) as f:
+        data = json.load(f)
+    return data.get("picks", []) if isinstance(data, dict) else data
+
+
+def write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def render_sheet(title, candidates, thumbs, picks):
+    """Contact sheet: one section per group, a checkbox per candidate, picks.json below."""
+    parts = [f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Review: {html.escape(title)}</title>
+<style>
+body {{ font-family: -apple-system, sans-serif; margin: 24px; color: #222; }}
+h2 {{ font-size: 15px; margin: 24px 0 8px; }}
+.group {{ display: flex; flex-wrap: wrap; gap: 12px; }}
+label {{ width: {PREVIEW_WIDTH}px; font-size: 12px; cursor: pointer; }}
+label img {{ width: {PREVIEW_WIDTH}px; height: 200px; object-fit: cover; display: block;
+            border: 4px solid transparent; border-radius: 6px; }}
+input:checked + img {{ border-color: #e91e63; }}
+input {{ display: none; }}
+.error {{ color: #c00; }}
+textarea {{ width: 100%; height: 160px; font-family: monospace; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(title)}</h1>
+"""]
+    groups = {}
+    for candidate in candidates:
+        groups.setdefault((candidate.article, candidate.group), []).append(candidate)
+    for (article, group), members in groups.items():
+        parts.append(f'<h2>{html.escape(article)} / {html.escape(group)}</h2>\n<div class="group">')
+        for candidate in members:
+            checked = " checked" if candidate.key in picks else ""
+            if thumbs.get(candidate.key):
+                image = f'<img src="thumbs/{html.escape(os.path.basename(thumbs[candidate.key]))}" alt="">'
+            else:
+                image = f'<span class="error">{html.escape(candidate.error or "no preview")}</span>'
+            parts.append(f'<label><input type="checkbox" value="{html.escape(candidate.key)}"{checked}>'
+                         f'{image}{html.escape(candidate.key)}<br>{html.escape(candidate.label)}</label>')
+        parts.append('</div>')
+    parts.append("""
+<h2>picks.json</h2>
+<textarea id="picks" readonly></textarea>
+<p><a id="download" download="picks.json" href="#">Download picks.json</a></p>
+<script>
+var boxes = document.querySelectorAll('input[type=checkbox]');
+var order = [];
+boxes.forEach(function (box) { if (box.checked) order.push(box.value); });
+function update() {
+    var text = JSON.stringify({version: 1, picks: order}, null, 1);
+    document.getElementById('picks').value = text;
+    document.getElementById('download').href =
+        'data:application/json;charset=utf-8,' + encodeURIComponent(text);
+}
+boxes.forEach(function (box) {
+    box.addEventListener('change', function () {
+        order = order.filter(function (key) { return key !== box.value; });
+        if (box.checked) order.push(box.value);
+        update();
+    });
+});
+update();
+</script>
+</body>
+</html>
+""")
+    return "\n".join(parts)
+
+
+def previews(manifest_path, workers):
+    """Phase 1: previews and contact sheet."""
+    nodes = plan([manifest_path])
+    out_dir = review_dir(manifest_path)
+    thumbs_dir = os.path.join(out_dir, "thumbs")
+    os.makedirs(thumbs_dir, exist_ok=True)
+    resolved = ResolvedUrls()
+    strategies = StrategyStats()
+    searches = SearchCache()
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        searched = [n for n in nodes if n.kind == 'pexels_search']
+        found = dict(zip(searched, pool.map(lambda n: search_candidates(n, searches), searched)))
+        # Manifest order on the contact sheet
+        candidates = []
+        for node in nodes:
+            candidates.extend(found[node] if node in found else fixed_candidates([node]))
+        paths = list(pool.map(lambda c: fetch_preview(c, thumbs_dir, resolved, strategies),
+                              candidates))
+    thumbs = {c.key: path for c, path in zip(candidates, paths) if path}
+    for saved in (resolved, strategies, searches):
+        saved.save()
+
+    picks_path = os.path.join(out_dir, "picks.json")
+    picks = load_picks(picks_path) if os.path.exists(picks_path) else default_picks(candidates)
+    write_json(picks_path, {"version": 1, "picks": picks})
+    # Phase 2 needs the full-size URLs of search results without searching again
+    write_json(os.path.join(out_dir, "candidates.json"), {
+        "version": 1,
+        "candidates": {c.key: {"group": c.group, "url": c.url}
+                       for c in candidates if c.node.kind == 'pexels_search'},
+    })
+    sheet = os.path.join(out_dir, "index.html")
+    with open(sheet + ".tmp", "w", encoding="utf-8") as f:
+        f.write(render_sheet(os.path.basename(manifest_path), candidates, thumbs, picks))
+    os.replace(sheet + ".tmp", sheet)
+
+    for candidate in candidates:
+        if candidate.error:
+            print(f"  FAILED  {candidate.key}: {candidate.error}")
+    downloaded = sum(c.bytes for c in candidates)
+    print(f"\n{len(thumbs)}/{len(candidates)} previews, {downloaded:,} bytes downloaded "
+          f"in {time.perf_counter() - start:.1f}s")
+    print(f"Contact sheet: {sheet}")
+    print(f"Picks:         {picks_path} ({len(picks)} preselected)")
+    return 0 if len(thumbs) == len(candidates) else 1
+
+
+def picked_nodes(nodes, picks, known):
+    """Phase 2: the planned nodes reduced to the picks."""
+    picked = set(picks)
+    result = []
+    for node in nodes:
+        if node.kind != 'pexels_search':
+            if node.targets[0].filename in picked:
+                result.append(node)
+            continue
+        urls = [known[key]["url"] for key in picks
+                if key in known and known[key]["group"] == node.query]
+        if len(urls) > len(node.targets):
+            print(f"  '{node.query}': {len(urls)} picks for {len(node.targets)} files, "
+                  f"keeping the first {len(node.targets)}")
+        result.extend(Node('fetch', [target], url=url) for target, url in zip(node.targets, urls))
+    return result
+
+
+def fetch_picks(manifest_path, picks_path, workers):
+    """Phase 2: full-size downloads for the picks only."""
+    out_dir = review_dir(manifest_path)
+    picks_path = picks_path or os.path.join(out_dir, "picks.json")
+    known_path = os.path.join(out_dir, "candidates.json")
+    if not os.path.exists(picks_path):
+        print(f"No picks at {picks_path} - run without --fetch first")
+        return 1
+    picks = load_picks(picks_path)
+    known = {}
+    if os.path.exists(known_path):
+        with open(known_path) as f:
+            known = json.load(f).get("candidates", {})
+
+    nodes = picked_nodes(plan([manifest_path]), picks, known)
+    print(f"\nDownloading {sum(len(n.targets) for n in nodes)} picked images\n")
+    resolved = ResolvedUrls()
+    strategies = StrategyStats()
+    results = Pipeline(workers, resolved, strategies).run(nodes)
+    failed = [t.filename for t, status, _, _ in results if status in ("FAILED", "ERROR")]
+    print(f"\n{len(results) - len(failed)}/{len(results)} ready"
+          + (f", failed: {', '.join(sorted(failed))}" if failed else ""))
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preview candidates first, download picks later")
+    parser.add_argument("manifest", help="JSON/YAML manifest")
+    parser.add_argument("--fetch", action="store_true", help="Download the picks in full size")
+    parser.add_argument("--picks", metavar="FILE", help="picks.json (default: review/<manifest>/)")
+    parser.add_argument("--workers", type=int, default=WORKERS * 2)
+    args = parser.parse_args(argv)
+
+    http_pool.configure(pool_maxsize=max(http_pool.POOL_MAXSIZE, args.workers))
+    try:
+        if args.fetch:
+            return fetch_picks(args.manifest, args.picks, args.workers)
+        return previews(args.manifest, args.workers)
+    finally:
+        http_pool.print_stats()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
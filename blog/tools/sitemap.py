@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+sitemap.xml aus den Seiten erzeugen
+===================================
+Geht alle HTML-Seiten durch (Root und blog/, ohne email-*.html und Seiten
+mit <meta name="robots" content="noindex">) und schreibt ../../sitemap.xml
+neu. <lastmod> ist das Datum, an dem sich der Inhalt einer Seite zuletzt
+wirklich geaendert hat - nicht das Datum des letzten Laufs. Inhalt heisst:
+der sichtbare Text (ohne Tags, Attribute, <script>/<style>, Leerraum
+normalisiert) und die Bilder, auf die die Seite zeigt. Markup-Aenderungen wie
+width/height, loading oder ein Platzhalter-style zaehlen nicht.
+
+Der Hash und lastmod pro Seite stehen in sitemap-pages.json; die Datei ist
+versioniert, damit lastmod nicht vom lokalen Stand eines Rechners abhaengt.
+.sitemap-index.json (nicht versioniert) merkt sich nur Groesse/mtime/Hash
+pro Datei.
+
+Bilder aus blog/images/** kommen als <image:image> zur jeweiligen Seite.
+
+Schnell, wenn nichts passiert ist: Dateien mit unveraenderter Groesse und
+mtime werden nicht gelesen, und sitemap.xml wird nur geschrieben, wenn sich
+etwas geaendert hat. changefreq/priority bleiben wie in der bestehenden
+sitemap.xml; neue Seiten bekommen PAGE_DEFAULTS. Fehlt eine Seite in
+sitemap-pages.json, gilt der lastmod-Wert der bestehenden sitemap.xml weiter.
+
+Nutzung:
+  python3 sitemap.py
+  python3 sitemap.py --dry-run     # nur anzeigen, was sich aendern wuerde
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+import html_tags
+from build_site import SITE_ROOT, resolve, site_pages
+
+BASE_URL = "https://lovekeeper.app/"
+SITEMAP_FILE = os.path.join(SITE_ROOT, "sitemap.xml")
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_FILE = os.path.join(TOOLS_DIR, ".sitemap-index.json")   # lokal: Groesse/mtime/Hash
+PAGES_FILE = os.path.join(TOOLS_DIR, "sitemap-pages.json")    # versioniert: Key/lastmod
+INDEX_VERSION = 2        # 1 hat das ganze Markup gehasht
+EXCLUDE_PAGES = ("email-*.html",)   # Bestaetigungsseiten aus den App-Mails
+IMAGE_PREFIX = "blog/images/"
+# changefreq/priority fuer Seiten, die noch nicht in sitemap.xml stehen
+PAGE_DEFAULTS = {
+    "blog/*": ("yearly", "0.8"),
+    "*": ("monthly", "0.5"),
+}
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+IMAGE_NS = "http://www.google.com/schemas/sitemap-image/1.1"
+NOINDEX_RE = re.compile(r'<meta\b[^>]*name\s*=\s*["\']robots["\'][^>]*noindex', re.I)
+HIDDEN_RE = re.compile(r'<(script|style|noscript)\b.*?</\1\s*>|<!--.*?-->', re.I | re.S)
+TAG_RE = re.compile(r'<[^>]*>')
+
+
+def page_text(text):
+    """Sichtbarer Text einer Seite, Leerraum normalisiert."""
+    text = TAG_RE.sub(' ', HIDDEN_RE.sub(' ', text))
+    return re.sub(r'\s+', ' ', html.unescape(text)).strip()
+
+
+def page_url(rel):
+    """Seite -> oeffentliche URL (index.html wird zum Ordner)."""
+    if rel == "index.html":
+        return BASE_URL
+    if rel.endswith("/index.html"):
+        return BASE_URL + rel[:-len("index.html")]
+    return BASE_URL + rel
+
+
+def read_sitemap(path=SITEMAP_FILE):
+    """{loc: {'lastmod', 'changefreq', 'priority'}} der bestehenden sitemap.xml."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        root = ET.parse(path).getroot()
+    except ET.ParseError:
+        return {}
+    entries = {}
+    for url in root.findall(f"{{{SITEMAP_NS}}}url"):
+        fields = {child.tag.split("}")[1]: (child.text or "").strip() for child in url
+                  if child.tag.startswith(f"{{{SITEMAP_NS}}}")}
+        if fields.get("loc"):
+            entries[fields.pop("loc")] = fields
+    return entries
+
+
+class SitemapIndex:
+    """Inhalts-Key und lastmod pro Seite (pages_path), plus Groesse/mtime/Hash pro Datei (path)."""
+
+    def __init__(self, path=INDEX_FILE, pages_path=PAGES_FILE):
+        self.path = path
+        self.pages_path = pages_path
+        self.pages = {}
+        self.files = {}
+        self._dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION:
+                    self.files = data.get("files", {})
+            except (OSError, ValueError):
+                pass
+        if os.path.exists(pages_path):
+            try:
+                with open(pages_path) as f:
+                    self.pages = json.load(f).get("pages", {})
+            except (OSError, ValueError):
+                pass
+
+    def file_info(self, rel, page=False):
+        """Hash (und bei Seiten: Bilder, noindex) - unveraenderte Dateien nicht neu lesen."""
+        path = os.path.join(SITE_ROOT, rel)
+        stat = os.stat(path)
+        cached = self.files.get(rel)
+        if cached and cached["size"] == stat.st_size and cached["mtime"] == stat.st_mtime_ns:
+            return cached
+        with open(path, "rb") as f:
+            data = f.read()
+        info = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+        if page:
+            text = data.decode("utf-8", errors="replace")
+            info["noindex"] = bool(NOINDEX_RE.search(text))
+            sources = []
+            images = []
+            for _, _, tag in html_tags.find_img_tags(text):
+                src = html_tags.get_attr(tag, "src") or ""
+                sources.append(src)
+                ref = resolve(src, os.path.dirname(rel))
+                if ref and ref.startswith(IMAGE_PREFIX) and ref not in images:
+                    images.append(ref)
+            info["images"] = images
+            # Nur Text und Bildliste zaehlen, nicht das Markup drumherum
+            info["sha256"] = hashlib.sha256(
+                json.dumps([page_text(text), sources]).encode()).hexdigest()
+        else:
+            info["sha256"] = hashlib.sha256(data).hexdigest()
+        self.files[rel] = info
+        self._dirty = True
+        return info
+
+    def save(self):
+        if not self._dirty:
+            return
+        for path, data in ((self.path, {"version": INDEX_VERSION, "files": self.files}),
+                           (self.pages_path, {"version": 1, "pages": self.pages})):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+                f.write("\n")
+            os.replace(tmp_path, path)
+        self._dirty = False
+
+
+def _defaults(rel):
+    return next(value for pattern, value in PAGE_DEFAULTS.items() if fnmatch.fnmatch(rel, pattern))
+
+
+def collect(index, existing, today):
+    """[(rel, url, lastmod, changefreq, priority, images)] und die Liste geaenderter Seiten."""
+    entries = []
+    changed = []
+    for rel in site_pages(SITE_ROOT):
+        if any(fnmatch.fnmatch(os.path.basename(rel), pattern) for pattern in EXCLUDE_PAGES):
+            continue
+        info = index.file_info(rel, page=True)
+        if info["noindex"]:
+            continue
+        images = [image for image in info["images"] if os.path.isfile(os.path.join(SITE_ROOT, image))]
+        key = hashlib.sha256(json.dumps(
+            [info["sha256"]] + [(image, index.file_info(image)["sha256"]) for image in images]
+        ).encode()).hexdigest()
+        url = page_url(rel)
+        known = existing.get(url, {})
+        previous = index.pages.get(rel)
+        if previous and previous["key"] == key:
+            lastmod = previous["lastmod"]
+        elif not previous and known.get("lastmod"):
+            lastmod = known["lastmod"]  # nicht in sitemap-pages.json: Stand der sitemap.xml uebernehmen
+        else:
+            lastmod = today
+            changed.append(rel)
+        if previous != {"key": key, "lastmod": lastmod}:
+            index.pages[rel] = {"key": key, "lastmod": lastmod}
+            index._dirty = True
+        changefreq, priority = _defaults(rel)
+        entries.append((rel, url, lastmod, known.get("changefreq") or changefreq,
+                        known.get("priority") or priority, images))
+    for rel in set(index.pages) - {entry[0] for entry in entries}:
+        del index.pages[rel]
+        index._dirty = True
+    # Reihenfolge der bestehenden sitemap.xml beibehalten, neue Seiten hinten an
+    order = {url: position for position, url in enumerate(existing)}
+    entries.sort(key=lambda e: (order.get(e[1], len(order)), e[0]))
+    return entries, changed
+
+
+def render(entries):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             f'<urlset xmlns="{SITEMAP_NS}"'
+             + (f'\n        xmlns:image="{IMAGE_NS}">' if any(e[5] for e in entries) else '>')]
+    for _, url, lastmod, changefreq, priority, images in entries:
+        lines.append("    <url>")
+        lines.append(f"        <loc>{url}</loc>")
+        lines.append(f"        <lastmod>{lastmod}</lastmod>")
+        lines.append(f"        <changefreq>{changefreq}</changefreq>")
+        lines.append(f"        <priority>{priority}</priority>")
+        for image in images:
+            lines.append("        <image:image>")
+            lines.append(f"            <image:loc>{BASE_URL}{image}</image:loc>")
+            lines.append("        </image:image>")
+        lines.append("    </url>")
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+
+def update_sitemap(path=SITEMAP_FILE, index_path=INDEX_FILE, pages_path=PAGES_FILE,
+                   dry_run=False):
+    """Schreibt sitemap.xml, falls sich etwas geaendert hat; gibt die geaenderten Seiten zurueck."""
+    index = SitemapIndex(index_path, pages_path)
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    entries, changed = collect(index, read_sitemap(path), today)
+    text = render(entries)
+    current = None
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            current = f.read()
+    if dry_run:
+        return changed, text != current
+    if text != current:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    index.save()
+    return changed, text != current
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="sitemap.xml mit lastmod aus Inhalts-Hashes")
+    parser.add_argument("--dry-run", action="store_true", help="nichts schreiben, nur anzeigen")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    changed, written = update_sitemap(dry_run=args.dry_run)
+    for rel in changed:
+        print(f"  geaendert: {rel}")
+    state = "wuerde sich aendern" if args.dry_run and written else (
+        "aktualisiert" if written else "unveraendert")
+    print(f"sitemap.xml {state} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Bilddateien pruefen statt Groessen-Schwellen
+============================================
+Bisher galt eine Datei als gueltig, wenn sie groesser als 100, 1000 oder
+5000 Bytes war - je nach Skript. Eine abgeschnittene JPEG-Datei oder eine
+HTML-Fehlerseite ueber der Schwelle ging durch, ein gutes kleines Bild
+nicht. Dieses Modul prueft stattdessen den Inhalt:
+
+  - Typ aus den ersten Bytes (image_info.sniff_type); HTML, leere und
+    unbekannte Dateien sind nie ein Bild. Ein anderer Typ als die Endung
+    (PNG in .jpg) wird vermerkt, ist aber kein Fehler - Browser zeigen das an
+  - mit Pillow vollstaendig dekodiert (Image.load()); nur das entscheidet
+  - ohne Pillow (oder fuer Formate, die Pillow nicht kennt) nur ein Verdacht
+    aus Header und Struktur: Abmessungen 1..MAX_DIMENSION, JPEG mit
+    EOI-Marker (FFD9) in den letzten JPEG_TAIL Bytes, PNG mit gueltigen
+    Chunk-CRCs und IEND, GIF mit Trailer, WebP/AVIF mit passender
+    Container-Laenge
+
+Fuer ganze Ordner laufen die Pruefungen in einem Prozess-Pool. Ergebnisse
+stehen pro Ordner in `.verified-images.json`: Dateien mit unveraenderter
+Groesse/mtime werden gar nicht gelesen, Dateien mit bekanntem Inhalt-Hash
+(z.B. Kopien) nicht erneut dekodiert.
+
+Bestaetigt kaputte Dateien (nicht dekodierbar, HTML, leer) verschiebt
+requeue() nach `<name>.broken`; die Downloader laden sie dann beim naechsten
+Durchgang wie fehlende Dateien neu (asset_pipeline.py und
+download-product-images.py machen das vor jedem Lauf automatisch). Geloescht
+wird nichts - scheitert der neue Download, liegt das Original noch da. Ein
+blosser Verdacht (ohne Pillow) wird nur gemeldet.
+Neue Downloads prueft http_pool.download_file(verify=check_path) noch vor
+dem Umbenennen, ein kaputter Download ersetzt also nie eine gute Datei.
+
+Nutzung:
+  python3 verify_images.py ../images/date-ideas
+  python3 verify_images.py ../images/date-ideas ../images/gift-ideas --requeue
+  python3 verify_images.py ../images/date-ideas --workers 4
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import struct
+import sys
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from http_cache import sha256_file
+import image_info
+
+VERIFY_FILENAME = ".verified-images.json"
+VERIFY_VERSION = 2       # aeltere Ergebnisse (strengere Regeln) werden verworfen
+BROKEN_SUFFIX = ".broken"
+MAX_DIMENSION = 20000
+JPEG_TAIL = 16 * 1024    # Bytes am Ende, in denen der EOI-Marker stehen muss (Trailer, Padding)
+POOL_MIN_FILES = 4   # darunter lohnt der Prozess-Pool nicht
+# Erwarteter Typ pro Endung (image_info.sniff_type)
+EXPECTED_TYPES = {
+    '.jpg': 'jpeg', '.jpeg': 'jpeg', '.png': 'png', '.gif': 'gif',
+    '.webp': 'webp', '.avif': 'avif', '.svg': 'svg',
+}
+IMAGE_EXTENSIONS = tuple(EXPECTED_TYPES)
+
+
+def _jpeg_problem(data):
+    # Nach dem EOI kommen Fuellbytes und Trailer vor (Encoder, Kameras)
+    if b'\xff\xd9' not in data[-JPEG_TAIL:]:
+        return "kein EOI-Marker (abgeschnitten?)"
+    return None
+
+
+def _png_problem(data):
+    pos = 8
+    while pos + 12 <= len(data):
+        length, kind = struct.unpack('>I4s', data[pos:pos + 8])
+        end = pos + 12 + length
+        if end > len(data):
+            return f"Chunk {kind.decode('latin-1')} abgeschnitten"
+        crc = struct.unpack('>I', data[end - 4:end])[0]
+        if zlib.crc32(data[pos + 4:end - 4]) != crc:
+            return f"CRC-Fehler in {kind.decode('latin-1')}"
+        if kind == b'IEND':
+            return None
+        pos = end
+    return "kein IEND-Chunk (abgeschnitten?)"
+
+
+def _gif_problem(data):
+    return None if data.rstrip(b'\x00').endswith(b'\x3b') else "kein GIF-Trailer (abgeschnitten?)"
+
+
+def _webp_problem(data):
+    declared = struct.unpack('<I', data[4:8])[0] + 8
+    if len(data) < declared:
+        return f"RIFF-Container abgeschnitten ({len(data):,} von {declared:,} Bytes)"
+    return None
+
+
+def _avif_problem(data):
+    pos = 0
+    while pos + 8 <= len(data):
+        size = struct.unpack('>I', data[pos:pos + 4])[0]
+        if size == 1 and pos + 16 <= len(data):
+            size = struct.unpack('>Q', data[pos + 8:pos + 16])[0]
+        elif size == 0:
+            return None  # Box bis Dateiende
+        if size < 8:
+            return "ungueltige ISOBMFF-Box"
+        pos += size
+    return None if pos == len(data) else "ISOBMFF-Box abgeschnitten"
+
+
+STRUCTURE_CHECKS = {
+    'jpeg': _jpeg_problem, 'png': _png_problem, 'gif': _gif_problem,
+    'webp': _webp_problem, 'avif': _avif_problem,
+}
+
+
+def _decode_problem(data):
+    """
+    (geprueft, Fehlertext): vollstaendiges Dekodieren mit Pillow. Ohne Pillow
+    oder bei einem Format ohne Pillow-Plugin ist geprueft False.
+    """
+    try:
+        from PIL import Image, UnidentifiedImageError
+    except ImportError:
+        return False, None
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.load()
+    except UnidentifiedImageError:
+        return False, None
+    except Exception as e:
+        return True, f"nicht dekodierbar ({e})"
+    return True, None
+
+
+def _structure_problem(kind, size, data):
+    """Verdacht aus Header und Dateiende, wenn Pillow nicht entscheiden kann."""
+    if kind != 'avif' and not size:
+        return "keine Abmessungen im Header"
+    if size and not (0 < size[0] <= MAX_DIMENSION and 0 < size[1] <= MAX_DIMENSION):
+        return f"unplausible Abmessungen {size[0]}x{size[1]}"
+    return STRUCTURE_CHECKS[kind](data)
+
+
+def check_bytes(data, name=''):
+    """
+    {'ok', 'confirmed', 'type', 'expected', 'mime', 'width', 'height', 'reason'}
+    fuer den Inhalt einer Bilddatei. `confirmed`: sicher kaputt, nicht nur
+    ein Verdacht aus der Struktur (nur dann verschiebt requeue() die Datei).
+    """
+    kind = image_info.sniff_type(data[:32])
+    size = image_info.read_size(io.BytesIO(data)) if kind else None
+    result = {'ok': False, 'confirmed': False, 'type': kind,
+              'expected': EXPECTED_TYPES.get(os.path.splitext(name)[1].lower()),
+              'mime': image_info.MIME_TYPES.get(kind),
+              'width': size[0] if size else None, 'height': size[1] if size else None,
+              'reason': None}
+    if not data:
+        result['reason'] = "leer"
+    elif kind is None:
+        result['reason'] = "unbekannter Dateityp"
+    elif kind == 'html':
+        result['reason'] = "HTML statt Bild (Fehlerseite?)"
+    elif kind == 'svg':
+        result['ok'] = True  # Vektorgrafik: keine Pixel, nichts zu dekodieren
+        return result
+    else:
+        decoded, problem = _decode_problem(data)
+        if decoded:
+            result['reason'] = problem
+        else:
+            result['reason'] = _structure_problem(kind, size, data)
+            result['ok'] = result['reason'] is None
+            return result
+    result['ok'] = result['reason'] is None
+    result['confirmed'] = not result['ok']
+    return result
+
+
+def check_file(path):
+    """check_bytes() plus Groesse und SHA-256; laeuft auch im Prozess-Pool."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    result = check_bytes(data, os.path.basename(path))
+    result['size'] = len(data)
+    result['sha256'] = hashlib.sha256(data).hexdigest()
+    return result
+
+
+def check_path(path, name=None):
+    """Fehlertext oder None - fuer http_pool.download_file(verify=...)."""
+    with open(path, 'rb') as f:
+        return check_bytes(f.read(), name or os.path.basename(path))['reason']
+
+
+class VerifyCache:
+    """Pruefergebnisse eines Ordners: pro Datei (Groesse, mtime, Hash), pro Hash das Ergebnis."""
+
+    def __init__(self, directory, filename=VERIFY_FILENAME):
+        self.directory = directory
+        self.path = os.path.join(directory, filename)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.files = {}
+        self.results = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == VERIFY_VERSION:
+                    self.files = data.get('files', {})
+                    self.results = data.get('results', {})
+            except (OSError, ValueError):
+                self.files, self.results = {}, {}
+
+    def lookup(self, name, stat):
+        """Ergebnis ohne die Datei zu lesen, falls Groesse und mtime passen."""
+        with self._lock:
+            entry = self.files.get(name)
+            if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+                return self.results.get(entry['sha256'])
+        return None
+
+    def by_hash(self, sha256):
+        with self._lock:
+            return self.results.get(sha256)
+
+    def store(self, name, stat, result):
+        with self._lock:
+            self.files[name] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+                                'sha256': result['sha256']}
+            self.results[result['sha256']] = result
+            self._dirty = True
+
+    def forget(self, name):
+        with self._lock:
+            if self.files.pop(name, None) is not None:
+                self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            # Hashes, auf die keine Datei mehr zeigt, fliegen raus
+            used = {entry['sha256'] for entry in self.files.values()}
+            self.results = {h: r for h, r in self.results.items() if h in used}
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': VERIFY_VERSION, 'files': self.files, 'results': self.results}, f,
+                          indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
+def image_names(directory):
+    return sorted(name for name in os.listdir(directory)
+                  if name.lower().endswith(IMAGE_EXTENSIONS) and not name.startswith('.'))
+
+
+def verify_dir(directory, names=None, workers=None, cache=None):
+    """
+    {name: ergebnis} fuer alle (bzw. die genannten, vorhandenen) Bilder eines
+    Ordners. Unbekannte Dateien werden im Prozess-Pool geprueft.
+    """
+    own_cache = cache is None
+    cache = cache or VerifyCache(directory)
+    if names is None:
+        names = image_names(directory)
+    results = {}
+    todo = []
+    for name in names:
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path):
+            continue
+        stat = os.stat(path)
+        result = cache.lookup(name, stat)
+        if result is None:
+            # Gleicher Inhalt unter anderem Namen (Kopie) -> nicht noch einmal dekodieren
+            known = cache.by_hash(sha256_file(path))
+            if known is not None:
+                cache.store(name, stat, known)
+                result = known
+        if result is None:
+            todo.append((name, path, stat))
+        else:
+            results[name] = result
+
+    if len(todo) >= POOL_MIN_FILES and (workers is None or workers > 1):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            checked = list(pool.map(check_file, [path for _, path, _ in todo]))
+    else:
+        checked = [check_file(path) for _, path, _ in todo]
+    for (name, _, stat), result in zip(todo, checked):
+        cache.store(name, stat, result)
+        results[name] = result
+    if own_cache:
+        cache.save()
+    return results
+
+
+def requeue(directory, names, cache=None):
+    """
+    Verschiebt kaputte Dateien nach `<name>.broken` (ein .part-Rest wird
+    geloescht), damit die Downloader sie wie fehlende Dateien neu laden.
+    """
+    for name in names:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            os.replace(path, path + BROKEN_SUFFIX)
+        part = os.path.join(directory, f".{name}.part")
+        if os.path.exists(part):
+            os.remove(part)
+        if cache:
+            cache.forget(name)
+
+
+def verify_and_requeue(directory, names=None, workers=None):
+    """
+    Prueft `names` in `directory` und verschiebt die sicher kaputten;
+    liefert {name: grund} fuer diese.
+    """
+    cache = VerifyCache(directory)
+    results = verify_dir(directory, names, workers, cache)
+    broken = {name: result['reason'] for name, result in sorted(results.items())
+              if result.get('confirmed')}
+    requeue(directory, broken, cache)
+    cache.save()
+    return broken
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bilddateien pruefen (Typ, Abmessungen, Dekodieren)")
+    parser.add_argument('directories', nargs='+', help="Ordner mit Bildern")
+    parser.add_argument('--workers', type=int, default=None, help="Prozesse (Standard: CPU-Kerne)")
+    parser.add_argument('--requeue', action='store_true',
+                        help="kaputte Dateien nach <name>.broken verschieben, damit sie neu geladen werden")
+    args = parser.parse_args(argv)
+
+    broken = 0
+    for directory in args.directories:
+        cache = VerifyCache(directory)
+        results = verify_dir(directory, workers=args.workers, cache=cache)
+        bad = sorted(name for name, result in results.items() if not result['ok'])
+        print(f"{directory}: {len(results) - len(bad)}/{len(results)} in Ordnung")
+        for name in bad:
+            note = "" if results[name]['confirmed'] else " (Verdacht - ohne Pillow nicht bestaetigt)"
+            print(f"  {name:40s} {results[name]['reason']}{note}")
+        confirmed = [name for name in bad if results[name]['confirmed']]
+        if args.requeue and confirmed:
+            requeue(directory, confirmed, cache)
+            print(f"  {len(confirmed)} Dateien nach *{BROKEN_SUFFIX} verschoben "
+                  f"- der naechste Download-Lauf laedt sie neu")
+        cache.save()
+        broken += len(bad)
+    return 1 if broken else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Watch-Modus fuer products.json und die Bild-Manifeste
+=====================================================
+Beim Schreiben eines Artikels kommt ein Produkt nach dem anderen dazu. Jeder
+neue Aufruf von download-product-images.py oder asset_pipeline.py importiert
+requests neu, baut alle Verbindungen neu auf und geht wieder jeden Eintrag
+durch. watch.py laeuft stattdessen weiter und behaelt im Speicher:
+
+  - den HTTP-Pool (http_pool) mit seinen Keep-Alive-Verbindungen
+  - HttpCache pro Ausgabeordner, ResolvedUrls, StrategyStats, SearchCache
+  - pro Datei den zuletzt verarbeiteten Stand (Zieldatei -> Quelle)
+
+Die Dateien werden alle POLL_INTERVAL Sekunden per stat() geprueft (mtime,
+Groesse und Inode - viele Editoren speichern per Umbenennen). Nach dem
+Speichern laufen nur neue Eintraege und solche, deren Quelle sich geaendert
+hat (andere URL, Pexels-ID, Suche oder ASIN); dann wird die vorhandene Datei
+ersetzt. Fehlgeschlagene Eintraege kommen beim naechsten Speichern wieder
+dran. Halb geschriebenes oder kaputtes JSON wird uebersprungen, bis die
+Datei erneut gespeichert wird.
+
+Der erste Durchgang entspricht einem normalen Lauf: vorhandene Dateien werden
+uebersprungen bzw. bedingt geprueft.
+
+Nutzung:
+  python3 watch.py --products products.json
+  python3 watch.py manifests/date-ideas-final.json manifests/date-ideas-v3.json
+  python3 watch.py --products products.json manifests/*.json --workers 8
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import http_pool
+import placeholders
+import verify_images
+from asset_pipeline import Pipeline, plan
+from http_cache import HttpCache
+from journal import Journal
+from pexels import SearchCache
+from product_page import StrategyStats
+from resolved_urls import ResolvedUrls
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+POLL_INTERVAL = 0.25     # Sekunden zwischen zwei stat()-Runden
+WORKERS = 4
+
+
+def load_downloader():
+    """download-product-images.py als Modul (Bindestrich im Namen)."""
+    spec = importlib.util.spec_from_file_location(
+        'download_product_images', os.path.join(SCRIPT_DIR, 'download-product-images.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def file_state(path):
+    """(mtime, Groesse, Inode) oder None, wenn die Datei (gerade) fehlt."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class Shared:
+    """Zustand, der zwischen den Durchgaengen im Speicher bleibt."""
+
+    def __init__(self, workers=WORKERS, offline=False):
+        self.workers = workers
+        self.resolved = ResolvedUrls()
+        self.strategies = StrategyStats()
+        self.searches = SearchCache(offline=offline)
+        self.caches = {}  # Ausgabeordner -> HttpCache (wie Pipeline.caches)
+
+    def cache_for(self, directory):
+        cache = self.caches.get(directory)
+        if cache is None:
+            cache = self.caches[directory] = HttpCache(directory)
+        return cache
+
+
+class Watched:
+    """
+    Eine beobachtete Datei. Unterklassen liefern mit load() die Eintraege
+    ({Zieldatei: (Quelle, Eintrag)}) und verarbeiten sie mit run().
+    """
+
+    def __init__(self, path, shared):
+        self.path = os.path.abspath(path)
+        self.name = os.path.basename(path)
+        self.shared = shared
+        self.state = None        # stat()-Stand beim letzten erfolgreichen Lesen
+        self.bad_state = None    # stat()-Stand, unter dem die Datei nicht lesbar war
+        self.sources = {}        # Zieldatei -> Quelle, zuletzt erfolgreich verarbeitet
+
+    def poll(self):
+        state = file_state(self.path)
+        if state is None or state in (self.state, self.bad_state):
+            return
+        try:
+            entries = self.load()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.bad_state = state
+            print(f"{time.strftime('%H:%M:%S')} {self.name}: nicht lesbar ({e}) "
+                  f"- warte auf das naechste Speichern")
+            return
+        self.state = state
+        pending = {key: value for key, value in entries.items() if self.sources.get(key) != value[0]}
+        failed = set()
+        if pending:
+            replace = {key for key in pending if key in self.sources}
+            print(f"\n{time.strftime('%H:%M:%S')} {self.name}: {len(pending) - len(replace)} neu, "
+                  f"{len(replace)} geaendert")
+            started = time.perf_counter()
+            try:
+                failed = self.run(pending, replace)
+            except Exception as e:
+                print(f"  FEHLER {type(e).__name__}: {e}")
+                failed = set(pending)
+            print(f"  fertig in {time.perf_counter() - started:.1f}s"
+                  + (f", {len(failed)} fehlgeschlagen (neuer Versuch beim naechsten Speichern)"
+                     if failed else ""))
+        # Entfernte Eintraege fallen raus, fehlgeschlagene bleiben offen
+        self.sources = {key: source for key, (source, _) in entries.items() if key not in failed}
+
+    def load(self):
+        raise NotImplementedError
+
+    def run(self, pending, replace):
+        """Verarbeitet {Zieldatei: (Quelle, Eintrag)}; liefert die fehlgeschlagenen Zieldateien."""
+        raise NotImplementedError
+
+
+class ProductsFile(Watched):
+    """products.json von download-product-images.py."""
+
+    def __init__(self, path, shared, tool, pool):
+        super().__init__(path, shared)
+        self.tool = tool
+        self.pool = pool
+        self.save_dir = None
+
+    def load(self):
+        with open(self.path, 'r') as f:
+            config = json.load(f)
+        self.save_dir = os.path.normpath(os.path.join(self.tool.get_script_dir(),
+                                                      config.get('output_dir', self.tool.OUTPUT_DIR)))
+        return {os.path.join(self.save_dir, p['filename']): (p['url'], p)
+                for p in config.get('products', [])}
+
+    def run(self, pending, replace):
+        save_dir = self.save_dir
+        self.tool.ensure_dir(save_dir)
+        products = [product for _, product in pending.values()]
+        filenames = [p['filename'] for p in products]
+        for name, reason in verify_images.verify_and_requeue(save_dir, filenames).items():
+            print(f"  KAPUTT  {name}: {reason} - wird neu geladen")
+        cache = self.shared.cache_for(save_dir)
+        journal = Journal(save_dir)
+        journal.start(filenames)
+        total = len(products)
+        try:
+            results = list(self.pool.map(
+                lambda item: self.tool.process_product(
+                    item[0], total, item[1], save_dir, cache, journal, self.shared.resolved,
+                    self.shared.strategies,
+                    replace=os.path.join(save_dir, item[1]['filename']) in replace),
+                enumerate(products, 1),
+            ))
+        finally:
+            cache.save()
+            self.shared.resolved.save()
+            self.shared.strategies.save()
+            journal.finish()
+        placeholders.compute_paths([os.path.join(save_dir, p['filename'])
+                                    for p, ok in zip(products, results) if ok])
+        return {os.path.join(save_dir, p['filename']) for p, ok in zip(products, results) if not ok}
+
+
+class ManifestFile(Watched):
+    """Ein Manifest von asset_pipeline.py."""
+
+    def load(self):
+        entries = {}
+        for node in plan([self.path]):
+            source = (node.kind, node.url, node.query, node.page_url)
+            for target in node.targets:
+                entries[target.filepath] = (source, node)
+        return entries
+
+    def run(self, pending, replace):
+        nodes = list({id(node): node for _, node in pending.values()}.values())
+        for node in nodes:
+            for target in node.targets:
+                target.replace = target.filepath in replace
+        pipeline = Pipeline(self.shared.workers, self.shared.resolved, self.shared.strategies,
+                            self.shared.searches, caches=self.shared.caches)
+        results = pipeline.run(nodes)
+        ready = [t.filepath for t, status, _, _ in results if status not in ("FAILED", "ERROR")]
+        placeholders.compute_paths(ready)
+        return {t.filepath for t, status, _, _ in results if status in ("FAILED", "ERROR")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="products.json und Manifeste beobachten "
+                                                 "und neue Eintraege sofort laden")
+    parser.add_argument('manifests', nargs='*', help="Manifeste von asset_pipeline.py")
+    parser.add_argument('--products', action='append', default=[], metavar='PRODUCTS.json',
+                        help="Konfiguration von download-product-images.py (mehrfach moeglich)")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="parallele Downloads")
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL,
+                        help="Sekunden zwischen zwei Pruefungen")
+    parser.add_argument('--offline', action='store_true',
+                        help="Pexels-Suchen nur aus dem Such-Cache")
+    args = parser.parse_args(argv)
+    if not args.manifests and not args.products:
+        parser.error("mindestens ein Manifest oder --products angeben")
+
+    http_pool.configure(pool_maxsize=max(http_pool.POOL_MAXSIZE, args.workers))
+    shared = Shared(args.workers, offline=args.offline)
+    pool = ThreadPoolExecutor(max_workers=args.workers)
+    watched = [ManifestFile(path, shared) for path in args.manifests]
+    if args.products:
+        tool = load_downloader()
+        watched += [ProductsFile(path, shared, tool, pool) for path in args.products]
+    for w in watched:
+        if file_state(w.path) is None:
+            print(f"  {w.name} existiert (noch) nicht - wird geladen, sobald es da ist")
+    print(f"Beobachte {len(watched)} Datei(en) alle {args.interval:g}s - Strg+C beendet")
+
+    try:
+        while True:
+            for w in watched:
+                w.poll()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\nBeendet.")
+    finally:
+        pool.shutdown(cancel_futures=True)
+        shared.searches.save()
+        http_pool.print_stats()
+        http_pool.get_pool().close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())